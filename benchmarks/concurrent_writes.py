@@ -0,0 +1,131 @@
+# benchmarks/concurrent_writes.py
+"""
+Stress benchmark: several processes writing to the same journal at once.
+
+Every writer process repeats, --ops times: add a planner event, create an
+entry, and append a line to one shared entry through
+get_entry_document()/patch_entry_content(), sending the patch again when it
+is refused as a conflict (another writer saved the entry in between).
+
+Afterwards it checks that no update was lost: every event is there with a
+unique ID, the entry index lists every entry on disk, and the shared entry
+holds every appended line. It reports the throughput for each number of
+writers, and exits with status 1 if anything was lost.
+
+Usage:
+    python3 benchmarks/concurrent_writes.py [--writers 1 2 4 8] [--ops 50]
+                                            [--backend sqlite|json] [--json FILE]
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import synthetic
+from core import entry, locking, planner
+
+
+def _use_journal(base: Path, backend: str) -> None:
+    """Points the core modules at a scratch journal."""
+    synthetic.use_journal(base)
+    planner.STORAGE_BACKEND = backend
+    # Whole-file fsyncs would measure the disk, not the locking
+    entry.FSYNC_POLICY = "none"
+
+def _writer(base: Path, backend: str, writer: int, ops: int, shared_id: str, start, results) -> None:
+    _use_journal(base, backend)
+    start.wait()
+    conflicts = 0
+    for i in range(ops):
+        if planner.add_event("2030-01-01", f"w{writer}-{i}")["status"] != "success":
+            raise RuntimeError("planner.add_event failed")
+        if entry.create_entry(f"w{writer} {i}")["status"] != "success":
+            raise RuntimeError("entry.create_entry failed")
+        while True:
+            document = entry.get_entry_document(shared_id)
+            end = len(document["content"].encode("utf-16-le")) // 2
+            result = entry.patch_entry_content(shared_id, document["version"],
+                                               [{"start": end, "end": end, "text": f"w{writer}-{i}\n"}])
+            if result["status"] == "success":
+                break
+            if not result.get("conflict"):
+                raise RuntimeError(result["message"])
+            conflicts += 1
+    results.put({"writer": writer, "conflicts": conflicts, **locking.get_lock_stats()})
+
+def run(writers: int, ops: int, backend: str) -> dict:
+    """Runs one round with `writers` processes and returns its measurements and checks."""
+    with tempfile.TemporaryDirectory(prefix="offjournal_bench_") as tmp:
+        base = Path(tmp)
+        _use_journal(base, backend)
+        shared_id = entry.create_entry("Compartilhada")["data"]["id"]
+        entry.update_entry_content(shared_id, "")
+
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_writer,
+                                             args=(base, backend, w, ops, shared_id, start, results))
+                     for w in range(writers)]
+        for p in processes:
+            p.start()
+        began = time.perf_counter()
+        start.set()
+        reports = [results.get() for _ in processes]
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - began
+        if any(p.exitcode != 0 for p in processes):
+            raise RuntimeError("a writer process failed")
+
+        # Read everything back from a clean state, as a new process would
+        _use_journal(base, backend)
+        events = planner.get_events()
+        ids = [ev["id"] for ev in events]
+        listed = {e["filename"] for e in entry.get_entries()}
+        on_disk = set(entry._scan_entries())
+        lines = entry.get_entry_content(shared_id).splitlines()
+        expected = {f"w{w}-{i}" for w in range(writers) for i in range(ops)}
+
+        return {
+            "writers": writers,
+            "ops_per_writer": ops,
+            "seconds": round(elapsed, 4),
+            # Each op is three writes: an event, a new entry and a patch
+            "ops_per_second": round(writers * ops / elapsed, 1),
+            "conflicts_retried": sum(r["conflicts"] for r in reports),
+            "locks_contended": sum(r["contended"] for r in reports),
+            "lost_events": len(expected - {ev["title"] for ev in events}),
+            "duplicate_event_ids": len(ids) - len(set(ids)),
+            "entries_missing_from_index": len(on_disk - listed),
+            "lost_appends": len(expected - set(lines)),
+        }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Numbers of concurrent writer processes to try (default: 1 2 4 8)")
+    parser.add_argument("--ops", type=int, default=50, help="Operations per writer (default: 50)")
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite", help="Planner storage backend")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to FILE as JSON")
+    args = parser.parse_args()
+
+    rounds = [run(n, args.ops, args.backend) for n in args.writers]
+    print(f"{'writers':>7} {'ops/s':>8} {'seconds':>8} {'retries':>8} {'contended':>9}  lost")
+    failed = False
+    for r in rounds:
+        lost = (r["lost_events"] + r["duplicate_event_ids"] + r["entries_missing_from_index"] + r["lost_appends"])
+        failed = failed or lost > 0
+        print(f"{r['writers']:>7} {r['ops_per_second']:>8} {r['seconds']:>8} "
+              f"{r['conflicts_retried']:>8} {r['locks_contended']:>9}  {lost}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"benchmark": "concurrent_writes", "backend": args.backend,
+                                               "rounds": rounds}, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
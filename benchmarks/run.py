@@ -0,0 +1,227 @@
+# benchmarks/run.py
+"""
+Benchmark suite for the core hot paths at realistic journal sizes.
+
+For each journal size it builds a synthetic journal (see synthetic.py) in a
+scratch directory and times the core functions the CLI and the GUI call
+most: listing, ID lookups, saves, mood analysis, planner writes and range
+queries, export and media listings. Each benchmark runs `repeat` rounds of
+`number` calls (after one untimed warm-up call) and reports the median and
+the best per-call time of the rounds, in milliseconds.
+
+Results are written as JSON, so runs on two commits can be compared:
+
+    python3 benchmarks/run.py --output antes.json
+    (change the code)
+    python3 benchmarks/run.py --output depois.json --compare antes.json
+
+With --compare, a benchmark regresses when its median is more than its
+threshold (REGRESSION_THRESHOLDS, or DEFAULT_THRESHOLD) slower than in the
+baseline, and by more than NOISE_FLOOR_MS; the exit status is then 1.
+
+Everything runs offline with the standard library. The concurrent writers
+stress test is a separate script: benchmarks/concurrent_writes.py.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import synthetic
+from core import entry, export, media, mood, planner
+
+RESULTS_VERSION = 1
+
+# Allowed slowdown of a benchmark's median against the baseline (0.25 = 25%)
+DEFAULT_THRESHOLD = 0.25
+
+# Benchmarks bound by the disk (fsync, archive writes) vary more between runs
+REGRESSION_THRESHOLDS = {
+    "entry.update_entry_content": 0.5,
+    "planner.add_event": 0.5,
+    "export.zip": 0.4,
+    "export.jsonl": 0.4,
+}
+
+# Slowdowns smaller than this many milliseconds per call are never reported
+NOISE_FLOOR_MS = 0.05
+
+
+class Benchmark:
+    """One timed operation: call() is timed; setup(), if given, runs untimed before each round."""
+
+    def __init__(self, name: str, call, number: int = 1, repeat: int = 5, setup=None):
+        self.name = name
+        self.call = call
+        self.number = number
+        self.repeat = repeat
+        self.setup = setup
+
+    def run(self, repeat: int | None = None) -> dict:
+        self.call()  # Warm-up: opens databases, fills caches, loads the index
+        rounds = []
+        for _ in range(repeat or self.repeat):
+            if self.setup is not None:
+                self.setup()
+            began = time.perf_counter()
+            for _ in range(self.number):
+                self.call()
+            rounds.append((time.perf_counter() - began) / self.number * 1000)
+        return {"name": self.name, "median_ms": round(statistics.median(rounds), 4),
+                "min_ms": round(min(rounds), 4), "repeat": len(rounds), "number": self.number}
+
+
+def _cycle(items: list, seed: int = 0):
+    """Endless iterator over the items in a fixed random order."""
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return itertools.cycle(items)
+
+def _checked(result: dict) -> dict:
+    if result.get("status") != "success":
+        raise RuntimeError(result.get("message", "falha"))
+    return result
+
+def _forget_index() -> None:
+    entry._indexes.clear()
+    (entry.ENTRIES_DIR / entry.INDEX_FILENAME).unlink(missing_ok=True)
+    (entry.ENTRIES_DIR / entry.INDEX_LOG_FILENAME).unlink(missing_ok=True)
+
+def build_benchmarks(base: Path, ids: list[str], media_ids: list[str]) -> list[Benchmark]:
+    """The benchmarks for the journal under base."""
+    lookups = _cycle(ids, seed=1)
+    # Each call analyzes an entry not analyzed before (until they run out), so the mood cache is cold
+    moods = itertools.cycle(ids[::-1])
+    saves = _cycle(ids[-20:], seed=2)
+    counter = itertools.count()
+    days = _cycle(range(20 * 365), seed=3)
+    first_day = synthetic.START_DATE.date()
+    media_lookups = _cycle(media_ids or ids[:1], seed=4)
+    export_dir = base / "export"
+
+    def update():
+        entry_id = next(saves)
+        _checked(entry.update_entry_content(entry_id, f"# Salva {next(counter)}\n\nTexto alterado.\n"))
+
+    def month():
+        start = first_day + timedelta(days=next(days))
+        planner.get_events(start, start + timedelta(days=30), limit=100)
+
+    return [
+        Benchmark("entry.index_rebuild", lambda: entry.get_entries(limit=1), repeat=3, setup=_forget_index),
+        Benchmark("entry.get_entries", entry.get_entries, number=5),
+        Benchmark("entry.get_entries_page", lambda: entry.get_entries_page(), number=50),
+        Benchmark("entry.find_entry_path", lambda: entry.find_entry_path(next(lookups)), number=500),
+        Benchmark("entry.update_entry_content", update, number=20),
+        Benchmark("mood.analyze_entry_mood", lambda: _checked(mood.analyze_entry_mood(next(moods))), number=20),
+        Benchmark("planner.add_event", lambda: _checked(planner.add_event("2030-06-01", "Novo evento")), number=50),
+        Benchmark("planner.get_events_month", month, number=100),
+        Benchmark("media.list_media", lambda: _checked(media.list_media(next(media_lookups))), number=500),
+        Benchmark("export.jsonl", lambda: _checked(export.export_journal("jsonl", str(export_dir / "diario.jsonl"))),
+                  repeat=3),
+        Benchmark("export.zip", lambda: _checked(export.export_journal("zip", str(export_dir / "diario.zip"))),
+                  repeat=3),
+    ]
+
+def run_suite(sizes: list[int], planner_events: int, media_entries: int, files_per_entry: int,
+              only: list[str] | None = None, repeat: int | None = None, log=print) -> list[dict]:
+    """Builds a journal of each size, runs the benchmarks on it and returns their results."""
+    results = []
+    for size in sizes:
+        base = Path(tempfile.mkdtemp(prefix="offjournal_bench_"))
+        try:
+            began = time.perf_counter()
+            ids = synthetic.make_journal(base, size, planner_events, min(media_entries, size), files_per_entry)
+            log(f"diário com {size} entradas gerado em {time.perf_counter() - began:.1f}s")
+            for benchmark in build_benchmarks(base, ids, ids[-media_entries:] if media_entries else []):
+                if only and not any(benchmark.name.startswith(prefix) for prefix in only):
+                    continue
+                result = {"size": size, **benchmark.run(repeat)}
+                log(f"  {benchmark.name:<28} {result['median_ms']:>10.4f} ms  (melhor {result['min_ms']:.4f})")
+                results.append(result)
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    return results
+
+def compare(results: list[dict], baseline: list[dict], threshold: float | None = None) -> list[dict]:
+    """
+    Compares results with a baseline run and returns one row per benchmark
+    present in both, with its "change" (ratio of medians minus 1) and whether
+    it "regressed".
+    """
+    before = {(r["name"], r["size"]): r for r in baseline}
+    rows = []
+    for result in results:
+        old = before.get((result["name"], result["size"]))
+        if old is None or not old["median_ms"]:
+            continue
+        allowed = threshold if threshold is not None else REGRESSION_THRESHOLDS.get(result["name"], DEFAULT_THRESHOLD)
+        change = result["median_ms"] / old["median_ms"] - 1
+        rows.append({"name": result["name"], "size": result["size"], "baseline_ms": old["median_ms"],
+                     "median_ms": result["median_ms"], "change": round(change, 4), "threshold": allowed,
+                     "regressed": change > allowed and result["median_ms"] - old["median_ms"] > NOISE_FLOOR_MS})
+    return rows
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks das operações principais do offjournal")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Tamanhos de diário (número de entradas) a medir (padrão: 1000 10000)")
+    parser.add_argument("--planner-events", type=int, default=100_000, help="Eventos no planejador (padrão: 100000)")
+    parser.add_argument("--media-entries", type=int, default=200, help="Entradas com mídias anexadas (padrão: 200)")
+    parser.add_argument("--files-per-entry", type=int, default=3, help="Mídias por entrada (padrão: 3)")
+    parser.add_argument("--only", nargs="+", metavar="PREFIXO", help="Rodar só os benchmarks com estes prefixos")
+    parser.add_argument("--repeat", type=int, help="Número de rodadas de cada benchmark")
+    parser.add_argument("--output", metavar="ARQUIVO", help="Salvar os resultados em JSON")
+    parser.add_argument("--compare", metavar="ARQUIVO", help="Comparar com os resultados de uma execução anterior")
+    parser.add_argument("--threshold", type=float,
+                        help=f"Lentidão tolerada em relação à base, para todos os benchmarks (padrão: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.planner_events, args.media_entries, args.files_per_entry,
+                        args.only, args.repeat)
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"sizes": args.sizes, "planner_events": args.planner_events,
+                   "media_entries": args.media_entries, "files_per_entry": args.files_per_entry},
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if not args.compare:
+        return 0
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    rows = compare(results, baseline["results"], args.threshold)
+    print(f"\n--- Comparação com {args.compare} ({baseline.get('commit') or 'sem commit'}) ---")
+    if not rows:
+        print("  Nenhum benchmark em comum com a base.")
+    for row in rows:
+        mark = "  REGRESSÃO" if row["regressed"] else ""
+        print(f"  {row['name']:<28} {row['size']:>7} {row['baseline_ms']:>10.4f} -> {row['median_ms']:>10.4f} ms "
+              f"({row['change']:+.1%}){mark}")
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
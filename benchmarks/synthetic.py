@@ -0,0 +1,106 @@
+# benchmarks/synthetic.py
+"""
+Synthetic journals for the benchmarks.
+
+Builds a journal of a given size in a scratch directory: entry files (one
+per hour, starting on START_DATE, with a few hundred bytes of text sprinkled
+with mood words), a planner database with single and recurring events, and
+media attachments for some of the entries (small files, a share of them
+identical so the content-addressed store deduplicates them).
+
+Everything is generated from a seeded random.Random, so the same arguments
+always give the same journal.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import entry, media, mood, planner  # noqa: E402
+
+START_DATE = datetime(2010, 1, 1, 8, 0, 0)
+
+# Filler text, plus the words the mood analysis counts
+WORDS = ("hoje dia casa trabalho café manhã tarde noite amigos família cidade chuva sol livro "
+         "música filme caminhada projeto reunião viagem ideia plano cansado tranquilo").split()
+MOOD_WORDS = sorted(mood.POSITIVE_WORDS | mood.NEGATIVE_WORDS)
+
+# Share of the attachments that are copies of a file attached elsewhere
+SHARED_MEDIA_RATIO = 0.2
+
+
+def use_journal(base: Path) -> None:
+    """Points the core modules at a journal under base, forgetting the state of the previous one."""
+    entry.ENTRIES_DIR = base / "entries"
+    media.MEDIA_DIR = base / "media"
+    planner.PLANNER_FILE = base / "planner.json"
+    entry._indexes.clear()
+    planner._stores.clear()
+
+def _entry_text(rng: random.Random, title: str, when: datetime) -> str:
+    words = [rng.choice(MOOD_WORDS) if rng.random() < 0.08 else rng.choice(WORDS)
+             for _ in range(rng.randint(40, 120))]
+    return f"# {title}\n\nData: {when:%Y-%m-%d %H:%M:%S}\n\n{' '.join(words)}\n"
+
+def make_entries(count: int, seed: int = 0) -> list[str]:
+    """Writes `count` entry files straight into ENTRIES_DIR and returns their IDs, oldest first."""
+    rng = random.Random(seed)
+    entry.ENTRIES_DIR.mkdir(parents=True, exist_ok=True)
+    ids = []
+    for i in range(count):
+        when = START_DATE + timedelta(hours=i)
+        entry_id = when.strftime("%Y%m%d%H%M%S")
+        title = f"Entrada {i}"
+        path = entry.ENTRIES_DIR / f"{entry_id}_{'_'.join(title.split())}{entry.ENTRY_SUFFIX}"
+        path.write_text(_entry_text(rng, title, when), encoding="utf-8")
+        ids.append(entry_id)
+    return ids
+
+def make_planner(count: int, seed: int = 0, recurring: int = 50) -> None:
+    """Fills the planner with `count` single events and `recurring` recurring ones, in bulk."""
+    rng = random.Random(seed)
+    store = planner._get_store()
+    first = START_DATE.date()
+    singles = [((first + timedelta(days=rng.randrange(20 * 365))).isoformat(), f"Evento {i}")
+               for i in range(count)]
+    with store.lock, store.conn:
+        store.conn.executemany("INSERT INTO events (date, title) VALUES (?, ?)", singles)
+    for i in range(recurring):
+        start = (first + timedelta(days=rng.randrange(15 * 365))).isoformat()
+        planner.add_event(start, f"Recorrente {i}", {"freq": rng.choice(list(planner.RECURRENCE_FREQUENCIES))})
+
+def make_media(entry_ids: list[str], files_per_entry: int, scratch: Path, seed: int = 0) -> int:
+    """Attaches `files_per_entry` small files to each of the given entries; returns how many were added."""
+    rng = random.Random(seed)
+    scratch.mkdir(parents=True, exist_ok=True)
+    shared = []
+    added = 0
+    for entry_id in entry_ids:
+        for n in range(files_per_entry):
+            source = scratch / f"foto_{n}.jpg"
+            if shared and rng.random() < SHARED_MEDIA_RATIO:
+                source.write_bytes(rng.choice(shared))
+            else:
+                data = rng.randbytes(rng.randint(1024, 16 * 1024))
+                shared.append(data)
+                source.write_bytes(data)
+            if media.add_media(entry_id, str(source))["status"] == "success":
+                added += 1
+    return added
+
+def make_journal(base: Path, entries: int, planner_events: int = 0, media_entries: int = 0,
+                 files_per_entry: int = 3, seed: int = 0) -> list[str]:
+    """
+    Builds a complete journal under base and points the core modules at it.
+    The newest `media_entries` entries get attachments. Returns the entry IDs, oldest first.
+    """
+    use_journal(base)
+    ids = make_entries(entries, seed)
+    if planner_events:
+        make_planner(planner_events, seed)
+    if media_entries:
+        make_media(ids[-media_entries:], files_per_entry, base / "media-source", seed)
+    return ids
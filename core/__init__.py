@@ -3,15 +3,23 @@
 """
 Core package initialization for offjournal.
 
-Exports main modules for easier imports.
+Exports main modules for easier imports. Submodules are loaded on first
+access (PEP 562), so `import core` is cheap and a command only pays for
+the modules it actually uses.
 
 Author: Marcelo
 """
 
-from . import entry
-from . import planner
-from . import mood
-from . import crypto
-from . import export
-from . import media
-from . import utils
+__all__ = ["entry", "planner", "mood", "crypto", "export", "media", "search", "thumbnails", "utils", "watcher", "locking"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        # Importing binds the submodule as a package attribute, so this hook only
+        # runs on first access. __import__ (unlike importlib.import_module) goes
+        # through the regular import path, which -X importtime reports.
+        return __import__(f"{__name__}.{name}", fromlist=[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -5,12 +5,150 @@ Encryption module for offjournal.
 Provides GPG-based encryption and decryption for journal entries or any file.
 Functions return a dictionary indicating the operation's status.
 
+Whole journals are handled by encrypt_many/decrypt_many, which run a bounded
+pool of gpg processes and skip files whose output is already up to date.
+encrypt_bytes/decrypt_bytes pipe data through gpg's stdin and stdout, so
+encrypted-at-rest entries never have a plaintext copy written to disk.
+
+Every call goes through a GpgSession shared per GnuPG home. gpg has no
+stable way to process several messages in one process, so each operation
+runs one short-lived gpg; what the session keeps is the gpg-agent, launched
+once so every gpg connects to an agent that already holds the keys and
+cached passphrases. warm_up() can also pin a recipient to its key
+fingerprint; operations use a pinned fingerprint when there is one, but
+never look one up themselves.
+
 Dependencies:
 - gpg (must be installed and in the system's $PATH)
 """
 
+import os
 import subprocess
+import threading
 from pathlib import Path
+from typing import Callable
+
+# Upper bound on concurrent gpg processes for batch operations
+MAX_GPG_WORKERS = 8
+
+GPG_NOT_FOUND = "Comando 'gpg' não encontrado. GnuPG está instalado e no seu PATH?"
+
+
+class GpgSession:
+    """
+    Shared gpg options, agent and pinned fingerprints for one GnuPG home
+    directory. Thread-safe; use get_session() to share one per home directory.
+    """
+
+    def __init__(self, homedir: str | None = None):
+        self.homedir = homedir
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, str] = {}
+        self._agent_checked = False
+        self._agent_running = False
+
+    @property
+    def is_warm(self) -> bool:
+        """True once gpgconf has confirmed that the agent is running."""
+        return self._agent_running
+
+    def command(self, *args: str) -> list[str]:
+        """Builds a gpg command line with the options shared by every call."""
+        base = ["gpg", "--batch", "--yes", "--no-tty", "--no-greeting"]
+        if self.homedir:
+            base += ["--homedir", self.homedir]
+        return base + list(args)
+
+    def _ensure_agent(self) -> None:
+        # Launched once per session. If gpgconf is missing or fails, gpg still
+        # starts the agent on demand; the session just doesn't report itself warm.
+        if self._agent_checked:
+            return
+        self._agent_checked = True
+        args = ["gpgconf", "--launch", "gpg-agent"]
+        env = {**os.environ, "GNUPGHOME": self.homedir} if self.homedir else None
+        try:
+            result = subprocess.run(args, capture_output=True, env=env, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return
+        self._agent_running = result.returncode == 0
+
+    def key_for(self, recipient: str) -> str:
+        """Returns the fingerprint pinned by warm_up() for the recipient, or the recipient itself."""
+        with self._lock:
+            return self._fingerprints.get(recipient, recipient)
+
+    def resolve(self, recipient: str) -> str:
+        """
+        Looks up the fingerprint of the recipient's encryption key (one
+        gpg --list-keys) and pins it for later operations. Falls back to the
+        recipient itself if it can't be resolved, so gpg reports the error as usual.
+        """
+        with self._lock:
+            fingerprint = self._fingerprints.get(recipient)
+            if fingerprint is not None:
+                return fingerprint
+            self._ensure_agent()
+        try:
+            result = subprocess.run(self.command("--with-colons", "--list-keys", recipient),
+                                    capture_output=True, text=True)
+        except OSError:
+            return recipient
+        if result.returncode != 0:
+            return recipient
+        lines = result.stdout.splitlines()
+        fingerprints = [line.split(":")[9] for line in lines if line.startswith("fpr:")]
+        if sum(line.startswith("pub:") for line in lines) != 1 or not fingerprints:
+            # Ambiguous (several keys match) or nothing to pin: let gpg decide each time
+            return recipient
+        with self._lock:
+            self._fingerprints[recipient] = fingerprints[0]
+        return fingerprints[0]
+
+    def warm_up(self, recipient: str | None = None) -> dict:
+        """Launches the agent and, if given, pins the recipient's key ahead of the first real call."""
+        with self._lock:
+            self._ensure_agent()
+        if recipient:
+            self.resolve(recipient)
+        return self.status()
+
+    def status(self) -> dict:
+        """Status dictionary with the agent state and the pinned recipients."""
+        with self._lock:
+            recipients = sorted(self._fingerprints)
+        return {"status": "success", "warm": self.is_warm, "recipients": recipients}
+
+    def run(self, args: list[str], data: bytes | None = None, text: bool = False) -> subprocess.CompletedProcess:
+        """Runs gpg with the session options; raises like subprocess.run(check=True)."""
+        with self._lock:
+            self._ensure_agent()
+        return subprocess.run(self.command(*args), input=data, capture_output=True, text=text, check=True)
+
+
+# Sessions keyed by GnuPG home directory (GNUPGHOME, or None for the default)
+_sessions: dict[str | None, GpgSession] = {}
+_sessions_lock = threading.Lock()
+
+def get_session() -> GpgSession:
+    """Returns the shared session for the current GNUPGHOME, creating it if needed."""
+    homedir = os.environ.get("GNUPGHOME") or None
+    with _sessions_lock:
+        session = _sessions.get(homedir)
+        if session is None:
+            session = _sessions[homedir] = GpgSession(homedir)
+        return session
+
+def session_status() -> dict:
+    """
+    Tells whether the gpg-agent of the shared session is known to be running
+    and which recipients have a pinned fingerprint.
+    """
+    return get_session().status()
+
+def warm_up(recipient: str | None = None) -> dict:
+    """Warms up the shared gpg session (e.g. when the GUI starts). Returns session_status()."""
+    return get_session().warm_up(recipient)
 
 def encrypt_file(filepath: str, recipient: str) -> dict:
     """
@@ -30,14 +168,10 @@ def encrypt_file(filepath: str, recipient: str) -> dict:
     encrypted_path = path.with_suffix(path.suffix + ".gpg")
 
     try:
-        result = subprocess.run(
-            [
-                "gpg", "--yes", "--output", str(encrypted_path),
-                "--encrypt", "--recipient", recipient, str(path)
-            ],
-            capture_output=True,
-            text=True,
-            check=True  # This will raise CalledProcessError if gpg fails
+        session = get_session()
+        session.run(
+            ["--output", str(encrypted_path), "--encrypt", "--recipient", session.key_for(recipient), str(path)],
+            text=True  # Raises CalledProcessError if gpg fails
         )
         return {
             "status": "success",
@@ -45,7 +179,7 @@ def encrypt_file(filepath: str, recipient: str) -> dict:
             "output_path": str(encrypted_path)
         }
     except FileNotFoundError:
-        return {"status": "error", "message": "Comando 'gpg' não encontrado. GnuPG está instalado e no seu PATH?"}
+        return {"status": "error", "message": GPG_NOT_FOUND}
     except subprocess.CalledProcessError as e:
         error_message = e.stderr.strip()
         return {
@@ -75,25 +209,144 @@ def decrypt_file(filepath: str) -> dict:
     output_path = path.with_suffix("")
     
     try:
-        result = subprocess.run(
-            [
-                "gpg", "--yes", "--output", str(output_path),
-                "--decrypt", str(path)
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        get_session().run(["--output", str(output_path), "--decrypt", str(path)], text=True)
         return {
             "status": "success",
             "message": f"Arquivo descriptografado com sucesso em {output_path.name}",
             "output_path": str(output_path)
         }
     except FileNotFoundError:
-        return {"status": "error", "message": "Comando 'gpg' não encontrado. GnuPG está instalado e no seu PATH?"}
+        return {"status": "error", "message": GPG_NOT_FOUND}
     except subprocess.CalledProcessError as e:
         error_message = e.stderr.strip()
         return {
             "status": "error",
             "message": f"Falha na descriptografia: {error_message}"
         }
+
+def _pipe_gpg(args: list[str], data: bytes, failure: str) -> dict:
+    """Runs gpg on in-memory data; the result bytes are returned in "data"."""
+    try:
+        result = get_session().run(args, data)
+    except FileNotFoundError:
+        return {"status": "error", "message": GPG_NOT_FOUND}
+    except subprocess.CalledProcessError as e:
+        error_message = e.stderr.decode("utf-8", "replace").strip()
+        return {"status": "error", "message": f"{failure}: {error_message}"}
+    return {"status": "success", "data": result.stdout}
+
+def encrypt_bytes(data: bytes, recipient: str) -> dict:
+    """
+    Encrypts data in memory for the given recipient.
+
+    Args:
+        data (bytes): Plaintext to encrypt.
+        recipient (str): GPG key ID or email of the recipient.
+
+    Returns:
+        dict: A status dictionary with the encrypted bytes in "data".
+    """
+    return _pipe_gpg(["--encrypt", "--recipient", get_session().key_for(recipient)], data, "Falha na criptografia")
+
+def decrypt_bytes(data: bytes) -> dict:
+    """
+    Decrypts GPG-encrypted data in memory.
+
+    Args:
+        data (bytes): The encrypted data (e.g. the contents of a .gpg file).
+
+    Returns:
+        dict: A status dictionary with the decrypted bytes in "data".
+    """
+    return _pipe_gpg(["--decrypt"], data, "Falha na descriptografia")
+
+def _is_up_to_date(source: Path, output: Path) -> bool:
+    """True if `output` exists and is at least as new as `source`."""
+    try:
+        return output.stat().st_mtime_ns >= source.stat().st_mtime_ns
+    except OSError:
+        return False
+
+def _run_many(paths: list, operation: Callable[[str], dict], output_for: Callable[[Path], Path],
+              jobs: int | None, progress: Callable[[int, int, dict], None] | None) -> dict:
+    """
+    Applies a single-file operation to many files on a bounded pool of gpg
+    processes. Threads are enough here: each one just waits on its gpg child.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    paths = [Path(p) for p in paths]
+    results: list[dict | None] = [None] * len(paths)
+    pending = []
+    for i, path in enumerate(paths):
+        output = output_for(path)
+        if path.exists() and _is_up_to_date(path, output):
+            results[i] = {"status": "skipped", "path": str(path), "output_path": str(output),
+                          "message": f"{output.name} já está atualizado."}
+        else:
+            pending.append(i)
+
+    total, done = len(paths), 0
+
+    def report(result: dict) -> None:
+        nonlocal done
+        done += 1
+        if progress is not None:
+            progress(done, total, result)
+
+    for result in results:
+        if result is not None:
+            report(result)
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, MAX_GPG_WORKERS))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(operation, str(paths[i])): i for i in pending}
+        for future in as_completed(futures):
+            i = futures[future]
+            result = {**future.result(), "path": str(paths[i])}
+            results[i] = result
+            report(result)
+
+    summary = {"success": 0, "skipped": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return {"status": "success" if summary["error"] == 0 else "error",
+            "message": f"{summary['success']} processados, {summary['skipped']} ignorados, {summary['error']} com erro.",
+            "data": results, "summary": summary}
+
+def encrypt_many(filepaths: list, recipient: str, jobs: int | None = None,
+                 progress: Callable[[int, int, dict], None] | None = None) -> dict:
+    """
+    Encrypts many files for the given recipient, several gpg processes at a time.
+    Files whose .gpg counterpart is newer than the source are skipped.
+
+    Args:
+        filepaths (list): Paths of the files to encrypt.
+        recipient (str): GPG key ID or email of the recipient.
+        jobs (int | None): Number of concurrent gpg processes
+            (default: one per CPU, at most MAX_GPG_WORKERS).
+        progress (callable | None): Called as progress(done, total, result)
+            after each file, from the calling thread.
+
+    Returns:
+        dict: A status dictionary with one result per file in "data" (status
+        "success", "skipped" or "error") and the counts in "summary".
+    """
+    return _run_many(filepaths, lambda p: encrypt_file(p, recipient),
+                     lambda path: path.with_suffix(path.suffix + ".gpg"), jobs, progress)
+
+def decrypt_many(filepaths: list, jobs: int | None = None,
+                 progress: Callable[[int, int, dict], None] | None = None) -> dict:
+    """
+    Decrypts many .gpg files, several gpg processes at a time.
+    Files whose decrypted counterpart is newer than the .gpg file are skipped.
+
+    Args:
+        filepaths (list): Paths of the .gpg files to decrypt.
+        jobs (int | None): Number of concurrent gpg processes.
+        progress (callable | None): Called as progress(done, total, result).
+
+    Returns:
+        dict: A status dictionary, as for encrypt_many.
+    """
+    return _run_many(filepaths, decrypt_file, lambda path: path.with_suffix(""), jobs, progress)
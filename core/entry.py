@@ -5,14 +5,120 @@ Entry management module for offjournal.
 Provides functionality to create, edit, list, and manage journal entries.
 All functions are designed to return structured data (lists or dicts)
 to be used by any frontend (CLI, GUI, etc.).
+
+Entries can be kept encrypted at rest ("*.md.gpg"). Their content is piped
+to and from gpg in memory, never through a plaintext file, and recently
+decrypted contents are kept in a small in-memory LRU cache.
+
+Entry files are never truncated in place: new content is written to a
+temporary file, synced according to FSYNC_POLICY and renamed over the old
+one, so a crash leaves either the old or the new version. Saves of the
+same entry that overlap are coalesced, and saves that don't change the
+content are skipped; get_write_stats() reports how many writes were avoided.
+
+Editors can send just the changed ranges of an entry with
+patch_entry_content(). The latest content of recently edited entries is
+kept in memory under a version string (see get_entry_document()); a patch
+is applied to that copy only if it was made against the same version and
+the file hasn't been changed from outside since, otherwise the caller is
+told to send the full text again.
+
+The CLI and the GUI may run at the same time: every change to ENTRIES_DIR
+and its index is made holding an inter-process lock on the directory
+(core.locking), and the version check of a patch is repeated under that
+lock right before the write, so a save never overwrites a change another
+process made after the patch was checked.
 """
+import bisect
+import hashlib
+import itertools
+import json
 import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
-# Base directory for all journal entries
+from . import locking
+
+# core.crypto (subprocess), core.search and core.mood (sqlite3) are imported by the
+# functions that use them, so listing or reading plain entries doesn't load them.
+
+# Base directory for all journal entries (created with the first entry)
 ENTRIES_DIR = Path.home() / ".offjournal" / "entries"
-ENTRIES_DIR.mkdir(parents=True, exist_ok=True)
+
+# On-disk index of the entries directory (filename -> id, title, mtime, size).
+# It lives inside ENTRIES_DIR so that it follows the directory when it is moved
+# or overridden (e.g. by the tests), and it never matches the "*.md" pattern.
+INDEX_FILENAME = ".index.json"
+INDEX_VERSION = 3
+
+# Saving an existing entry appends its new record to this log instead of
+# rewriting the whole index; the log is folded back into INDEX_FILENAME by the
+# next full write, or once it has INDEX_LOG_LIMIT records.
+INDEX_LOG_FILENAME = ".index.log"
+INDEX_LOG_LIMIT = 1000
+
+# Default number of entries per page when listing
+PAGE_SIZE = 100
+
+# Entry files: plain Markdown, or Markdown encrypted at rest with GPG
+ENTRY_SUFFIX = ".md"
+ENCRYPTED_SUFFIX = ".md.gpg"
+
+# GPG recipient for encrypted entries. When set, new entries are created
+# encrypted; it is also the key encrypted entries are re-encrypted for on save.
+ENCRYPTION_RECIPIENT = os.environ.get("OFFJOURNAL_GPG_RECIPIENT") or None
+
+# How entry writes reach the disk: "none" (rename only), "file" (fsync the new
+# content before it replaces the old one) or "full" (also fsync the directory,
+# so the rename itself survives a crash).
+FSYNC_POLICY = "file"
+
+# Seconds a save waits for a newer save of the same entry before writing.
+# Saves that are overtaken meanwhile (or while another save of the entry is
+# being written) are dropped in favour of the newest one.
+SAVE_COALESCE_WINDOW = 0.0
+
+# Temporary files are created in a subdirectory, so that creating them does not
+# change the ENTRIES_DIR mtime the index relies on; only the final rename does.
+TMP_DIRNAME = ".tmp"
+
+# Number of decrypted entry contents kept in memory
+CONTENT_CACHE_SIZE = 64
+
+# entry path -> ((mtime_ns, size) of the encrypted file, plaintext), least recently used first
+_content_cache: OrderedDict[str, tuple] = OrderedDict()
+_content_lock = threading.Lock()
+
+# Entry path -> save slot {"seq", "lock"} used to coalesce overlapping saves
+_save_slots: dict[str, dict] = {}
+# Entry path -> ((mtime_ns, size), digest of the content) of the last write
+_last_writes: dict[str, tuple] = {}
+# Entry path -> (index_stamp() before, index_stamp() after) the last write, see _index_move()
+_index_moves: dict[str, tuple] = {}
+_saves_lock = threading.Lock()
+_write_stats = {"writes": 0, "coalesced": 0, "unchanged": 0}
+
+# Returned (with "conflict": True) when a patch was not made against the entry's current content
+CONFLICT_MESSAGE = "A entrada mudou desde a última versão recebida; envie o texto completo."
+
+# Number of entry documents (latest content and version) kept in memory for patching
+DOCUMENT_CACHE_SIZE = 16
+
+# Entry path -> {"epoch", "version", "content", "stamp"}, least recently used first.
+# "stamp" is the (mtime_ns, size) the file had when "content" was read or last written by us.
+_documents: OrderedDict[str, dict] = OrderedDict()
+_documents_lock = threading.Lock()
+
+# In-memory copies of the index, keyed by entries directory. The lock keeps
+# them consistent when core functions are called from several threads (GUI workers);
+# it is always taken after the directory's inter-process lock (see _index_locked()).
+_indexes: dict[Path, dict] = {}
+_index_lock = threading.RLock()
 
 
 def _parse_filename(path: Path) -> dict:
@@ -21,23 +127,324 @@ def _parse_filename(path: Path) -> dict:
     Example: "20250715100000_My_First_Entry.md" ->
              {"id": "20250715100000", "title": "My First Entry"}
     """
-    parts = path.stem.split('_', 1)
+    stem = path.name.removesuffix(ENCRYPTED_SUFFIX) if is_encrypted(path) else path.stem
+    parts = stem.split('_', 1)
     return {
         "id": parts[0],
         "title": parts[1].replace('_', ' ') if len(parts) > 1 else "Sem Título",
         "filename": path.name
     }
 
-def get_entries() -> list[dict]:
+def is_encrypted(path: Path) -> bool:
+    """True if the entry file is encrypted at rest."""
+    return path.name.endswith(ENCRYPTED_SUFFIX)
+
+def _index_record(name: str, st: os.stat_result) -> dict:
+    """Builds the index record of an entry file from its name and stat result."""
+    record = _parse_filename(Path(name))
+    record["mtime"] = st.st_mtime
+    record["size"] = st.st_size
+    return record
+
+def _entry_names() -> set[str]:
+    """Names of the entry files in ENTRIES_DIR, from a directory listing that doesn't stat them."""
+    with os.scandir(ENTRIES_DIR) as it:
+        names = {item.name for item in it
+                 if item.name.endswith((ENTRY_SUFFIX, ENCRYPTED_SUFFIX)) and item.is_file()}
+    # A ".md.gpg" next to its ".md" is an encrypted copy (e.g. from encrypt-all),
+    # not a second entry: the plain file stays the entry.
+    return {name for name in names
+            if not (name.endswith(ENCRYPTED_SUFFIX) and name.removesuffix(".gpg") in names)}
+
+def _scan_entries() -> dict[str, dict]:
+    """Walks ENTRIES_DIR once and returns the index records of every entry."""
+    return {name: _index_record(name, (ENTRIES_DIR / name).stat()) for name in _entry_names()}
+
+def _stat_mtime(path: Path) -> int | None:
+    """Returns the mtime of a path in nanoseconds, or None if it can't be stat'ed."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def _index_mtime() -> int | None:
+    """When the index was last written: the mtime of the newer of INDEX_FILENAME and its log."""
+    stamps = [_stat_mtime(ENTRIES_DIR / INDEX_FILENAME), _stat_mtime(ENTRIES_DIR / INDEX_LOG_FILENAME)]
+    return max((m for m in stamps if m is not None), default=None)
+
+def _read_index_file(dir_mtime: int) -> dict | None:
+    """
+    Loads the on-disk index, with the records logged since it was written, if
+    it is not older than the directory. Adding, removing or renaming a file
+    bumps the directory mtime, so an older index may have missed an outside
+    change and must be rebuilt. Timestamps are coarse, so the index written
+    right after one of our own changes usually has the same mtime as the
+    directory; such an index is checked against a listing of the file names
+    (no stat per file) instead of being rebuilt.
+    Returns {"entries", "generation", "log_lines"}, or None.
+    """
+    index_mtime = _index_mtime()
+    if index_mtime is None or index_mtime < dir_mtime:
+        return None
+    try:
+        with open(ENTRIES_DIR / INDEX_FILENAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or not isinstance(data.get("entries"), dict):
+        return None
+    index = {"entries": data["entries"], "generation": data.get("generation"), "log_lines": 0}
+    try:
+        with open(ENTRIES_DIR / INDEX_LOG_FILENAME, "r", encoding="utf-8") as f:
+            for line in f:
+                item = json.loads(line)
+                # Lines of an older generation were folded into the index file already
+                if item["generation"] == index["generation"]:
+                    index["entries"][item["name"]] = item["record"]
+                    index["log_lines"] += 1
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, KeyError, TypeError, IOError):
+        # A torn or unreadable log: rebuild rather than trust part of it
+        return None
+    if index_mtime == dir_mtime and _entry_names() != index["entries"].keys():
+        return None
+    return index
+
+def _write_index(index: dict) -> None:
+    """
+    Persists the whole index, empties its log and records the directory state
+    it corresponds to. The files are rewritten in place, so updating them does
+    not touch the directory mtime. Log lines left by an interrupted write
+    belong to the previous generation and are ignored on load.
+    """
+    index["generation"] = os.urandom(4).hex()
+    index["log_lines"] = 0
+    # Serialized in one go (json.dump would make many small writes)
+    data = json.dumps({"version": INDEX_VERSION, "generation": index["generation"],
+                       "entries": index["entries"]}, ensure_ascii=False, separators=(",", ":"))
+    try:
+        with open(ENTRIES_DIR / INDEX_FILENAME, "w", encoding="utf-8") as f:
+            f.write(data)
+        if (ENTRIES_DIR / INDEX_LOG_FILENAME).exists():
+            os.truncate(ENTRIES_DIR / INDEX_LOG_FILENAME, 0)
+    except IOError:
+        # The index is only a cache; the next lookup will rescan the directory.
+        pass
+    index["dir_mtime"] = _stat_mtime(ENTRIES_DIR)
+    index["index_mtime"] = _index_mtime()
+
+def _log_index_record(index: dict, name: str) -> None:
     """
-    Returns a list of all journal entries, with newest first.
-    Each entry is a dictionary containing its id, title, and filename.
+    Persists the record of one entry by appending it to the index log, so a
+    save costs one short write whatever the size of the journal. Falls back
+    to a full write when the log is full or the index has never been written.
     """
+    if index.get("generation") is None or index["log_lines"] >= INDEX_LOG_LIMIT:
+        _write_index(index)
+        return
+    line = json.dumps({"generation": index["generation"], "name": name, "record": index["entries"][name]},
+                      ensure_ascii=False, separators=(",", ":"))
     try:
-        files = sorted(ENTRIES_DIR.glob("*.md"), reverse=True)
-        return [_parse_filename(f) for f in files]
+        with open(ENTRIES_DIR / INDEX_LOG_FILENAME, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except IOError:
+        pass
+    index["log_lines"] += 1
+    index["dir_mtime"] = _stat_mtime(ENTRIES_DIR)
+    index["index_mtime"] = _index_mtime()
+
+@contextmanager
+def _index_locked():
+    """
+    Holds ENTRIES_DIR locked against other processes and threads, and yields
+    its index, up to date. Changes to the directory and to the index are made
+    inside this block, so they can't interleave with another process's.
+    """
+    with locking.file_lock(ENTRIES_DIR), _index_lock:
+        yield _refresh_index()
+
+def _get_index() -> dict:
+    """
+    Returns the entry index for the current ENTRIES_DIR.
+    The in-memory copy is reused while neither the directory nor the index file
+    has changed; otherwise the on-disk index is reloaded, or the directory is
+    rescanned if the index is missing or stale.
+    Checking that the in-memory copy is current only stats the directory and
+    the index files; the locks are taken only when it has to be reloaded.
+    """
+    index = _indexes.get(ENTRIES_DIR)
+    if index is not None and _is_current(index, _stat_mtime(ENTRIES_DIR)):
+        return index
+    with _index_locked() as index:
+        return index
+
+def index_stamp() -> tuple:
+    """
+    Identifies the state of the entry index: (mtime_ns of ENTRIES_DIR, mtime_ns
+    of the index files). It changes whenever an entry is created, saved or
+    deleted through this module, a file is added, removed or renamed in the
+    directory, or core.watcher refreshes the index after an outside edit.
+    """
+    index = _get_index()
+    return index["dir_mtime"], index["index_mtime"]
+
+def _index_stamp(index: dict) -> tuple:
+    return index["dir_mtime"], index["index_mtime"]
+
+def _is_current(index: dict, dir_mtime: int | None) -> bool:
+    """True if neither the directory nor the index files changed since the in-memory index was loaded or written."""
+    return dir_mtime is not None and index["dir_mtime"] == dir_mtime and index["index_mtime"] == _index_mtime()
+
+def _refresh_index() -> dict:
+    """Does the work of _get_index(); must be called inside _index_locked()."""
+    dir_mtime = _stat_mtime(ENTRIES_DIR)
+    if dir_mtime is None:
+        return {"entries": {}, "names": [], "dir_mtime": None, "index_mtime": None,
+                "generation": None, "log_lines": 0}
+
+    index = _indexes.get(ENTRIES_DIR)
+    if index is not None and _is_current(index, dir_mtime):
+        return index
+
+    index = _read_index_file(dir_mtime)
+    if index is None:
+        index = {"entries": _scan_entries()}
+        index["names"] = sorted(index["entries"])
+        _write_index(index)
+    else:
+        index["names"] = sorted(index["entries"])
+        index["dir_mtime"] = dir_mtime
+        index["index_mtime"] = _index_mtime()
+    _indexes[ENTRIES_DIR] = index
+    return index
+
+def _index_add(index: dict, filepath: Path) -> None:
+    """Adds (or refreshes) an entry file in the index and persists it; called inside _index_locked()."""
+    with _index_lock:
+        if filepath.name not in index["entries"]:
+            bisect.insort(index["names"], filepath.name)
+        index["entries"][filepath.name] = _index_record(filepath.name, filepath.stat())
+        _write_index(index)
+
+def _index_remove(index: dict, filepath: Path) -> None:
+    """Removes an entry file from the index and persists it; called inside _index_locked()."""
+    with _index_lock:
+        if index["entries"].pop(filepath.name, None) is not None:
+            i = bisect.bisect_left(index["names"], filepath.name)
+            if i < len(index["names"]) and index["names"][i] == filepath.name:
+                del index["names"][i]
+        _write_index(index)
+
+def refresh_entries(names) -> dict[str, dict | None]:
+    """
+    Brings the index up to date for entry files reported as changed (e.g. by
+    core.watcher), stat'ing only those files instead of rescanning ENTRIES_DIR.
+    Returns the current index record of each name, or None if it is not (or
+    no longer) an entry.
+    """
+    names = set(names)
+    # A plain entry appearing or disappearing decides whether its encrypted copy is listed
+    names |= {name + ".gpg" for name in names if name.endswith(ENTRY_SUFFIX)}
+    with locking.file_lock(ENTRIES_DIR), _index_lock:
+        index = _indexes.get(ENTRIES_DIR)
+        if index is None:
+            # Nothing loaded yet: this first load is the only full scan
+            index = _refresh_index()
+            return {name: index["entries"].get(name) for name in names}
+
+        changed = False
+        for name in sorted(names):
+            st = None
+            if name.endswith((ENTRY_SUFFIX, ENCRYPTED_SUFFIX)) and not name.startswith("."):
+                try:
+                    st = (ENTRIES_DIR / name).stat()
+                except OSError:
+                    pass
+            if st is not None and (not stat.S_ISREG(st.st_mode) or
+                                   (is_encrypted(Path(name)) and (ENTRIES_DIR / name.removesuffix(".gpg")).exists())):
+                st = None
+            old = index["entries"].get(name)
+            if st is None:
+                if old is not None:
+                    del index["entries"][name]
+                    del index["names"][bisect.bisect_left(index["names"], name)]
+                    changed = True
+                continue
+            record = _index_record(name, st)
+            if record != old:
+                if old is None:
+                    bisect.insort(index["names"], name)
+                index["entries"][name] = record
+                changed = True
+
+        if changed or index["dir_mtime"] != _stat_mtime(ENTRIES_DIR):
+            _write_index(index)
+        return {name: index["entries"].get(name) for name in names}
+
+def iter_entries(cursor: str | None = None, chunk_size: int = 256):
+    """
+    Yields journal entries one by one, newest first, without building the full list.
+
+    Args:
+        cursor (str | None): Only yield entries older than this one. It may be a
+            filename returned in a previous listing or an ID (prefix).
+        chunk_size (int): How many entries are taken from the index at a time.
+            The position is re-located by binary search for every chunk, so
+            entries created or deleted while iterating don't break the walk.
+    """
+    while True:
+        try:
+            index = _get_index()
+        except OSError:
+            return
+        names = index["names"]
+        end = bisect.bisect_left(names, cursor) if cursor else len(names)
+        if end == 0:
+            return
+        chunk = names[max(0, end - chunk_size):end]
+        for name in reversed(chunk):
+            record = index["entries"].get(name)
+            if record is not None:
+                yield dict(record)
+        cursor = chunk[0]
+
+def get_entries(cursor: str | None = None, limit: int | None = None) -> list[dict]:
+    """
+    Returns a list of journal entries, with newest first.
+    Each entry is a dictionary containing its id, title, filename, mtime and size.
+
+    Args:
+        cursor (str | None): Only return entries older than this filename or ID.
+        limit (int | None): Maximum number of entries; all of them if None.
+    """
+    chunk_size = min(limit, 256) if limit else 256
+    return list(itertools.islice(iter_entries(cursor, chunk_size), limit))
+
+def get_entries_page(cursor: str | None = None, limit: int = PAGE_SIZE) -> dict:
+    """
+    Returns one page of the entry listing, newest first.
+    The cost depends on the page size, not on the size of the journal.
+
+    Returns:
+        dict: {"entries": [...], "cursor": cursor, "next_cursor": filename to
+        pass as the cursor for the following page (None on the last page),
+        "total": number of entries in the journal}.
+    """
+    limit = max(1, int(limit or PAGE_SIZE))
+    entries = get_entries(cursor, limit + 1)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    try:
+        total = len(_get_index()["names"])
     except OSError:
-        return []
+        total = 0
+    return {
+        "entries": entries,
+        "cursor": cursor,
+        "next_cursor": entries[-1]["filename"] if has_more else None,
+        "total": total,
+    }
 
 def find_entry_path(entry_id: str) -> Path | None:
     """
@@ -46,10 +453,16 @@ def find_entry_path(entry_id: str) -> Path | None:
     """
     if not entry_id or not entry_id.strip():
         return None
-    
-    # Use glob to find any file starting with the ID
-    matches = list(ENTRIES_DIR.glob(f"{entry_id}*.md"))
-    return matches[0] if matches else None
+
+    # Binary search for the first filename starting with the ID
+    try:
+        names = _get_index()["names"]
+    except OSError:
+        return None
+    i = bisect.bisect_left(names, entry_id)
+    if i < len(names) and names[i].startswith(entry_id):
+        return ENTRIES_DIR / names[i]
+    return None
 
 def get_entry_content(entry_id: str) -> str | None:
     """
@@ -60,26 +473,342 @@ def get_entry_content(entry_id: str) -> str | None:
     if not filepath:
         return None
     try:
+        return _read_content(filepath)
+    except IOError:
+        return None
+
+def _cache_content(filepath: Path, stamp: tuple, content: str) -> None:
+    with _content_lock:
+        _content_cache[str(filepath)] = (stamp, content)
+        _content_cache.move_to_end(str(filepath))
+        while len(_content_cache) > CONTENT_CACHE_SIZE:
+            _content_cache.popitem(last=False)
+
+def _read_content(filepath: Path) -> str:
+    """
+    Reads an entry's text. Encrypted entries are decrypted in memory and the
+    result is cached until the file changes. Raises IOError on failure.
+    """
+    if not is_encrypted(filepath):
         with open(filepath, "r", encoding="utf-8") as f:
             return f.read()
-    except IOError:
+
+    with open(filepath, "rb") as f:
+        st = os.fstat(f.fileno())
+        stamp = (st.st_mtime_ns, st.st_size)
+        with _content_lock:
+            cached = _content_cache.get(str(filepath))
+            if cached is not None and cached[0] == stamp:
+                _content_cache.move_to_end(str(filepath))
+                return cached[1]
+        data = f.read()
+    from . import crypto
+    result = crypto.decrypt_bytes(data)
+    if result["status"] != "success":
+        raise IOError(result["message"])
+    content = result["data"].decode("utf-8")
+    _cache_content(filepath, stamp, content)
+    return content
+
+def _atomic_write(filepath: Path, data: bytes, expected: tuple | None = None) -> tuple[int, int] | None:
+    """
+    Replaces a file in ENTRIES_DIR with new data, atomically, following
+    FSYNC_POLICY, and records it in the index. Returns the (mtime_ns, size)
+    of the new file, or None without writing anything if `expected` is given
+    and the file no longer has that (mtime_ns, size).
+    """
+    tmp_dir = ENTRIES_DIR / TMP_DIRNAME
+    tmp_dir.mkdir(exist_ok=True)
+    tmp_path = tmp_dir / f"{filepath.name}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            if FSYNC_POLICY in ("file", "full"):
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        with _index_locked() as index:
+            if expected is not None and _file_stamp(filepath) != expected:
+                return None
+            before = _index_stamp(index)
+            os.replace(tmp_path, filepath)
+            # The rename bumps the directory mtime; persisting the record after it
+            # keeps the index newer, so other processes reuse it instead of rescanning
+            if filepath.name in index["entries"]:
+                index["entries"][filepath.name] = _index_record(filepath.name, st)
+                _log_index_record(index, filepath.name)
+            else:
+                _index_add(index, filepath)
+            with _saves_lock:
+                _index_moves[str(filepath)] = (before, _index_stamp(index))
+        if FSYNC_POLICY == "full":
+            dir_fd = os.open(ENTRIES_DIR, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return st.st_mtime_ns, st.st_size
+
+def _write_content(filepath: Path, content: str, expected: tuple | None = None) -> bool | None:
+    """
+    Writes an entry's text atomically. Encrypted entries are encrypted in
+    memory for ENCRYPTION_RECIPIENT before anything is written.
+    Returns False if the write was skipped because the file already holds
+    this content (as last written by us), and None if `expected` is given and
+    the file no longer has that (mtime_ns, size). Raises IOError on failure.
+    """
+    data = content.encode("utf-8")
+    digest = hashlib.sha1(data).digest()
+    last = _last_writes.get(str(filepath))
+    if last is not None and last[1] == digest:
+        try:
+            st = filepath.stat()
+            if (st.st_mtime_ns, st.st_size) == last[0]:
+                with _saves_lock:
+                    _write_stats["unchanged"] += 1
+                return False
+        except OSError:
+            pass
+
+    if is_encrypted(filepath):
+        if not ENCRYPTION_RECIPIENT:
+            raise IOError("nenhum destinatário GPG definido para entradas criptografadas (OFFJOURNAL_GPG_RECIPIENT).")
+        from . import crypto
+        result = crypto.encrypt_bytes(data, ENCRYPTION_RECIPIENT)
+        if result["status"] != "success":
+            raise IOError(result["message"])
+        stamp = _atomic_write(filepath, result["data"], expected)
+        if stamp is None:
+            return None
+        _cache_content(filepath, stamp, content)
+    else:
+        stamp = _atomic_write(filepath, data, expected)
+        if stamp is None:
+            return None
+
+    with _saves_lock:
+        _last_writes[str(filepath)] = (stamp, digest)
+        _write_stats["writes"] += 1
+    return True
+
+def is_own_write(filepath: Path) -> bool:
+    """
+    True if the file is still exactly as our last write left it, so a change
+    noticed on it (e.g. by core.watcher) is our own save, not an outside edit.
+    """
+    with _saves_lock:
+        last = _last_writes.get(str(filepath))
+    return last is not None and _file_stamp(filepath) == last[0]
+
+def _index_move(filepath: Path) -> tuple | None:
+    """
+    (index_stamp() before, index_stamp() after) our last write of the file,
+    both taken under the directory lock: a cache that was in sync with the
+    index before the write is in sync after it once it has applied the write.
+    """
+    with _saves_lock:
+        return _index_moves.get(str(filepath))
+
+def count_coalesced_save() -> None:
+    """
+    Counts a save that a caller dropped before it reached core because a
+    newer save of the same entry replaced it (e.g. the GUI's dispatcher
+    coalescing autosaves), so get_write_stats() covers it too.
+    """
+    with _saves_lock:
+        _write_stats["coalesced"] += 1
+
+def get_write_stats() -> dict:
+    """
+    Returns counters of entry writes: "writes" made, and writes avoided
+    because a newer save overtook them ("coalesced", here or in a caller,
+    see count_coalesced_save()) or the content had not changed ("unchanged").
+    """
+    with _saves_lock:
+        return dict(_write_stats)
+
+def _search_body(filepath: Path, content: str) -> str:
+    """Text to put in the search index: encrypted entries only have their title indexed."""
+    return "" if is_encrypted(filepath) else content
+
+def _file_stamp(filepath: Path) -> tuple | None:
+    try:
+        st = filepath.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
         return None
 
+def _document_version(document: dict) -> str:
+    return f"{document['epoch']}:{document['version']}"
+
+def _set_document(filepath: Path, content: str, stamp: tuple | None = None) -> str:
+    """
+    Records the latest content of an entry and returns its version. The version
+    number grows by one per change; a document that was not in memory starts a
+    new epoch, so versions handed out before it was evicted never match again.
+    """
+    with _documents_lock:
+        document = _documents.get(str(filepath))
+        if document is None:
+            document = _documents[str(filepath)] = {
+                "epoch": os.urandom(4).hex(), "version": 0, "content": content, "stamp": stamp}
+        elif document["content"] != content:
+            document["version"] += 1
+            document["content"] = content
+        if stamp is not None:
+            document["stamp"] = stamp
+        _documents.move_to_end(str(filepath))
+        while len(_documents) > DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+        return _document_version(document)
+
+def _forget_document(filepath: Path) -> None:
+    with _documents_lock:
+        _documents.pop(str(filepath), None)
+
+def get_entry_document(entry_id: str) -> dict:
+    """
+    Returns the content of an entry together with its version, the base to
+    send along with patch_entry_content().
+    """
+    filepath = find_entry_path(entry_id)
+    if not filepath:
+        return {"status": "error", "message": "Entrada não encontrada."}
+    stamp = _file_stamp(filepath)
+    with _documents_lock:
+        document = _documents.get(str(filepath))
+        if document is not None and document["stamp"] == stamp:
+            return {"status": "success", "content": document["content"], "version": _document_version(document)}
+    try:
+        content = _read_content(filepath)
+    except IOError as e:
+        return {"status": "error", "message": f"Falha ao ler a entrada: {e}"}
+    # Changed from outside (or never seen): start over from what's on disk
+    _forget_document(filepath)
+    return {"status": "success", "content": content, "version": _set_document(filepath, content, stamp)}
+
+def _apply_patches(content: str, patches: list) -> str:
+    """
+    Applies text patches {"start", "end", "text"} one after the other. Offsets
+    are in UTF-16 code units, as JavaScript string indices are; raises
+    ValueError on an invalid patch.
+    """
+    units = content.encode("utf-16-le")
+    for patch in patches:
+        start, end = int(patch["start"]), int(patch["end"])
+        if not 0 <= start <= end <= len(units) // 2:
+            raise ValueError(f"intervalo inválido: {start}-{end}")
+        units = units[:2 * start] + str(patch.get("text", "")).encode("utf-16-le") + units[2 * end:]
+    # Fails if a patch splits a surrogate pair
+    return units.decode("utf-16-le")
+
+def _save_content(filepath: Path, new_content: str, check_stamp: bool = False) -> dict:
+    """
+    Writes an entry's new content, coalescing overlapping saves of the same
+    entry, and keeps the index, search index and mood cache in sync.
+    With check_stamp, nothing is written if the file was changed from outside
+    since its in-memory document was read (or last written by us).
+    """
+    with _saves_lock:
+        slot = _save_slots.setdefault(str(filepath), {"seq": 0, "lock": threading.Lock()})
+        slot["seq"] += 1
+        seq = slot["seq"]
+    if SAVE_COALESCE_WINDOW > 0:
+        time.sleep(SAVE_COALESCE_WINDOW)
+
+    with slot["lock"]:
+        with _saves_lock:
+            if slot["seq"] != seq:
+                # A newer save of this entry arrived meanwhile; it writes the latest content
+                _write_stats["coalesced"] += 1
+                return {"status": "success", "message": "Entrada salva com sucesso.", "coalesced": True}
+        expected = None
+        if check_stamp:
+            with _documents_lock:
+                document = _documents.get(str(filepath))
+                expected = document["stamp"] if document is not None else None
+        try:
+            written = _write_content(filepath, new_content, expected)
+            if written is None:
+                _forget_document(filepath)
+                return {"status": "error", "conflict": True, "message": CONFLICT_MESSAGE}
+            with _documents_lock:
+                document = _documents.get(str(filepath))
+                if document is not None:
+                    # The file holds our write: later patches must not take it for an outside change
+                    document["stamp"] = _last_writes[str(filepath)][0]
+            if not written:
+                return {"status": "success", "message": "Entrada salva com sucesso.", "unchanged": True}
+            from . import mood, search
+            search.index_entry(filepath, _search_body(filepath, new_content))
+            mood.update_cached_mood(filepath, _last_writes[str(filepath)][0], new_content, _index_move(filepath))
+            return {"status": "success", "message": "Entrada salva com sucesso."}
+        except IOError as e:
+            _forget_document(filepath)
+            return {"status": "error", "message": f"Falha ao escrever no arquivo: {e}"}
+
 def update_entry_content(entry_id: str, new_content: str) -> dict:
     """
     Updates the content of an existing journal entry.
-    Returns a dictionary with the status of the operation.
+    Returns a dictionary with the status of the operation and the new "version".
     """
     filepath = find_entry_path(entry_id)
     if not filepath:
         return {"status": "error", "message": "Entry not found."}
 
-    try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(new_content)
-        return {"status": "success", "message": "Entrada salva com sucesso."}
-    except IOError as e:
-        return {"status": "error", "message": f"Falha ao escrever no arquivo: {e}"}
+    with _documents_lock:
+        document = _documents.get(str(filepath))
+        if document is not None and document["stamp"] != _file_stamp(filepath) and document["content"] != new_content:
+            # Changed from outside since it was cached: this full text replaces it
+            _documents.pop(str(filepath))
+    version = _set_document(filepath, new_content)
+    result = _save_content(filepath, new_content)
+    if result["status"] == "success":
+        result["version"] = version
+    return result
+
+def patch_entry_content(entry_id: str, base_version: str, patches: list) -> dict:
+    """
+    Updates an entry by applying text patches to its in-memory content.
+
+    Args:
+        entry_id (str): Identifier of the journal entry.
+        base_version (str): Version the patches were made against, as returned
+            by get_entry_document(), update_entry_content() or a previous patch.
+        patches (list): Patches {"start", "end", "text"} replacing the range
+            start..end (UTF-16 code units) with text, applied in order.
+
+    Returns:
+        dict: A status dictionary with the new "version". If the entry is not at
+        base_version (e.g. it was edited from outside, or evicted from memory),
+        nothing is written and the error has "conflict": True; the caller should
+        then send the full text with update_entry_content().
+    """
+    filepath = find_entry_path(entry_id)
+    if not filepath:
+        return {"status": "error", "message": "Entrada não encontrada."}
+
+    stamp = _file_stamp(filepath)
+    with _documents_lock:
+        document = _documents.get(str(filepath))
+        if document is None or _document_version(document) != base_version or document["stamp"] != stamp:
+            return {"status": "error", "conflict": True, "message": CONFLICT_MESSAGE}
+        try:
+            new_content = _apply_patches(document["content"], patches)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"status": "error", "message": f"Alteração inválida: {e}"}
+        document["version"] += 1
+        document["content"] = new_content
+        _documents.move_to_end(str(filepath))
+        version = _document_version(document)
+
+    # Checked again right before the write, in case another process saves the entry meanwhile
+    result = _save_content(filepath, new_content, check_stamp=True)
+    if result["status"] == "success":
+        result["version"] = version
+    return result
 
 def create_entry(title: str) -> dict:
     """
@@ -91,15 +820,22 @@ def create_entry(title: str) -> dict:
 
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     safe_title = "_".join(title.strip().split())
-    filename = f"{timestamp}_{safe_title}.md"
+    filename = f"{timestamp}_{safe_title}{ENCRYPTED_SUFFIX if ENCRYPTION_RECIPIENT else ENTRY_SUFFIX}"
     filepath = ENTRIES_DIR / filename
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"# {title.strip()}\n\n")
-            f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("Escreva seus pensamentos aqui...\n")
-        
+        content = (
+            f"# {title.strip()}\n\n"
+            f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            "Escreva seus pensamentos aqui...\n"
+        )
+        ENTRIES_DIR.mkdir(parents=True, exist_ok=True)
+        # The new file is added to the index as it is renamed into place
+        _write_content(filepath, content)
+        from . import mood, search
+        search.index_entry(filepath, _search_body(filepath, content))
+        mood.update_cached_mood(filepath, _last_writes[str(filepath)][0], content, _index_move(filepath))
+
         return {
             "status": "success",
             "data": _parse_filename(filepath)
@@ -117,7 +853,53 @@ def delete_entry(entry_id: str) -> dict:
         return {"status": "error", "message": "Entrada não encontrada."}
     
     try:
-        filepath.unlink()
+        with _index_locked() as index:
+            before = _index_stamp(index)
+            filepath.unlink()
+            _index_remove(index, filepath)
+            index_move = (before, _index_stamp(index))
+        from . import mood, search
+        search.remove_entry(filepath)
+        mood.forget_cached_mood(filepath, index_move)
+        with _content_lock:
+            _content_cache.pop(str(filepath), None)
+        with _saves_lock:
+            _last_writes.pop(str(filepath), None)
+            _index_moves.pop(str(filepath), None)
+        _forget_document(filepath)
         return {"status": "success", "message": "Entrada excluída com sucesso."}
     except OSError as e:
         return {"status": "error", "message": f"Falha ao excluir a entrada: {e}"}
+
+def encrypt_entry(entry_id: str) -> dict:
+    """
+    Converts a plain entry into an encrypted-at-rest one for ENCRYPTION_RECIPIENT.
+    The ciphertext is written first and the plain file is removed afterwards;
+    no other copy of the plaintext is written.
+    Returns a dictionary with status and the new entry data.
+    """
+    filepath = find_entry_path(entry_id)
+    if not filepath:
+        return {"status": "error", "message": "Entrada não encontrada."}
+    if is_encrypted(filepath):
+        return {"status": "error", "message": "A entrada já está criptografada."}
+
+    encrypted_path = filepath.with_name(filepath.name.removesuffix(ENTRY_SUFFIX) + ENCRYPTED_SUFFIX)
+    try:
+        content = _read_content(filepath)
+        _write_content(encrypted_path, content)
+        with _index_locked() as index:
+            before = _index_stamp(index)
+            filepath.unlink()
+            _index_remove(index, filepath)
+            index_move = (before, _index_stamp(index))
+        _forget_document(filepath)
+        from . import mood, search
+        search.remove_entry(filepath)
+        search.index_entry(encrypted_path, "")
+        mood.update_cached_mood(encrypted_path, _last_writes[str(encrypted_path)][0], content,
+                                _index_move(encrypted_path))
+        mood.forget_cached_mood(filepath, index_move)
+        return {"status": "success", "data": _parse_filename(encrypted_path)}
+    except IOError as e:
+        return {"status": "error", "message": f"Falha ao criptografar a entrada: {e}"}
@@ -5,11 +5,52 @@ Export module for offjournal.
 Provides functionality to export journal entries to various formats:
 TXT, Markdown (MD), and JSON.
 Functions return a dictionary indicating the operation's status.
+
+export_journal() writes a whole journal (optionally a date range, and the
+media attachments) to a single .zip, .tar.gz, JSON Lines or Markdown file.
+Entries are copied in fixed-size chunks, so memory use doesn't depend on
+the size of the entries or of the journal.
+
+export_incremental() mirrors the journal into a backup directory and keeps a
+manifest there, so repeated runs only write the entries that were added or
+changed and remove the ones that were deleted since the last run.
 """
 
+import hashlib
+import io
 import json
+import os
+import shutil
+import tarfile
+import zipfile
+from datetime import datetime
 from pathlib import Path
 
+from . import entry, media
+
+# Size of the chunks entries are copied in
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Formats accepted by export_journal()
+JOURNAL_FORMATS = ("zip", "tar.gz", "jsonl", "md")
+
+# Manifest of an incremental export target: entry filename -> mtime_ns, size, sha256
+MANIFEST_FILENAME = ".offjournal-export.json"
+MANIFEST_VERSION = 1
+
+def _copy_chunks(src, dst) -> None:
+    """Copies a file object to another one chunk by chunk."""
+    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+def _write_json_string(src, dst) -> None:
+    """
+    Writes the text of `src` to `dst` as the body of a JSON string (without
+    the quotes), one chunk at a time. Escaping works character by character,
+    so the escaped chunks join into the same string json.dumps would produce.
+    """
+    while chunk := src.read(COPY_CHUNK_SIZE):
+        dst.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+
 def _copy_text(input_file: str, output_file: str) -> dict:
     """
     Helper function to copy text from one file to another.
@@ -22,7 +63,7 @@ def _copy_text(input_file: str, output_file: str) -> dict:
     try:
         with open(input_path, "r", encoding="utf-8") as src, \
              open(output_file, "w", encoding="utf-8") as dst:
-            dst.write(src.read())
+            _copy_chunks(src, dst)
         return {"status": "success", "message": f"Exportado com sucesso para: {output_file}"}
     except IOError as e:
         return {"status": "error", "message": f"Erro de E/S ao exportar: {e}"}
@@ -69,20 +110,240 @@ def export_to_json(input_file: str, output_file: str) -> dict:
         return {"status": "error", "message": f"Arquivo de entrada não encontrado: {input_file}"}
 
     try:
-        with open(input_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        data = {
-            "source_filename": input_path.name,
-            "export_format": "json",
-            "content": content
-        }
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
+        # Same document as json.dump(..., indent=2), with the content streamed in
+        with open(input_path, "r", encoding="utf-8") as src, \
+             open(output_file, "w", encoding="utf-8") as dst:
+            dst.write("{\n")
+            dst.write(f'  "source_filename": {json.dumps(input_path.name, ensure_ascii=False)},\n')
+            dst.write('  "export_format": "json",\n')
+            dst.write('  "content": "')
+            _write_json_string(src, dst)
+            dst.write('"\n}')
+
         return {"status": "success", "message": f"Exportado para JSON com sucesso: {output_file}"}
     except IOError as e:
         return {"status": "error", "message": f"Erro de E/S ao exportar para JSON: {e}"}
     except TypeError as e:
         return {"status": "error", "message": f"Erro ao serializar para JSON: {e}"}
+
+def _date_key(value: str | None, name: str) -> str | None:
+    """Turns an AAAA-MM-DD bound into the AAAAMMDD prefix of entry IDs; raises ValueError if invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y%m%d")
+    except (ValueError, TypeError):
+        raise ValueError(f"Data {name} inválida: '{value}'. Use AAAA-MM-DD.")
+
+def _select_entries(start: str | None, end: str | None) -> list[dict]:
+    """Index records of the entries inside the date range, oldest first."""
+    first, last = _date_key(start, "inicial"), _date_key(end, "final")
+    selected = []
+    for record in entry.iter_entries():
+        day = record["id"][:8]
+        if last and day > last:
+            continue
+        if first and day < first:
+            break  # Newest first: everything after this is older
+        selected.append(record)
+    selected.reverse()
+    return selected
+
+def _open_entry_text(record: dict):
+    """Opens an entry for reading as text; encrypted entries are decrypted in memory."""
+    path = entry.ENTRIES_DIR / record["filename"]
+    if entry.is_encrypted(path):
+        return io.StringIO(entry._read_content(path))
+    return open(path, "r", encoding="utf-8")
+
+def _media_files(records: list[dict]):
+    """Yields (stored file, archive name) for the media attached to the given entries."""
+    for record in records:
+        for name in media.list_media(record["id"]).get("data", []):
+            path = media.media_path(record["id"], name)
+            if path is not None:
+                yield path, f"media/{record['id']}/{name}"
+
+def _write_zip(output: Path, records: list[dict], include_media: bool) -> None:
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for record in records:
+            # ZipFile.write streams the file into the archive
+            archive.write(entry.ENTRIES_DIR / record["filename"], f"entries/{record['filename']}")
+        if include_media:
+            for path, name in _media_files(records):
+                archive.write(path, name)
+
+def _write_tar(output: Path, records: list[dict], include_media: bool) -> None:
+    with tarfile.open(output, "w:gz") as archive:
+        for record in records:
+            archive.add(entry.ENTRIES_DIR / record["filename"], f"entries/{record['filename']}")
+        if include_media:
+            for path, name in _media_files(records):
+                archive.add(path, name)
+
+def _write_jsonl(output: Path, records: list[dict]) -> None:
+    with open(output, "w", encoding="utf-8") as dst:
+        for record in records:
+            header = {"id": record["id"], "title": record["title"], "filename": record["filename"]}
+            dst.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "content": "')
+            with _open_entry_text(record) as src:
+                _write_json_string(src, dst)
+            dst.write('"}\n')
+
+def _write_markdown(output: Path, records: list[dict]) -> None:
+    with open(output, "w", encoding="utf-8") as dst:
+        for i, record in enumerate(records):
+            if i:
+                dst.write("\n\n---\n\n")
+            dst.write(f"<!-- {record['filename']} -->\n\n")
+            with _open_entry_text(record) as src:
+                _copy_chunks(src, dst)
+
+def export_journal(format: str, output: str, start: str | None = None, end: str | None = None,
+                   include_media: bool = False) -> dict:
+    """
+    Exports every journal entry (or those of a date range) to a single file.
+
+    Args:
+        format (str): "zip" or "tar.gz" (entry files under entries/, media
+            under media/<id>/), "jsonl" (one JSON object per entry) or "md"
+            (all entries in one Markdown file, oldest first).
+        output (str): Destination file path.
+        start (str | None): First day to include, AAAA-MM-DD.
+        end (str | None): Last day to include, AAAA-MM-DD.
+        include_media (bool): Also export the media attachments (archives only).
+
+    Returns:
+        dict: A status dictionary with the number of exported entries in "count".
+    """
+    if format not in JOURNAL_FORMATS:
+        return {"status": "error", "message": f"Formato de exportação inválido: '{format}'. "
+                                              f"Use {', '.join(JOURNAL_FORMATS)}."}
+    if include_media and format not in ("zip", "tar.gz"):
+        return {"status": "error", "message": "Mídias só podem ser exportadas nos formatos zip e tar.gz."}
+    try:
+        records = _select_entries(start, end)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    output_path = Path(output)
+    # Written under a temporary name, so an interrupted export never leaves a truncated file
+    partial_path = output_path.with_name(output_path.name + ".part")
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if format == "zip":
+            _write_zip(partial_path, records, include_media)
+        elif format == "tar.gz":
+            _write_tar(partial_path, records, include_media)
+        elif format == "jsonl":
+            _write_jsonl(partial_path, records)
+        else:
+            _write_markdown(partial_path, records)
+        os.replace(partial_path, output_path)
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+        partial_path.unlink(missing_ok=True)
+        return {"status": "error", "message": f"Erro de E/S ao exportar o diário: {e}"}
+
+    return {"status": "success", "message": f"{len(records)} entradas exportadas para: {output}",
+            "count": len(records), "output_path": str(output_path)}
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _load_manifest(target: Path) -> dict[str, dict]:
+    """Loads the manifest of a previous export; an empty one if missing or unreadable."""
+    try:
+        with open(target / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("entries", {})
+
+def _replace_file(path: Path, write) -> None:
+    """Writes a file under a temporary name and renames it into place."""
+    partial_path = path.with_name(path.name + ".part")
+    try:
+        write(partial_path)
+        os.replace(partial_path, path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+
+def _save_manifest(target: Path, manifest: dict[str, dict]) -> None:
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": manifest}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+    _replace_file(target / MANIFEST_FILENAME, write)
+
+def export_incremental(target_dir: str, start: str | None = None, end: str | None = None) -> dict:
+    """
+    Mirrors the journal entries into a backup directory, writing only what changed.
+
+    The target keeps a manifest of every exported entry file with its mtime,
+    size and SHA-256. Unchanged entries (same mtime and size) are skipped
+    without being read; entries that were only touched are hashed but not
+    copied; entries that disappeared from the journal (or from the date
+    range) are removed from the target.
+
+    Args:
+        target_dir (str): Backup directory; created if it doesn't exist.
+        start (str | None): First day to include, AAAA-MM-DD.
+        end (str | None): Last day to include, AAAA-MM-DD.
+
+    Returns:
+        dict: A status dictionary with the counts of "added", "updated",
+        "deleted" and "unchanged" entries in "summary".
+    """
+    try:
+        records = _select_entries(start, end)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    target = Path(target_dir)
+    summary = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    try:
+        target.mkdir(parents=True, exist_ok=True)
+        old_manifest = _load_manifest(target)
+        manifest = {}
+        for record in records:
+            name = record["filename"]
+            source = entry.ENTRIES_DIR / name
+            st = source.stat()
+            previous = old_manifest.get(name)
+            exported = target / name
+            if previous and (previous["mtime_ns"], previous["size"]) == (st.st_mtime_ns, st.st_size) \
+                    and exported.exists():
+                manifest[name] = previous
+                summary["unchanged"] += 1
+                continue
+
+            digest = _file_sha256(source)
+            if previous and previous["sha256"] == digest and exported.exists():
+                summary["unchanged"] += 1
+            else:
+                def write(path, source=source):
+                    with open(source, "rb") as src, open(path, "wb") as dst:
+                        _copy_chunks(src, dst)
+                _replace_file(exported, write)
+                shutil.copystat(source, exported)
+                summary["updated" if previous else "added"] += 1
+            manifest[name] = {"id": record["id"], "mtime_ns": st.st_mtime_ns,
+                              "size": st.st_size, "sha256": digest}
+
+        for name in old_manifest.keys() - manifest.keys():
+            if Path(name).name == name:  # Never follow a path out of the target
+                (target / name).unlink(missing_ok=True)
+                summary["deleted"] += 1
+        _save_manifest(target, manifest)
+    except OSError as e:
+        return {"status": "error", "message": f"Erro de E/S na exportação incremental: {e}", "summary": summary}
+
+    return {"status": "success", "summary": summary,
+            "message": f"Exportação incremental concluída: {summary['added']} novas, {summary['updated']} "
+                       f"alteradas, {summary['deleted']} removidas, {summary['unchanged']} sem alterações."}
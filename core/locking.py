@@ -0,0 +1,108 @@
+# core/locking.py
+"""
+Inter-process locking for offjournal.
+
+The CLI and the GUI may run at the same time, and both read, change and
+write the same files. file_lock() serializes those read-modify-write
+sequences across processes with an advisory fcntl.flock() lock, and across
+threads of the same process with an ordinary lock.
+
+The lock is taken on an existing path, usually the directory the data lives
+in, so no lock file has to be created (which would change the directory's
+mtime, something the entry index relies on). A path that doesn't exist yet
+holds no data to protect, and is not locked.
+
+Waiting is bounded: the lock is retried with a growing pause (starting at
+LOCK_RETRY_DELAY, at most LOCK_RETRY_MAX_DELAY) until LOCK_TIMEOUT seconds
+have passed, and then TimeoutError is raised. Locks are re-entrant within a
+thread. Where fcntl is not available (Windows), only threads are serialized.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Seconds to wait for a lock held by another process before giving up
+LOCK_TIMEOUT = 10.0
+
+# First and longest pause between two attempts to take a busy lock, in seconds
+LOCK_RETRY_DELAY = 0.001
+LOCK_RETRY_MAX_DELAY = 0.05
+
+# Resolved path -> {"lock": RLock, "depth": int, "fd": int | None}
+_locks: dict[str, dict] = {}
+_locks_guard = threading.Lock()
+_lock_stats = {"acquired": 0, "contended": 0}
+
+
+def _flock(path: Path, deadline: float) -> int | None:
+    """Opens path and takes an exclusive flock on it, retrying until deadline."""
+    if fcntl is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    except FileNotFoundError:
+        return None
+    delay = LOCK_RETRY_DELAY
+    contended = False
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise TimeoutError(f"tempo esgotado aguardando o bloqueio de {path}")
+            contended = True
+            time.sleep(delay)
+            delay = min(delay * 2, LOCK_RETRY_MAX_DELAY)
+        except OSError:
+            os.close(fd)
+            raise
+    with _locks_guard:
+        _lock_stats["acquired"] += 1
+        _lock_stats["contended"] += contended
+    return fd
+
+@contextmanager
+def file_lock(path: Path, timeout: float | None = None):
+    """
+    Holds an exclusive lock on path (a file or a directory) for the duration
+    of the with block. Raises TimeoutError (an OSError) if it can't be taken
+    within timeout seconds (default: LOCK_TIMEOUT).
+    """
+    deadline = time.monotonic() + (LOCK_TIMEOUT if timeout is None else timeout)
+    key = os.path.abspath(path)
+    with _locks_guard:
+        state = _locks.setdefault(key, {"lock": threading.RLock(), "depth": 0, "fd": None})
+    if not state["lock"].acquire(timeout=max(0.0, deadline - time.monotonic())):
+        raise TimeoutError(f"tempo esgotado aguardando o bloqueio de {path}")
+    try:
+        if state["depth"] == 0:
+            state["fd"] = _flock(Path(path), deadline)
+        state["depth"] += 1
+        try:
+            yield
+        finally:
+            state["depth"] -= 1
+            if state["depth"] == 0 and state["fd"] is not None:
+                # Closing the descriptor releases the flock
+                os.close(state["fd"])
+                state["fd"] = None
+    finally:
+        state["lock"].release()
+
+def get_lock_stats() -> dict:
+    """
+    Returns counters of inter-process locks: how many were "acquired", and how
+    many of those were "contended" (held by another process at first).
+    """
+    with _locks_guard:
+        return dict(_lock_stats)
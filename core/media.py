@@ -4,14 +4,254 @@ Media management module for offjournal.
 
 Handles adding, listing, and removing media attachments linked to journal entries.
 All functions return structured data.
+
+Attachments are kept in a content-addressed store: each distinct file is
+stored once under MEDIA_DIR/.blobs/, named after its SHA-256, and entries
+only hold references to it (MEDIA_DIR/.media.db). Attaching the same photo
+to ten entries stores it once; a blob is deleted when its last reference
+is removed. Media folders from the old per-entry layout
+(MEDIA_DIR/<entry_id>/<file>) are moved into the store the first time it
+is opened.
+
+The reference database doubles as a metadata index (name, size, MIME type,
+hash and mtime of every attachment), kept up to date by add_media and
+remove_media, so listings and per-entry counts never walk the filesystem.
+
+The CLI and the GUI may attach and remove media at the same time, so every
+change to the references and to the blobs they count (attaching, detaching,
+deleting unreferenced blobs, migrating old folders) holds MEDIA_DIR locked
+with locking.file_lock(); reads go through the database alone.
 """
 
+import errno
+import hashlib
+import mimetypes
+import os
 import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
-# Base directory for all media attachments, organized by entry ID
+from . import locking
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+# Base directory for all media attachments (created when first used)
 MEDIA_DIR = Path.home() / ".offjournal" / "media"
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+
+BLOBS_DIRNAME = ".blobs"
+MEDIA_DB_FILENAME = ".media.db"
+
+# Size of the chunks files are hashed and copied in
+CHUNK_SIZE = 1024 * 1024
+
+# ioctl that makes a copy-on-write clone of a file (Linux: Btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    entry_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    mime TEXT NOT NULL DEFAULT '',
+    mtime REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (entry_id, name)
+);
+CREATE INDEX IF NOT EXISTS attachments_by_blob ON attachments (sha256);
+"""
+
+# Open reference databases, keyed by media directory (the tests point MEDIA_DIR elsewhere).
+# The lock serializes access from GUI worker threads; other processes are kept
+# out by the directory lock (see _media_locked), always taken first.
+_connections: dict[Path, sqlite3.Connection] = {}
+_lock = threading.RLock()
+
+# Largest number of IDs bound in one "IN (...)" query
+_QUERY_CHUNK = 500
+
+
+def _blob_path(digest: str) -> Path:
+    """Path of a blob in the store (two-character fan-out keeps directories small)."""
+    return MEDIA_DIR / BLOBS_DIRNAME / digest[:2] / digest
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _clone_file(source: Path, destination: Path) -> None:
+    """
+    Copies a file as cheaply as the filesystem allows: a copy-on-write clone
+    (FICLONE), then an in-kernel copy (copy_file_range), then a plain copy.
+    The copy never shares data with the source that later writes could change.
+    """
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+def _store_blob(source: Path, digest: str, move: bool = False) -> None:
+    """
+    Puts a file into the store under its hash, unless it is already there.
+    With move=True the source is hard-linked (or renamed) into place instead
+    of copied, which is only safe for files the store owns (the migration).
+    """
+    blob = _blob_path(digest)
+    if blob.exists():
+        return
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    if move:
+        try:
+            os.link(source, blob)
+            return
+        except OSError:
+            pass
+    # Copy under a temporary name so a partial blob never has a valid hash name
+    fd, tmp_name = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        _clone_file(source, Path(tmp_name))
+        shutil.copystat(source, tmp_name)
+        os.replace(tmp_name, blob)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+
+def _release_blob(conn: sqlite3.Connection, digest: str) -> None:
+    """Deletes a blob once no attachment refers to it any more."""
+    if conn.execute("SELECT 1 FROM attachments WHERE sha256 = ? LIMIT 1", (digest,)).fetchone() is None:
+        _blob_path(digest).unlink(missing_ok=True)
+
+def _mime_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+def _insert_attachment(conn: sqlite3.Connection, entry_id: str, name: str, digest: str,
+                       st: os.stat_result, replace: bool = False) -> None:
+    """Records an attachment and its metadata (inside the caller's transaction)."""
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    conn.execute(f"{verb} INTO attachments (entry_id, name, sha256, size, mime, mtime) VALUES (?, ?, ?, ?, ?, ?)",
+                 (entry_id, name, digest, st.st_size, _mime_type(name), st.st_mtime))
+
+def _add_metadata_columns(conn: sqlite3.Connection) -> None:
+    """Upgrades a reference database created before the metadata columns existed."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(attachments)")}
+    if "mime" in columns:
+        return
+    with conn:
+        conn.execute("ALTER TABLE attachments ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+        conn.execute("ALTER TABLE attachments ADD COLUMN mime TEXT NOT NULL DEFAULT ''")
+        conn.execute("ALTER TABLE attachments ADD COLUMN mtime REAL NOT NULL DEFAULT 0")
+        for entry_id, name, digest in conn.execute("SELECT entry_id, name, sha256 FROM attachments").fetchall():
+            try:
+                st = _blob_path(digest).stat()
+            except OSError:
+                continue
+            conn.execute("UPDATE attachments SET size = ?, mime = ?, mtime = ? WHERE entry_id = ? AND name = ?",
+                         (st.st_size, _mime_type(name), st.st_mtime, entry_id, name))
+
+def _migrate_entry_folders(conn: sqlite3.Connection) -> None:
+    """Moves media from the old MEDIA_DIR/<entry_id>/<file> layout into the store."""
+    for folder in sorted(MEDIA_DIR.iterdir()):
+        if folder.name.startswith(".") or not folder.is_dir():
+            continue
+        for item in sorted(folder.iterdir()):
+            if not item.is_file():
+                continue
+            digest = _file_sha256(item)
+            st = item.stat()
+            _store_blob(item, digest, move=True)
+            with conn:
+                _insert_attachment(conn, folder.name, item.name, digest, st, replace=True)
+            item.unlink()
+        try:
+            folder.rmdir()
+        except OSError:
+            pass  # Not empty (e.g. subfolders): left as it was
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Returns the reference database of the current MEDIA_DIR; must be called
+    with _lock held, and with the directory lock too if it may not be open yet.
+    """
+    db_path = MEDIA_DIR / MEDIA_DB_FILENAME
+    conn = _connections.get(MEDIA_DIR)
+    if conn is not None and not db_path.exists():
+        # The database was deleted from under us; start over.
+        conn.close()
+        conn = None
+    if conn is None:
+        MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.executescript(_SCHEMA)
+        _add_metadata_columns(conn)
+        if conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone() is None:
+            _migrate_entry_folders(conn)
+            with conn:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('layout', 'blobs')")
+        _connections[MEDIA_DIR] = conn
+    return conn
+
+@contextmanager
+def _media_locked():
+    """
+    Holds MEDIA_DIR locked against other processes, then threads, and yields
+    the reference database (opening, and if needed migrating, it).
+    """
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    with locking.file_lock(MEDIA_DIR), _lock:
+        yield _get_conn()
+
+def _open_conn() -> None:
+    """Opens the reference database under the directory lock if it isn't open yet, for readers."""
+    if MEDIA_DIR not in _connections or not (MEDIA_DIR / MEDIA_DB_FILENAME).exists():
+        with _media_locked():
+            pass
+
+def media_path(entry_id: str, media_filename: str) -> Path | None:
+    """
+    Returns the path of the stored file of an attachment, or None if the
+    entry has no attachment with that name. The file must not be modified.
+    """
+    try:
+        _open_conn()
+        with _lock:
+            row = _get_conn().execute("SELECT sha256 FROM attachments WHERE entry_id = ? AND name = ?",
+                                      (entry_id, media_filename)).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    return _blob_path(row[0]) if row else None
 
 def add_media(entry_id: str, media_path_str: str) -> dict:
     """
@@ -32,16 +272,20 @@ def add_media(entry_id: str, media_path_str: str) -> dict:
         return {"status": "error", "message": "ID da entrada não pode ser vazio."}
 
     try:
-        dest_dir = MEDIA_DIR / entry_id
-        dest_dir.mkdir(parents=True, exist_ok=True)
+        with _media_locked() as conn:
+            exists = conn.execute("SELECT 1 FROM attachments WHERE entry_id = ? AND name = ?",
+                                  (entry_id, media_file.name)).fetchone()
+            if exists:
+                return {"status": "error", "message": f"Arquivo de mídia '{media_file.name}' já existe para esta entrada."}
 
-        dest_file = dest_dir / media_file.name
-        if dest_file.exists():
-            return {"status": "error", "message": f"Arquivo de mídia '{media_file.name}' já existe para esta entrada."}
-
-        shutil.copy2(media_file, dest_file)
+            # Identical content is stored once; only a new reference is added
+            digest = _file_sha256(media_file)
+            st = media_file.stat()
+            _store_blob(media_file, digest)
+            with conn:
+                _insert_attachment(conn, entry_id, media_file.name, digest, st)
         return {"status": "success", "message": f"Mídia '{media_file.name}' adicionada à entrada '{entry_id}'."}
-    except OSError as e:
+    except (OSError, sqlite3.Error) as e:
         return {"status": "error", "message": f"Falha ao adicionar mídia: {e}"}
 
 def list_media(entry_id: str) -> dict:
@@ -57,20 +301,19 @@ def list_media(entry_id: str) -> dict:
     if not entry_id:
         return {"status": "error", "message": "ID da entrada não pode ser vazio."}
 
-    media_folder = MEDIA_DIR / entry_id
-    if not media_folder.is_dir():
-        # It's not an error if a folder doesn't exist, just means no media
-        return {"status": "success", "data": []}
-
     try:
-        files = [f.name for f in media_folder.iterdir() if f.is_file()]
-        return {"status": "success", "data": sorted(files)}
-    except OSError as e:
+        _open_conn()
+        with _lock:
+            rows = _get_conn().execute("SELECT name FROM attachments WHERE entry_id = ? ORDER BY name",
+                                       (entry_id,)).fetchall()
+        return {"status": "success", "data": [name for name, in rows]}
+    except (OSError, sqlite3.Error) as e:
         return {"status": "error", "message": f"Falha ao listar mídias: {e}"}
 
 def remove_media(entry_id: str, media_filename: str) -> dict:
     """
     Removes a specific media attachment from a journal entry.
+    The stored file is deleted only when no other attachment refers to it.
 
     Args:
         entry_id (str): Identifier of the journal entry.
@@ -82,12 +325,71 @@ def remove_media(entry_id: str, media_filename: str) -> dict:
     if not entry_id or not media_filename:
         return {"status": "error", "message": "ID da entrada e nome da mídia não podem ser vazios."}
 
-    media_file = MEDIA_DIR / entry_id / media_filename
-    if not media_file.exists():
-        return {"status": "error", "message": f"Arquivo de mídia '{media_filename}' não encontrado para a entrada '{entry_id}'."}
-
     try:
-        media_file.unlink()
+        with _media_locked() as conn:
+            row = conn.execute("SELECT sha256 FROM attachments WHERE entry_id = ? AND name = ?",
+                               (entry_id, media_filename)).fetchone()
+            if row is None:
+                return {"status": "error", "message": f"Arquivo de mídia '{media_filename}' não encontrado para a entrada '{entry_id}'."}
+            with conn:
+                conn.execute("DELETE FROM attachments WHERE entry_id = ? AND name = ?", (entry_id, media_filename))
+            _release_blob(conn, row[0])
         return {"status": "success", "message": f"Mídia '{media_filename}' removida com sucesso."}
-    except OSError as e:
+    except (OSError, sqlite3.Error) as e:
         return {"status": "error", "message": f"Falha ao remover mídia: {e}"}
+
+def get_media_info(entry_id: str) -> dict:
+    """
+    Returns the metadata of every attachment of a journal entry, from the index.
+
+    Args:
+        entry_id (str): Identifier of the journal entry.
+
+    Returns:
+        dict: A status dictionary with a list of {"name", "size", "mime",
+        "sha256", "mtime"} dictionaries, sorted by name, in "data".
+    """
+    if not entry_id:
+        return {"status": "error", "message": "ID da entrada não pode ser vazio."}
+
+    try:
+        _open_conn()
+        with _lock:
+            rows = _get_conn().execute(
+                "SELECT name, size, mime, sha256, mtime FROM attachments WHERE entry_id = ? ORDER BY name",
+                (entry_id,)).fetchall()
+    except (OSError, sqlite3.Error) as e:
+        return {"status": "error", "message": f"Falha ao listar mídias: {e}"}
+    return {"status": "success", "data": [
+        {"name": name, "size": size, "mime": mime, "sha256": digest, "mtime": mtime}
+        for name, size, mime, digest, mtime in rows
+    ]}
+
+def media_counts(entry_ids: list[str] | None = None) -> dict:
+    """
+    Counts the attachments of many entries in one query (e.g. for badges in the entry list).
+
+    Args:
+        entry_ids (list[str] | None): Entries to count; every entry with media if None.
+
+    Returns:
+        dict: A status dictionary with {entry_id: count} in "data". Entries
+        without attachments are omitted.
+    """
+    query = "SELECT entry_id, COUNT(*) FROM attachments"
+    counts = {}
+    try:
+        _open_conn()
+        with _lock:
+            conn = _get_conn()
+            if entry_ids is None:
+                counts.update(conn.execute(f"{query} GROUP BY entry_id"))
+            else:
+                ids = list(dict.fromkeys(entry_ids))
+                for i in range(0, len(ids), _QUERY_CHUNK):
+                    chunk = ids[i:i + _QUERY_CHUNK]
+                    placeholders = ", ".join("?" * len(chunk))
+                    counts.update(conn.execute(f"{query} WHERE entry_id IN ({placeholders}) GROUP BY entry_id", chunk))
+    except (OSError, sqlite3.Error) as e:
+        return {"status": "error", "message": f"Falha ao contar mídias: {e}"}
+    return {"status": "success", "data": counts}
@@ -3,24 +3,321 @@
 Mood analysis module for offjournal.
 
 Provides a simple sentiment analysis of journal entries based on keyword matching.
+Each entry is tokenized once on word boundaries and every token is looked up in
+the lexicon, so "bom" no longer matches inside "bomba". Whole journals can be
+analysed in one call, spread over a pool of worker processes.
+
+Entries are looked up through core.entry and its index, in its ENTRIES_DIR.
+Scores are cached in ENTRIES_DIR/.cache/mood.db, keyed by entry filename and
+validated against the file's mtime and size, so analysing an unchanged
+journal again only stats the files and never reads them. core.entry
+re-scores an entry from its new content when it saves it, and drops its
+score when it deletes it.
+
+The same database keeps daily, weekly and monthly mood rollups. Triggers
+update them whenever a score is cached, changed or dropped, so saving one
+entry moves one bucket per period instead of recomputing the history.
+Changes made outside of offjournal are reconciled before the time series is
+read, but only when core.entry's index_stamp() differs from the one the
+cache was last reconciled with; core.entry's own writes carry the cache
+along to the new stamp.
 """
 
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, timedelta
 from pathlib import Path
 
-# This should point to the same directory as in core/entry.py
-ENTRIES_DIR = Path.home() / ".offjournal" / "entries"
+from . import entry
 
 # Simple word lists for positive and negative sentiment
 # (in Portuguese, to match potential user input)
 POSITIVE_WORDS = {"feliz", "alegre", "amor", "animado", "ótimo", "bom", "incrível", "fantástico", "sucesso", "grato", "orgulhoso"}
 NEGATIVE_WORDS = {"triste", "raiva", "chateado", "ruim", "péssimo", "ódio", "deprimido", "terrível", "frustrado", "medo", "ansioso"}
 
-def _find_entry_path(entry_id: str) -> Path | None:
-    """Helper to find an entry path by its ID. Avoids code duplication."""
-    if not entry_id or not entry_id.strip():
+# Token -> +1 (positive) or -1 (negative): one dict lookup per token
+_LEXICON = {**{w: 1 for w in POSITIVE_WORDS}, **{w: -1 for w in NEGATIVE_WORDS}}
+_TOKEN_RE = re.compile(r"\w+")
+
+# Fingerprint of the lexicon; cached scores computed with another lexicon are discarded
+_LEXICON_KEY = hashlib.sha1(repr(sorted(_LEXICON.items())).encode("utf-8")).hexdigest()
+
+# Score cache location, relative to the entries directory
+MOOD_CACHE_DIRNAME = ".cache"
+MOOD_CACHE_FILENAME = "mood.db"
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS moods (
+    filename TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    positive_entries INTEGER NOT NULL,
+    negative_entries INTEGER NOT NULL,
+    neutral_entries INTEGER NOT NULL,
+    PRIMARY KEY (period, bucket)
+);
+"""
+
+# Time-series periods and the SQL expression of the bucket a date falls in:
+# the day itself, the Monday starting its week, or its month (AAAA-MM).
+ROLLUP_PERIODS = {
+    "daily": "{date}",
+    "weekly": "date({date}, '-6 days', 'weekday 1')",
+    "monthly": "substr({date}, 1, 7)",
+}
+ROLLUPS_VERSION = "2"
+
+# Entry IDs are timestamps (AAAAMMDDhhmmss); other files have no date to bucket by
+_DATED_FILENAME = "'[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]*'"
+
+def _entry_date_sql(row: str) -> str:
+    """SQL expression turning a row's filename into its AAAA-MM-DD date."""
+    return (f"substr({row}.filename, 1, 4) || '-' || substr({row}.filename, 5, 2)"
+            f" || '-' || substr({row}.filename, 7, 2)")
+
+def _is_dated_sql(row: str) -> str:
+    """SQL condition: the row's filename starts with a valid date (so it has a bucket in every period)."""
+    return f"{row}.filename GLOB {_DATED_FILENAME} AND date({_entry_date_sql(row)}) IS NOT NULL"
+
+def _rollup_upserts(row: str, sign: str) -> str:
+    """SQL statements adding (sign '+') or removing (sign '-') one score from its buckets."""
+    statements = []
+    for period, bucket in ROLLUP_PERIODS.items():
+        statements.append(f"""
+        INSERT INTO rollups VALUES (
+            '{period}', {bucket.format(date=_entry_date_sql(row))}, {sign}1,
+            {sign}{row}.positive, {sign}{row}.negative,
+            {sign}({row}.positive > {row}.negative), {sign}({row}.negative > {row}.positive),
+            {sign}({row}.positive = {row}.negative)
+        ) ON CONFLICT (period, bucket) DO UPDATE SET
+            entries = entries + excluded.entries,
+            positive = positive + excluded.positive,
+            negative = negative + excluded.negative,
+            positive_entries = positive_entries + excluded.positive_entries,
+            negative_entries = negative_entries + excluded.negative_entries,
+            neutral_entries = neutral_entries + excluded.neutral_entries;""")
+    return "".join(statements)
+
+# Rows whose filename has no valid date (e.g. "20251399...") are cached but not bucketed
+_ROLLUP_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS moods_rollup_insert AFTER INSERT ON moods
+WHEN {_is_dated_sql("NEW")}
+BEGIN {_rollup_upserts("NEW", "+")} END;
+
+CREATE TRIGGER IF NOT EXISTS moods_rollup_delete AFTER DELETE ON moods
+WHEN {_is_dated_sql("OLD")}
+BEGIN {_rollup_upserts("OLD", "-")} END;
+
+CREATE TRIGGER IF NOT EXISTS moods_rollup_update AFTER UPDATE ON moods
+WHEN {_is_dated_sql("NEW")}
+BEGIN {_rollup_upserts("OLD", "-")} {_rollup_upserts("NEW", "+")} END;
+"""
+
+_DROP_ROLLUP_TRIGGERS = """
+DROP TRIGGER IF EXISTS moods_rollup_insert;
+DROP TRIGGER IF EXISTS moods_rollup_delete;
+DROP TRIGGER IF EXISTS moods_rollup_update;
+"""
+
+# Open cache connections, keyed by entries directory
+_caches: dict[Path, sqlite3.Connection] = {}
+_cache_lock = threading.RLock()
+
+# Below this many entries a batch runs in the calling process; starting
+# worker processes would cost more than it saves.
+MIN_PARALLEL_ENTRIES = 200
+
+def _score_text(text: str) -> tuple[int, int]:
+    """Counts positive and negative lexicon words in a text, in a single pass."""
+    positive = negative = 0
+    lexicon = _LEXICON
+    for token in _TOKEN_RE.findall(text.lower()):
+        polarity = lexicon.get(token)
+        if polarity == 1:
+            positive += 1
+        elif polarity == -1:
+            negative += 1
+    return positive, negative
+
+def _mood_result(entry_id: str, filepath: Path, positive_count: int, negative_count: int) -> dict:
+    """Builds the result dictionary for one analysed entry."""
+    mood = "Neutro"
+    if positive_count > negative_count:
+        mood = "Positivo"
+    elif negative_count > positive_count:
+        mood = "Negativo"
+
+    return {
+        "status": "success",
+        "entry_id": entry_id,
+        "filename": filepath.name,
+        "mood": mood,
+        "positive_score": positive_count,
+        "negative_score": negative_count
+    }
+
+def _cache_conn(directory: Path, create: bool = True) -> sqlite3.Connection | None:
+    """
+    Returns the score cache of an entries directory, opening it if needed.
+    With create=False, returns None instead of creating a missing cache.
+    """
+    db_path = directory / MOOD_CACHE_DIRNAME / MOOD_CACHE_FILENAME
+    conn = _caches.get(directory)
+    if conn is not None and not db_path.exists():
+        # The cache was deleted from under us; start over.
+        conn.close()
+        del _caches[directory]
+        conn = None
+    if conn is None:
+        if not create and not db_path.exists():
+            return None
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.executescript(_CACHE_SCHEMA)
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if meta.get("rollups") != ROLLUPS_VERSION:
+            # Triggers of an older version are replaced, and the buckets rebuilt below
+            conn.executescript(_DROP_ROLLUP_TRIGGERS)
+        conn.executescript(_ROLLUP_TRIGGERS)
+        with conn:
+            if meta.get("lexicon") != _LEXICON_KEY:
+                conn.execute("DELETE FROM moods")
+                conn.execute("DELETE FROM meta WHERE key = 'reconciled'")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lexicon', ?)", (_LEXICON_KEY,))
+            if meta.get("rollups") != ROLLUPS_VERSION:
+                _rebuild_rollups(conn)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rollups', ?)", (ROLLUPS_VERSION,))
+        _caches[directory] = conn
+    return conn
+
+def _rebuild_rollups(conn: sqlite3.Connection) -> None:
+    """Recomputes every rollup bucket from the cached scores (e.g. for caches created before rollups)."""
+    conn.execute("DELETE FROM rollups")
+    for period, bucket in ROLLUP_PERIODS.items():
+        conn.execute(f"""
+            INSERT INTO rollups
+            SELECT '{period}', {bucket.format(date=_entry_date_sql("moods"))}, COUNT(*),
+                   SUM(positive), SUM(negative), SUM(positive > negative),
+                   SUM(negative > positive), SUM(positive = negative)
+            FROM moods WHERE {_is_dated_sql("moods")}
+            GROUP BY 2
+        """)
+
+def _cache_lookup(names: list[str]) -> dict[str, tuple]:
+    """Returns cached (mtime_ns, size, positive, negative) rows for the given filenames."""
+    try:
+        with _cache_lock:
+            conn = _cache_conn(entry.ENTRIES_DIR)
+            query = "SELECT filename, mtime_ns, size, positive, negative FROM moods"
+            if len(names) <= 256:
+                # Small batches look up their rows; large ones read the whole table at once
+                placeholders = ", ".join("?" * len(names))
+                rows = conn.execute(f"{query} WHERE filename IN ({placeholders})", names).fetchall()
+            else:
+                rows = conn.execute(query).fetchall()
+    except (sqlite3.Error, OSError):
+        return {}
+    return {name: tuple(rest) for name, *rest in rows}
+
+def _cache_store(rows: list[tuple]) -> None:
+    """Saves (filename, mtime_ns, size, positive, negative) rows in the cache."""
+    if not rows:
+        return
+    try:
+        with _cache_lock:
+            conn = _cache_conn(entry.ENTRIES_DIR)
+            with conn:
+                # An upsert (not INSERT OR REPLACE) so the rollup triggers see an update
+                conn.executemany("""
+                    INSERT INTO moods VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (filename) DO UPDATE SET
+                        mtime_ns = excluded.mtime_ns, size = excluded.size,
+                        positive = excluded.positive, negative = excluded.negative
+                """, rows)
+    except (sqlite3.Error, OSError):
+        # The cache is only an optimization
+        pass
+
+def _stamp_key(stamp: tuple) -> str:
+    """How an entry.index_stamp() is kept in the meta table."""
+    return ":".join(str(part) for part in stamp)
+
+def _change_cache(filepath: Path, change, index_move: tuple | None) -> None:
+    """
+    Applies change(conn) to the cache of the entry's directory, if it exists,
+    in one transaction. index_move is (index stamp before, after) the write
+    core.entry just made: if the cache was reconciled with the stamp before
+    it, it is now reconciled with the stamp after it.
+    """
+    try:
+        with _cache_lock:
+            conn = _cache_conn(filepath.parent, create=False)
+            if conn is None:
+                return
+            with conn:
+                change(conn)
+                if index_move is not None:
+                    conn.execute("UPDATE meta SET value = ? WHERE key = 'reconciled' AND value = ?",
+                                 (_stamp_key(index_move[1]), _stamp_key(index_move[0])))
+    except (sqlite3.Error, OSError):
+        # The cache is only an optimization
+        pass
+
+def update_cached_mood(filepath: Path, stamp: tuple, content: str, index_move: tuple | None = None) -> None:
+    """
+    Re-scores an entry file that core.entry has just written, from the content
+    it wrote, and caches the score under the (mtime_ns, size) of that write.
+    The upsert lets the update trigger move the entry's rollups at once.
+    Encrypted entries are not scored. Does nothing if there is no cache yet.
+    """
+    def change(conn):
+        if not entry.is_encrypted(filepath):
+            conn.execute("""
+                INSERT INTO moods VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (filename) DO UPDATE SET
+                    mtime_ns = excluded.mtime_ns, size = excluded.size,
+                    positive = excluded.positive, negative = excluded.negative
+            """, (filepath.name, *stamp, *_score_text(content)))
+    _change_cache(filepath, change, index_move)
+
+def forget_cached_mood(filepath: Path, index_move: tuple | None = None) -> None:
+    """Drops the cached score (and so the rollup contribution) of an entry file core.entry has deleted."""
+    _change_cache(filepath, lambda conn: conn.execute("DELETE FROM moods WHERE filename = ?", (filepath.name,)),
+                  index_move)
+
+def _analyze_file(entry_id: str, filepath: Path) -> dict:
+    """Reads and scores one entry file."""
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            text = f.read()
+    except IOError as e:
+        return {"status": "error", "entry_id": entry_id,
+                "message": f"Não foi possível ler o arquivo da entrada: {e}"}
+    return _mood_result(entry_id, filepath, *_score_text(text))
+
+def _analyze_chunk(items: list[tuple[str, str]]) -> list[dict]:
+    """Worker-process entry point: scores a chunk of (entry_id, path) pairs."""
+    return [_analyze_file(entry_id, Path(path)) for entry_id, path in items]
+
+def _file_stamp(filepath: Path) -> tuple[int, int] | None:
+    try:
+        st = filepath.stat()
+    except OSError:
         return None
-    matches = list(ENTRIES_DIR.glob(f"{entry_id}*.md"))
-    return matches[0] if matches else None
+    return st.st_mtime_ns, st.st_size
 
 def analyze_entry_mood(entry_id: str) -> dict:
     """
@@ -33,35 +330,219 @@ def analyze_entry_mood(entry_id: str) -> dict:
         A dictionary with the mood analysis results or an error.
         Example: {"status": "success", "mood": "Positive", "positive": 5, "negative": 1}
     """
-    filepath = _find_entry_path(entry_id)
+    filepath = entry.find_entry_path(entry_id)
     if not filepath:
         return {"status": "error", "message": f"Entrada '{entry_id}' não encontrada."}
+    if entry.is_encrypted(filepath):
+        return {"status": "error", "message": f"A entrada '{entry_id}' está criptografada e não pode ser analisada."}
 
+    return _run_batch([(entry_id, filepath, _file_stamp(filepath))], jobs=1)[0][0]
+
+def _run_batch(items: list[tuple[str, Path, tuple | None]], jobs: int | None) -> tuple[list[dict], int]:
+    """
+    Scores (entry_id, path, (mtime_ns, size)) triples. Entries whose cached
+    score matches their stamp are answered from the cache; the rest are read
+    and scored, in parallel when there are enough of them, and cached.
+
+    Returns:
+        tuple: (results in the same order as items, number of cache hits).
+    """
+    cached = _cache_lookup([path.name for _, path, _ in items]) if items else {}
+    results: list[dict | None] = []
+    misses = []
+    for entry_id, path, stamp in items:
+        row = cached.get(path.name)
+        if row is not None and stamp is not None and row[:2] == stamp:
+            results.append(_mood_result(entry_id, path, row[2], row[3]))
+        else:
+            results.append(None)
+            misses.append((entry_id, path, stamp))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(misses) < MIN_PARALLEL_ENTRIES:
+        scored = [_analyze_file(entry_id, path) for entry_id, path, _ in misses]
+    else:
+        # A few chunks per worker keeps them busy without pickling one task per entry
+        chunk_size = max(1, min(256, len(misses) // (jobs * 4)))
+        chunks = [[(entry_id, str(path)) for entry_id, path, _ in misses[i:i + chunk_size]]
+                  for i in range(0, len(misses), chunk_size)]
+        scored = []
+        # Imported here: it pulls in multiprocessing, which most commands never need
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for chunk_results in pool.map(_analyze_chunk, chunks):
+                scored.extend(chunk_results)
+
+    _cache_store([
+        (path.name, *stamp, r["positive_score"], r["negative_score"])
+        for (_, path, stamp), r in zip(misses, scored)
+        if r["status"] == "success" and stamp is not None
+    ])
+
+    scored_iter = iter(scored)
+    return [r if r is not None else next(scored_iter) for r in results], len(items) - len(misses)
+
+def _summarize(results: list[dict]) -> dict:
+    summary = {"Positivo": 0, "Negativo": 0, "Neutro": 0, "Erro": 0}
+    for r in results:
+        summary[r["mood"] if r["status"] == "success" else "Erro"] += 1
+    return summary
+
+def analyze_moods(entry_ids: list[str], jobs: int | None = None) -> dict:
+    """
+    Analyzes the mood of several entries at once.
+    Each ID (prefix) is resolved through core.entry's index, by binary search,
+    instead of one directory glob per entry.
+
+    Args:
+        entry_ids (list[str]): IDs (timestamp prefixes) of the entries to analyze.
+        jobs (int | None): Number of worker processes (default: one per CPU).
+
+    Returns:
+        dict: {"status": "success", "data": [one result per ID, in order],
+               "summary": counts per mood, "cache_hits": entries answered
+               from the cache}. IDs that don't match any entry, or match an
+               encrypted one, get an error result in "data".
+    """
+    items, results = [], []
+    for entry_id in entry_ids:
+        filepath = entry.find_entry_path(entry_id)
+        if filepath is None:
+            results.append({"status": "error", "entry_id": entry_id,
+                            "message": f"Entrada '{entry_id}' não encontrada."})
+        elif entry.is_encrypted(filepath):
+            results.append({"status": "error", "entry_id": entry_id,
+                            "message": f"A entrada '{entry_id}' está criptografada e não pode ser analisada."})
+        else:
+            items.append((entry_id, filepath, _file_stamp(filepath)))
+            results.append(None)
+
+    scored, hits = _run_batch(items, jobs)
+    scored_iter = iter(scored)
+    results = [r if r is not None else next(scored_iter) for r in results]
+    return {"status": "success", "data": results, "summary": _summarize(results), "cache_hits": hits}
+
+def _plain_entries() -> list[tuple[str, Path, tuple | None]]:
+    """(entry_id, path, (mtime_ns, size)) of every plain entry in core.entry's index, newest first."""
+    items = []
+    for record in entry.iter_entries():
+        filepath = entry.ENTRIES_DIR / record["filename"]
+        if not entry.is_encrypted(filepath):
+            items.append((record["id"], filepath, _file_stamp(filepath)))
+    return items
+
+def analyze_all_moods(jobs: int | None = None) -> dict:
+    """
+    Analyzes the mood of every plain (not encrypted) entry in the journal, newest first.
+
+    Args:
+        jobs (int | None): Number of worker processes (default: one per CPU).
+
+    Returns:
+        dict: {"status": "success", "data": [results], "summary": counts per mood,
+               "cache_hits": entries answered from the cache}.
+    """
+    results, hits = _run_batch(_plain_entries(), jobs)
+    return {"status": "success", "data": results, "summary": _summarize(results), "cache_hits": hits}
+
+def _reconcile_cache() -> None:
+    """
+    Brings the cached scores (and so the rollups) in line with ENTRIES_DIR, if
+    the entry index changed since they last were: rows of entries deleted
+    outside of offjournal are dropped, and entries that are new, or whose
+    (mtime_ns, size) no longer matches their row, are scored. The entries
+    come from core.entry's index and are stat'ed; only the stale ones are read.
+    """
+    if not entry.ENTRIES_DIR.is_dir():
+        return
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            # Normalize text to lowercase for case-insensitive matching
-            text = f.read().lower()
+        with _cache_lock:
+            # Opened first: creating the cache directory changes the index stamp
+            conn = _cache_conn(entry.ENTRIES_DIR)
+            key = _stamp_key(entry.index_stamp())
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'reconciled' AND value = ?", (key,)).fetchone():
+                return
+    except (sqlite3.Error, OSError):
+        return
+    stamps = {path.name: stamp for _, path, stamp in _plain_entries() if stamp is not None}
+    try:
+        with _cache_lock:
+            cached = {name: (mtime_ns, size)
+                      for name, mtime_ns, size in conn.execute("SELECT filename, mtime_ns, size FROM moods")}
+            gone = cached.keys() - stamps.keys()
+            if gone:
+                with conn:
+                    conn.executemany("DELETE FROM moods WHERE filename = ?", [(name,) for name in gone])
+    except (sqlite3.Error, OSError):
+        return
+    stale = [name for name in stamps if cached.get(name) != stamps[name]]
+    _run_batch([(name.split("_", 1)[0], entry.ENTRIES_DIR / name, stamps[name]) for name in stale], jobs=None)
+    try:
+        with _cache_lock, conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('reconciled', ?)", (key,))
+    except sqlite3.Error:
+        pass
+
+def get_mood_timeseries(period: str = "daily", start: str | None = None, end: str | None = None) -> dict:
+    """
+    Returns mood aggregates over time, read from the precomputed rollups.
+
+    Args:
+        period (str): "daily", "weekly" (buckets start on Monday) or "monthly".
+        start (str | None): First date to include, AAAA-MM-DD.
+        end (str | None): Last date to include, AAAA-MM-DD.
+
+    Returns:
+        dict: {"status": "success", "period": period, "data": [{"bucket",
+        "entries", "positive_score", "negative_score", "positive_entries",
+        "negative_entries", "neutral_entries", "balance", "mood"}, ...]},
+        oldest bucket first. "balance" is (positive - negative) per entry.
+    """
+    if period not in ROLLUP_PERIODS:
+        return {"status": "error", "message": f"Período inválido: '{period}'. Use daily, weekly ou monthly."}
+
+    try:
+        first = date.fromisoformat(start) if start else None
+        last = date.fromisoformat(end) if end else None
+    except (ValueError, TypeError):
+        return {"status": "error", "message": "Formato de data inválido. Use AAAA-MM-DD."}
 
-        positive_count = sum(word in text for word in POSITIVE_WORDS)
-        negative_count = sum(word in text for word in NEGATIVE_WORDS)
+    # Buckets are compared as strings, so the bounds are turned into the
+    # buckets they fall in: the Monday of their week, or their month.
+    if period == "weekly" and first:
+        first -= timedelta(days=first.weekday())
+    width = 7 if period == "monthly" else 10
+    low = first.isoformat()[:width] if first else ""
+    high = last.isoformat()[:width] if last else "9999-12-31"
 
+    _reconcile_cache()
+    try:
+        with _cache_lock:
+            rows = _cache_conn(entry.ENTRIES_DIR).execute("""
+                SELECT bucket, entries, positive, negative, positive_entries, negative_entries, neutral_entries
+                FROM rollups
+                WHERE period = ? AND bucket >= ? AND bucket <= ? AND entries > 0
+                ORDER BY bucket
+            """, (period, low, high)).fetchall()
+    except (sqlite3.Error, OSError) as e:
+        return {"status": "error", "message": f"Falha ao ler o histórico de humor: {e}"}
+
+    data = []
+    for bucket, entries, positive, negative, pos_entries, neg_entries, neutral_entries in rows:
         mood = "Neutro"
-        if positive_count > negative_count:
+        if pos_entries > neg_entries:
             mood = "Positivo"
-        elif negative_count > positive_count:
+        elif neg_entries > pos_entries:
             mood = "Negativo"
-
-        return {
-            "status": "success",
-            "entry_id": entry_id,
-            "filename": filepath.name,
+        data.append({
+            "bucket": bucket,
+            "entries": entries,
+            "positive_score": positive,
+            "negative_score": negative,
+            "positive_entries": pos_entries,
+            "negative_entries": neg_entries,
+            "neutral_entries": neutral_entries,
+            "balance": round((positive - negative) / entries, 3),
             "mood": mood,
-            "positive_score": positive_count,
-            "negative_score": negative_count
-        }
-    except IOError as e:
-        return {"status": "error", "message": f"Não foi possível ler o arquivo da entrada: {e}"}
-
-# Note: The function to analyze *all* entries can be built on top of this one
-# by the calling interface (e.g., iterating through all entry IDs and calling this).
-# This keeps the core module focused on single-entry operations.
+        })
+    return {"status": "success", "period": period, "data": data}
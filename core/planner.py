@@ -2,17 +2,64 @@
 """
 Planner module for offjournal.
 
-Manages an offline agenda with events stored in a JSON file.
+Manages an offline agenda of events. Events are kept by a pluggable storage
+backend: an SQLite database (the default) with indexed id and date columns,
+so adding, updating or deleting one event doesn't rewrite the others, or the
+original single JSON file. An existing planner.json is migrated to SQLite
+automatically the first time the database is opened.
 All functions return structured data for consumption by any UI.
+
+Recurring events are stored once, as their first date plus a recurrence
+rule (daily, weekly, monthly or yearly, with an interval, an end date or a
+number of occurrences, and exception dates). Their occurrences are never
+stored: get_events() generates them lazily, only inside the requested
+range, and merges them with the single events in date order.
+
+The CLI and the GUI may change the planner at the same time. SQLite
+serializes their writes itself (waiting up to locking.LOCK_TIMEOUT for a
+busy database), and changes that depend on the stored event are made in a
+single write transaction. The JSON backend holds an inter-process lock on
+the planner's directory (core.locking) for every read-modify-write, so no
+update is lost and no ID is handed out twice. has_outside_changes() tells
+changes made by another process apart from this process's own writes.
 """
 
+import bisect
+import heapq
+import itertools
 import json
+import os
+import sqlite3
+import threading
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
 
-# Path to the planner data file
+from . import locking
+
+# Path to the original JSON planner file. The SQLite database lives next to
+# it with a ".db" suffix, and the JSON file is kept as ".json.bak" once migrated.
 PLANNER_FILE = Path.home() / ".offjournal" / "planner.json"
 
+# Storage backend used by the public functions: "sqlite" or "json"
+STORAGE_BACKEND = "sqlite"
+
+# Recurrence frequencies and the number of days (daily, weekly) or months
+# (monthly, yearly) between two occurrences with an interval of 1
+RECURRENCE_FREQUENCIES = {"daily": ("days", 1), "weekly": ("days", 7), "monthly": ("months", 1), "yearly": ("months", 12)}
+
+# Queries without an end date list the occurrences of open-ended recurring
+# events up to this many days after today (or after the start date)
+RECURRENCE_HORIZON_DAYS = 365
+
+# Stored as the last date of recurring events that never end
+_NO_END = "9999-12-31"
+
+def _planner_lock():
+    """Inter-process lock for read-modify-write sequences on the planner files."""
+    PLANNER_FILE.parent.mkdir(parents=True, exist_ok=True)
+    return locking.file_lock(PLANNER_FILE.parent)
+
 def _load_events() -> list[dict]:
     """
     Loads events from the JSON file.
@@ -27,48 +74,461 @@ def _load_events() -> list[dict]:
         # In case of corruption or read error, treat as empty
         return []
 
+def _file_stamp(path: Path) -> tuple | None:
+    """(inode, mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+# JSON planner file -> its _file_stamp() as last written or checked by this process
+_json_stamps: dict[Path, tuple | None] = {}
+
 def _save_events(events: list[dict]) -> bool:
     """
     Saves the list of events to the JSON file.
     Returns True on success, False on failure.
+    The file is replaced atomically, so readers never see it half written.
     """
+    tmp_path = PLANNER_FILE.with_name(f".{PLANNER_FILE.name}.{os.getpid()}.{threading.get_ident()}")
     try:
         PLANNER_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(PLANNER_FILE, "w", encoding="utf-8") as f:
+        with open(tmp_path, "w", encoding="utf-8") as f:
             # Sort by date before saving for consistency
             sorted_events = sorted(events, key=lambda x: (x.get('date', ''), x.get('id', 0)))
             json.dump(sorted_events, f, indent=2)
+            f.flush()
+            # Taken from the file we wrote: the rename keeps its inode and mtime
+            st = os.fstat(f.fileno())
+        os.replace(tmp_path, PLANNER_FILE)
+        _json_stamps[PLANNER_FILE] = (st.st_ino, st.st_mtime_ns, st.st_size)
         return True
     except IOError:
+        tmp_path.unlink(missing_ok=True)
         return False
 
-def get_events() -> list[dict]:
+
+class JsonPlannerStore:
+    """Keeps every event in a single JSON file, rewritten on each change."""
+
+    def __init__(self):
+        _json_stamps.setdefault(PLANNER_FILE, _file_stamp(PLANNER_FILE))
+
+    def has_outside_changes(self) -> bool:
+        stamp = _file_stamp(PLANNER_FILE)
+        changed = stamp != _json_stamps.get(PLANNER_FILE)
+        _json_stamps[PLANNER_FILE] = stamp
+        return changed
+
+    def list_events(self, start: str | None = None, end: str | None = None,
+                    limit: int | None = None) -> list[dict]:
+        # The file is saved sorted by date, so the range is found by binary search
+        events = _load_events()
+        dates = [ev.get("date", "") for ev in events]
+        lo = bisect.bisect_left(dates, start) if start else 0
+        hi = bisect.bisect_right(dates, end) if end else len(events)
+        selected = [ev for ev in events[lo:hi] if not ev.get("recurrence")]
+        return selected[:limit] if limit is not None else selected
+
+    def list_recurring(self, start: str, end: str) -> list[dict]:
+        return [ev for ev in _load_events() if ev.get("recurrence")
+                and ev.get("date", "") <= end and ev.get("last_date", _NO_END) >= start]
+
+    def get_event(self, event_id: int) -> dict | None:
+        return next((ev for ev in _load_events() if ev.get("id") == event_id), None)
+
+    def add_event(self, date_str: str, title: str, recurrence: dict | None = None,
+                  last_date: str | None = None) -> dict | None:
+        with _planner_lock():
+            events = _load_events()
+            new_id = max([ev.get("id", 0) for ev in events], default=0) + 1
+            new_event = {"id": new_id, "date": date_str, "title": title}
+            if recurrence:
+                new_event.update(recurrence=recurrence, last_date=last_date)
+            events.append(new_event)
+            return new_event if _save_events(events) else None
+
+    def update_event(self, event_id: int, changes: dict) -> bool:
+        with _planner_lock():
+            events = _load_events()
+            for ev in events:
+                if ev.get("id") == event_id:
+                    ev.update(changes)
+                    break
+            return _save_events(events)
+
+    def modify_event(self, event_id: int, change: Callable[[dict], dict]) -> dict | None:
+        with _planner_lock():
+            events = _load_events()
+            event = next((ev for ev in events if ev.get("id") == event_id), None)
+            if event is None:
+                return None
+            event.update(change(dict(event)))
+            if not _save_events(events):
+                raise OSError("falha ao salvar o planejador")
+            return event
+
+    def delete_event(self, event_id: int) -> bool:
+        with _planner_lock():
+            events = [ev for ev in _load_events() if ev.get("id") != event_id]
+            return _save_events(events)
+
+
+class SqlitePlannerStore:
+    """
+    Keeps events in an SQLite database with one row per event.
+    Lookups by id use the primary key and listings use the (date, id) index.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        title TEXT NOT NULL,
+        recurrence TEXT,
+        last_date TEXT
+    );
+    CREATE INDEX IF NOT EXISTS events_by_date ON events (date, id);
     """
-    Returns all planner events, sorted by date.
+
+    # Recurring events are few; this partial index finds those still running at a date
+    _RECURRING_INDEX = """
+    CREATE INDEX IF NOT EXISTS recurring_events ON events (last_date) WHERE recurrence IS NOT NULL;
+    """
+
+    def __init__(self, db_path: Path, json_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        # A write waits for another process's to finish, up to LOCK_TIMEOUT
+        self.conn = sqlite3.connect(db_path, timeout=locking.LOCK_TIMEOUT, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # Another process may be creating or upgrading the same database
+        with locking.file_lock(db_path.parent):
+            is_new = not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events'").fetchone()
+            with self.conn:
+                self.conn.executescript(self._SCHEMA)
+                columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(events)")}
+                # Databases created before recurring events get the new columns
+                for column in ("recurrence", "last_date"):
+                    if column not in columns:
+                        self.conn.execute(f"ALTER TABLE events ADD COLUMN {column} TEXT")
+                self.conn.executescript(self._RECURRING_INDEX)
+            if is_new and json_path.exists():
+                self._migrate_from_json(json_path)
+        self._data_version = self._current_data_version()
+
+    def _current_data_version(self) -> int:
+        # Changes only when another connection (another process) commits, not on our own writes
+        with self.lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_outside_changes(self) -> bool:
+        version = self._current_data_version()
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def _migrate_from_json(self, json_path: Path) -> None:
+        """Imports the events of the old JSON planner file, keeping their IDs."""
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                events = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO events (id, date, title, recurrence, last_date) VALUES (?, ?, ?, ?, ?)",
+                [(ev["id"], ev.get("date", ""), ev.get("title", ""),
+                  json.dumps(ev["recurrence"]) if ev.get("recurrence") else None,
+                  ev.get("last_date") or (_NO_END if ev.get("recurrence") else None))
+                 for ev in events if "id" in ev],
+            )
+        # Keep the old file as a backup, out of the way of future migrations
+        json_path.replace(json_path.with_name(json_path.name + ".bak"))
+
+    def list_events(self, start: str | None = None, end: str | None = None,
+                    limit: int | None = None) -> list[dict]:
+        # Range conditions on "date" are answered from the (date, id) index
+        query = ("SELECT id, date, title FROM events WHERE date >= ? AND date <= ? AND recurrence IS NULL "
+                 "ORDER BY date, id LIMIT ?")
+        params = (start or "", end or _NO_END, -1 if limit is None else limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_recurring(self, start: str, end: str) -> list[dict]:
+        query = ("SELECT id, date, title, recurrence, last_date FROM events "
+                 "WHERE recurrence IS NOT NULL AND last_date >= ? AND date <= ?")
+        with self.lock:
+            rows = self.conn.execute(query, (start, end)).fetchall()
+        return [self._row_event(row) for row in rows]
+
+    @staticmethod
+    def _row_event(row: sqlite3.Row) -> dict:
+        event = {"id": row["id"], "date": row["date"], "title": row["title"]}
+        if row["recurrence"]:
+            event.update(recurrence=json.loads(row["recurrence"]), last_date=row["last_date"])
+        return event
+
+    def get_event(self, event_id: int) -> dict | None:
+        with self.lock:
+            row = self.conn.execute("SELECT id, date, title, recurrence, last_date FROM events WHERE id = ?",
+                                    (event_id,)).fetchone()
+        return self._row_event(row) if row else None
+
+    def add_event(self, date_str: str, title: str, recurrence: dict | None = None,
+                  last_date: str | None = None) -> dict | None:
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO events (date, title, recurrence, last_date) VALUES (?, ?, ?, ?)",
+                (date_str, title, json.dumps(recurrence) if recurrence else None, last_date if recurrence else None))
+        event = {"id": cursor.lastrowid, "date": date_str, "title": title}
+        if recurrence:
+            event.update(recurrence=recurrence, last_date=last_date)
+        return event
+
+    def _update(self, event_id: int, changes: dict) -> None:
+        changes = {k: json.dumps(v) if k == "recurrence" else v for k, v in changes.items()}
+        columns = {k: v for k, v in changes.items() if k in ("date", "title", "recurrence", "last_date")}
+        if columns:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            self.conn.execute(f"UPDATE events SET {assignments} WHERE id = ?", (*columns.values(), event_id))
+
+    def update_event(self, event_id: int, changes: dict) -> bool:
+        with self.lock, self.conn:
+            self._update(event_id, changes)
+        return True
+
+    def modify_event(self, event_id: int, change: Callable[[dict], dict]) -> dict | None:
+        with self.lock, self.conn:
+            # Take the write lock before reading, so no other process can change
+            # the event between the read and the update
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute("SELECT id, date, title, recurrence, last_date FROM events WHERE id = ?",
+                                    (event_id,)).fetchone()
+            if row is None:
+                return None
+            event = self._row_event(row)
+            changes = change(dict(event))
+            self._update(event_id, changes)
+        event.update(changes)
+        return event
+
+    def delete_event(self, event_id: int) -> bool:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+        return True
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+# Open stores, keyed by backend and planner file (tests point PLANNER_FILE elsewhere)
+_stores: dict[tuple, object] = {}
+_stores_lock = threading.Lock()
+
+def _get_store():
+    """Returns the storage backend for the current PLANNER_FILE and STORAGE_BACKEND."""
+    key = (STORAGE_BACKEND, PLANNER_FILE)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if STORAGE_BACKEND == "json":
+                store = JsonPlannerStore()
+            else:
+                store = SqlitePlannerStore(PLANNER_FILE.with_suffix(".db"), PLANNER_FILE)
+            _stores[key] = store
+        return store
+
+def has_outside_changes() -> bool:
+    """
+    True if another process changed the planner since the last call (or
+    since it was opened here); this process's own writes don't count.
+    core.watcher uses it so the GUI doesn't reload the planner after its own changes.
+    """
+    try:
+        return _get_store().has_outside_changes()
+    except (sqlite3.Error, OSError):
+        # Can't tell: assume it changed
+        return True
+
+def _date_bound(value) -> str | None:
+    """Normalizes a date or "AAAA-MM-DD" string to the stored format; raises ValueError if invalid."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def _normalize_recurrence(recurrence: dict, first: date) -> dict:
+    """
+    Validates a recurrence rule and returns it in its stored form; raises
+    ValueError with a user-facing message if it is invalid.
+    """
+    if not isinstance(recurrence, dict) or recurrence.get("freq") not in RECURRENCE_FREQUENCIES:
+        raise ValueError(f"Frequência inválida. Use uma destas: {', '.join(RECURRENCE_FREQUENCIES)}.")
+    rule = {"freq": recurrence["freq"], "interval": recurrence.get("interval") or 1}
+    if not isinstance(rule["interval"], int) or rule["interval"] < 1:
+        raise ValueError("O intervalo da repetição deve ser um número inteiro positivo.")
+    if recurrence.get("until"):
+        try:
+            until = _parse_date(recurrence["until"])
+        except (ValueError, TypeError):
+            raise ValueError("Data final da repetição inválida. Use AAAA-MM-DD.")
+        if until < first:
+            raise ValueError("A data final da repetição é anterior ao primeiro evento.")
+        rule["until"] = until.strftime("%Y-%m-%d")
+    if recurrence.get("count") is not None:
+        if not isinstance(recurrence["count"], int) or recurrence["count"] < 1:
+            raise ValueError("O número de repetições deve ser um número inteiro positivo.")
+        rule["count"] = recurrence["count"]
+    try:
+        rule["exceptions"] = sorted({_date_bound(d) for d in recurrence.get("exceptions") or []})
+    except (ValueError, TypeError):
+        raise ValueError("Data de exceção inválida. Use AAAA-MM-DD.")
+    return rule
+
+def _rule_dates(first: date, rule: dict, start: date, end: date) -> Iterator[date]:
+    """
+    Yields the dates of a recurrence between start and end (inclusive), in
+    order, ignoring its end conditions and exceptions. It starts right at the
+    first period that can reach `start` instead of walking from `first`.
+    Monthly and yearly events on a day a month doesn't have (e.g. the 31st)
+    skip that month.
+    """
+    unit, length = RECURRENCE_FREQUENCIES[rule["freq"]]
+    step = length * rule["interval"]
+    start = max(start, first)
+    if unit == "days":
+        current = first + timedelta(days=-(-(start - first).days // step) * step)
+        while current <= end:
+            yield current
+            try:
+                current += timedelta(days=step)
+            except OverflowError:
+                return
+        return
+    k = ((start.year - first.year) * 12 + start.month - first.month) // step
+    while True:
+        months = first.month - 1 + k * step
+        year, month = first.year + months // 12, months % 12 + 1
+        if year > end.year or (year == end.year and month > end.month):
+            return
+        try:
+            current = date(year, month, first.day)
+        except ValueError:
+            current = None  # No such day in this month
+        if current is not None and start <= current <= end:
+            yield current
+        k += 1
+
+def _last_date(first: date, rule: dict) -> str:
+    """The date of the last occurrence of a rule ("9999-12-31" if it never ends)."""
+    last = _parse_date(rule["until"]) if "until" in rule else date.max
+    if "count" in rule:
+        # Exceptions don't give back occurrences: the count includes them
+        nth = next(itertools.islice(_rule_dates(first, rule, first, last), rule["count"] - 1, None), None)
+        if nth is not None:
+            last = nth
+    return last.strftime("%Y-%m-%d") if last != date.max else _NO_END
+
+def _occurrences(event: dict, start: date, end: date) -> Iterator[dict]:
+    """Lazily yields the occurrences of a recurring event inside [start, end]."""
+    rule = event["recurrence"]
+    end = min(end, _parse_date(event.get("last_date") or _NO_END))
+    exceptions = set(rule.get("exceptions", ()))
+    for current in _rule_dates(_parse_date(event["date"]), rule, start, end):
+        day = current.strftime("%Y-%m-%d")
+        if day not in exceptions:
+            yield {"id": event["id"], "date": day, "title": event["title"], "recurrence": rule}
+
+def get_events(start: str | date | None = None, end: str | date | None = None,
+               limit: int | None = None) -> list[dict]:
+    """
+    Returns planner events, sorted by date.
     The list is returned directly as it's already structured data.
+
+    Args:
+        start: First date to include (AAAA-MM-DD or a date); no lower bound if None.
+        end: Last date to include (inclusive); no upper bound if None.
+        limit: Maximum number of events to return.
+
+    Only the events inside the range are read from storage. Recurring events
+    appear once per occurrence in the range (with their rule in "recurrence"),
+    generated on the fly; without an end date, open-ended ones are listed up to
+    RECURRENCE_HORIZON_DAYS ahead. Returns an empty list if a bound is not a valid date.
     """
-    return _load_events()
+    try:
+        start, end = _date_bound(start), _date_bound(end)
+    except (ValueError, TypeError):
+        return []
+    if limit is not None and limit < 0:
+        limit = None
+    first = _parse_date(start) if start else date.min
+    horizon = max(first, date.today()) + timedelta(days=RECURRENCE_HORIZON_DAYS)
+    last = _parse_date(end) if end else horizon
+    try:
+        store = _get_store()
+        singles = store.list_events(start, end, limit)
+        recurring = store.list_recurring(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
+    except (sqlite3.Error, OSError):
+        return []
+    if not recurring:
+        return singles
+    merged = heapq.merge(singles, *(_occurrences(ev, first, last) for ev in recurring),
+                         key=lambda ev: (ev["date"], ev["id"]))
+    return list(itertools.islice(merged, limit))
+
+def get_upcoming_events(days: int = 7, today: date | None = None, limit: int | None = None) -> list[dict]:
+    """
+    Returns the events of the next `days` days, starting today.
+    Example: days=7 returns this week's agenda.
+    """
+    today = today or date.today()
+    return get_events(today, today + timedelta(days=max(days, 1) - 1), limit)
 
-def add_event(date_str: str, title: str) -> dict:
+def add_event(date_str: str, title: str, recurrence: dict | None = None) -> dict:
     """
     Adds a new event to the planner.
     Returns a dictionary with status and the newly created event data.
+
+    Args:
+        date_str (str): Date of the event, or of its first occurrence (AAAA-MM-DD).
+        title (str): Title of the event.
+        recurrence (dict | None): Makes the event repeat: {"freq": "daily",
+            "weekly", "monthly" or "yearly", "interval": every how many
+            periods (default 1), "until": last date, "count": number of
+            occurrences, "exceptions": dates to skip}. Only "freq" is required.
     """
     try:
         # Validate date format
-        datetime.strptime(date_str, "%Y-%m-%d")
+        first = _parse_date(date_str)
     except (ValueError, TypeError):
         return {"status": "error", "message": "Formato de data inválido. Use AAAA-MM-DD."}
-    
+
     if not title or not title.strip():
         return {"status": "error", "message": "O título do evento não pode ser vazio."}
 
-    events = _load_events()
-    new_id = max([ev.get("id", 0) for ev in events], default=0) + 1
-    new_event = {"id": new_id, "date": date_str, "title": title.strip()}
-    events.append(new_event)
-    
-    if _save_events(events):
+    last_date = None
+    if recurrence:
+        try:
+            recurrence = _normalize_recurrence(recurrence, first)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        last_date = _last_date(first, recurrence)
+
+    try:
+        new_event = _get_store().add_event(date_str, title.strip(), recurrence or None, last_date)
+    except (sqlite3.Error, OSError):
+        new_event = None
+
+    if new_event:
         return {"status": "success", "data": new_event}
     else:
         return {"status": "error", "message": "Falha ao salvar o arquivo do planejador."}
@@ -81,31 +541,66 @@ def update_event(event_id: int, date_str: str | None = None, title: str | None =
     if not isinstance(event_id, int):
         return {"status": "error", "message": "ID do evento inválido."}
 
-    events = _load_events()
-    event_found = False
-    for ev in events:
-        if ev.get("id") == event_id:
-            event_found = True
-            if date_str:
-                try:
-                    datetime.strptime(date_str, "%Y-%m-%d")
-                    ev["date"] = date_str
-                except (ValueError, TypeError):
-                    return {"status": "error", "message": "Formato de data inválido. Use AAAA-MM-DD."}
-            if title:
-                if not title.strip():
-                    return {"status": "error", "message": "O título não pode ser vazio."}
-                ev["title"] = title.strip()
-            break
-    
-    if not event_found:
+    changes = {}
+    if date_str:
+        try:
+            first = _parse_date(date_str)
+            changes["date"] = date_str
+        except (ValueError, TypeError):
+            return {"status": "error", "message": "Formato de data inválido. Use AAAA-MM-DD."}
+    if title:
+        if not title.strip():
+            return {"status": "error", "message": "O título não pode ser vazio."}
+        changes["title"] = title.strip()
+
+    def change(event: dict) -> dict:
+        if date_str and event.get("recurrence"):
+            # Moving the first occurrence moves the whole series
+            rule = _normalize_recurrence(event["recurrence"], first)
+            return {**changes, "last_date": _last_date(first, rule)}
+        return changes
+
+    try:
+        event = _get_store().modify_event(event_id, change)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    except (sqlite3.Error, OSError):
+        return {"status": "error", "message": "Falha ao salvar o arquivo do planejador."}
+
+    if event is None:
         return {"status": "error", "message": f"Evento com ID {event_id} não encontrado."}
-    
-    if _save_events(events):
-        return {"status": "success", "message": f"Evento {event_id} atualizado com sucesso."}
-    else:
+    return {"status": "success", "message": f"Evento {event_id} atualizado com sucesso."}
+
+def skip_occurrence(event_id: int, date_str: str) -> dict:
+    """
+    Removes a single occurrence of a recurring event, keeping the others.
+    Returns a status dictionary.
+    """
+    if not isinstance(event_id, int):
+        return {"status": "error", "message": "ID do evento inválido."}
+    try:
+        day = _date_bound(date_str)
+    except (ValueError, TypeError):
+        return {"status": "error", "message": "Formato de data inválido. Use AAAA-MM-DD."}
+
+    def change(event: dict) -> dict:
+        if not event.get("recurrence"):
+            raise ValueError(f"O evento {event_id} não se repete.")
+        rule = event["recurrence"]
+        return {"recurrence": {**rule, "exceptions": sorted(set(rule.get("exceptions", [])) | {day})}}
+
+    try:
+        # Read and written in one step: exceptions added meanwhile by another process are kept
+        event = _get_store().modify_event(event_id, change)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    except (sqlite3.Error, OSError):
         return {"status": "error", "message": "Falha ao salvar o arquivo do planejador."}
 
+    if event is None:
+        return {"status": "error", "message": f"Evento com ID {event_id} não encontrado."}
+    return {"status": "success", "message": f"Ocorrência de {day} do evento {event_id} removida."}
+
 def delete_event(event_id: int) -> dict:
     """
     Deletes an event from the planner by its ID.
@@ -114,14 +609,15 @@ def delete_event(event_id: int) -> dict:
     if not isinstance(event_id, int):
         return {"status": "error", "message": "ID do evento inválido."}
 
-    events = _load_events()
-    initial_count = len(events)
-    filtered_events = [ev for ev in events if ev.get("id") != event_id]
-    
-    if len(filtered_events) == initial_count:
-        return {"status": "error", "message": f"Evento com ID {event_id} não encontrado."}
+    try:
+        store = _get_store()
+        if store.get_event(event_id) is None:
+            return {"status": "error", "message": f"Evento com ID {event_id} não encontrado."}
+        saved = store.delete_event(event_id)
+    except (sqlite3.Error, OSError):
+        saved = False
 
-    if _save_events(filtered_events):
+    if saved:
         return {"status": "success", "message": f"Evento {event_id} removido com sucesso."}
     else:
         return {"status": "error", "message": "Falha ao salvar o arquivo do planejador."}
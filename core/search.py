@@ -0,0 +1,239 @@
+# core/search.py
+"""
+Full-text search module for offjournal.
+
+Maintains an incremental inverted index over the titles and contents of
+journal entries and answers ranked (BM25) queries against it. The index is
+an SQLite FTS5 table stored in ENTRIES_DIR/.search/, so loading it is
+instant and updating one entry only touches that entry's postings.
+
+Text is tokenized on word boundaries, lowercased and accent-folded,
+so "coração" matches "coracao" and vice versa.
+"""
+
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+from . import entry
+
+SEARCH_DIRNAME = ".search"
+SEARCH_DB_FILENAME = "index.db"
+
+# Title matches weigh more than body matches in the ranking
+TITLE_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+# The last query term also matches as a prefix (for search-as-you-type)
+# once it has at least this many characters.
+PREFIX_MIN_LENGTH = 3
+
+# Very common Portuguese words that carry no meaning on their own
+STOPWORDS = {
+    "a", "o", "e", "as", "os", "de", "da", "do", "das", "dos", "em", "na", "no",
+    "nas", "nos", "um", "uma", "que", "se", "por", "para", "com", "ao", "aos",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    entry_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Open index connections and the entry-index state they were last synced with,
+# keyed by entries directory. The lock serializes access from GUI worker threads.
+_connections: dict[Path, dict] = {}
+_lock = threading.RLock()
+
+
+def normalize(text: str) -> str:
+    """Lowercases text and strips accents (e.g. "Coração" -> "coracao")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into normalized search terms, dropping stopwords."""
+    return [t for t in _TOKEN_RE.findall(normalize(text)) if t not in STOPWORDS]
+
+def _db_path() -> Path:
+    return entry.ENTRIES_DIR / SEARCH_DIRNAME / SEARCH_DB_FILENAME
+
+def _get_state() -> dict:
+    """
+    Returns the open index for the current entries directory, creating it if needed.
+    The index lives in a subdirectory, so writing to it never changes the
+    mtime of ENTRIES_DIR that core.entry uses to detect outside changes.
+    """
+    db_path = _db_path()
+    state = _connections.get(entry.ENTRIES_DIR)
+    if state is not None and not db_path.exists():
+        # The index was deleted from under us; start over.
+        state["conn"].close()
+        state = None
+    if state is None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.executescript(_SCHEMA)
+        state = {"conn": conn, "synced_with": None}
+        _connections[entry.ENTRIES_DIR] = state
+    return state
+
+def _put_doc(conn: sqlite3.Connection, name: str, entry_id: str, title: str,
+             mtime: float, content: str) -> None:
+    """Inserts or replaces one entry in the index (inside the caller's transaction)."""
+    row = conn.execute("SELECT id FROM docs WHERE name = ?", (name,)).fetchone()
+    if row:
+        doc_id = row[0]
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+        conn.execute("UPDATE docs SET title = ?, mtime = ? WHERE id = ?", (title, mtime, doc_id))
+    else:
+        doc_id = conn.execute(
+            "INSERT INTO docs (name, entry_id, title, mtime) VALUES (?, ?, ?, ?)",
+            (name, entry_id, title, mtime),
+        ).lastrowid
+    conn.execute("INSERT INTO docs_fts (rowid, title, body) VALUES (?, ?, ?)", (doc_id, title, content))
+
+def _drop_doc(conn: sqlite3.Connection, name: str) -> None:
+    """Removes one entry from the index (inside the caller's transaction)."""
+    row = conn.execute("SELECT id FROM docs WHERE name = ?", (name,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", row)
+        conn.execute("DELETE FROM docs WHERE id = ?", row)
+
+def _sync(state: dict) -> None:
+    """
+    Reconciles the search index with the entry index: entries created, changed
+    or removed outside of core.entry are (re)indexed or dropped. This only runs
+    when the entry index itself has changed, so it is skipped on most queries.
+    """
+    entries_index = entry._get_index()
+    stamp = (entries_index["dir_mtime"], entries_index["index_mtime"])
+    if state["synced_with"] == stamp:
+        return
+
+    conn = state["conn"]
+    records = entries_index["entries"]
+    indexed = dict(conn.execute("SELECT name, mtime FROM docs"))
+    with conn:
+        for name in indexed.keys() - records.keys():
+            _drop_doc(conn, name)
+        for name, record in records.items():
+            if name in indexed and indexed[name] >= record["mtime"]:
+                continue
+            content = ""
+            # Encrypted entries are indexed by title only: their text stays off disk
+            if not name.endswith(entry.ENCRYPTED_SUFFIX):
+                try:
+                    with open(entry.ENTRIES_DIR / name, "r", encoding="utf-8") as f:
+                        content = f.read()
+                except (IOError, UnicodeDecodeError):
+                    continue
+            _put_doc(conn, name, record["id"], record["title"], record["mtime"], content)
+    state["synced_with"] = stamp
+
+def index_entry(filepath: Path, content: str) -> None:
+    """
+    Adds or refreshes one entry in the search index.
+    Called by core.entry whenever an entry is created or its content changes.
+    """
+    info = entry._parse_filename(filepath)
+    try:
+        mtime = filepath.stat().st_mtime
+        with _lock:
+            conn = _get_state()["conn"]
+            with conn:
+                _put_doc(conn, filepath.name, info["id"], info["title"], mtime, content)
+    except (OSError, sqlite3.Error):
+        # The index is only a cache; the next sync will reindex what is missing.
+        pass
+
+def remove_entry(filepath: Path) -> None:
+    """
+    Removes one entry from the search index.
+    Called by core.entry when an entry is deleted.
+    """
+    try:
+        with _lock:
+            conn = _get_state()["conn"]
+            with conn:
+                _drop_doc(conn, filepath.name)
+    except (OSError, sqlite3.Error):
+        pass
+
+def _match_expression(terms: list[str]) -> str:
+    """Builds an FTS5 query that matches any of the terms (the last one also as a prefix)."""
+    parts = [f'"{t}"' for t in terms]
+    if len(terms[-1]) >= PREFIX_MIN_LENGTH:
+        parts[-1] += "*"
+    return " OR ".join(parts)
+
+def search(query: str, limit: int = 20) -> list[dict]:
+    """
+    Searches entry titles and contents, best matches first.
+
+    Args:
+        query (str): Free text; every term contributes to the ranking.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list[dict]: Matching entries with their id, title, filename, score
+        and a snippet of the matching text.
+    """
+    terms = list(dict.fromkeys(tokenize(query or "")))
+    if not terms or limit <= 0:
+        return []
+
+    try:
+        with _lock:
+            state = _get_state()
+            _sync(state)
+            rows = state["conn"].execute(
+                f"""
+                SELECT d.entry_id, d.title, d.name,
+                       bm25(docs_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS rank,
+                       snippet(docs_fts, 1, '', '', '…', 12)
+                FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+                WHERE docs_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (_match_expression(terms), limit),
+            ).fetchall()
+    except (OSError, sqlite3.Error):
+        return []
+
+    return [
+        {"id": entry_id, "title": title, "filename": name, "score": round(-rank, 4),
+         "snippet": " ".join(snippet.split())}
+        for entry_id, title, name, rank, snippet in rows
+    ]
+
+def rebuild_index() -> dict:
+    """
+    Discards the search index and rebuilds it from every entry on disk.
+    Returns a status dictionary with the number of indexed entries.
+    """
+    try:
+        with _lock:
+            state = _get_state()
+            conn = state["conn"]
+            with conn:
+                conn.execute("DELETE FROM docs_fts")
+                conn.execute("DELETE FROM docs")
+            state["synced_with"] = None
+            _sync(state)
+            count = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    except (OSError, sqlite3.Error) as e:
+        return {"status": "error", "message": f"Falha ao reconstruir o índice de busca: {e}"}
+    return {"status": "success", "message": f"Índice de busca reconstruído com {count} entradas."}
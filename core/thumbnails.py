@@ -0,0 +1,216 @@
+# core/thumbnails.py
+"""
+Thumbnail cache for offjournal media attachments.
+
+Thumbnails are generated lazily, the first time a preview of an attachment
+is requested, on a small background pool. They are cached on disk in
+MEDIA_DIR/.thumbnails/, named after the attachment's content hash and the
+requested size, so identical files share their thumbnails. The cache is
+kept under THUMBNAIL_CACHE_MAX_BYTES by evicting the least recently used
+thumbnails.
+
+Images are scaled with Pillow if it is installed, or with GdkPixbuf (part
+of the GUI dependencies) otherwise. Thumbnails are JPEGs, so transparent
+areas are laid over THUMBNAIL_BACKGROUND.
+"""
+
+import mimetypes
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from . import media
+
+THUMBNAIL_DIRNAME = ".thumbnails"
+
+# Longest side of a thumbnail, in pixels: default and accepted range
+DEFAULT_SIZE = 256
+MIN_SIZE = 16
+MAX_SIZE = 1024
+
+# Disk space the thumbnail cache may use before old thumbnails are evicted
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Colour (RGB) that transparent areas of an image are laid over
+THUMBNAIL_BACKGROUND = (255, 255, 255)
+
+# Thumbnails being generated at the same time
+MAX_WORKERS = 2
+
+# Created with the first thumbnail to generate, see _get_executor()
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+# Thumbnail path -> Future of its generation, so concurrent requests share one
+_in_flight: dict[Path, Future] = {}
+# Cache directory -> bytes used, computed on first use and kept up to date
+_cache_bytes: dict[Path, int] = {}
+
+
+def _cache_dir() -> Path:
+    return media.MEDIA_DIR / THUMBNAIL_DIRNAME
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Returns the generation pool, starting it on first use; must be called with _lock held."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="offjournal-thumbnail")
+    return _executor
+
+def _render_with_pillow(source: Path, destination: Path, size: int) -> bool:
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    try:
+        with Image.open(source) as image:
+            image.thumbnail((size, size))
+            if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, THUMBNAIL_BACKGROUND)
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            elif image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(destination, "JPEG", quality=85)
+    except Image.DecompressionBombError as e:
+        # Not an OSError, unlike Pillow's other errors for unreadable images
+        raise RuntimeError(str(e)) from e
+    return True
+
+def _render_with_pixbuf(source: Path, destination: Path, size: int) -> bool:
+    try:
+        import gi
+        gi.require_version("GdkPixbuf", "2.0")
+        from gi.repository import GdkPixbuf, GLib
+    except (ImportError, ValueError):
+        return False
+    try:
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(source), size, size, True)
+        if pixbuf.get_has_alpha():
+            # Blended over a one-colour "checkerboard", so the JPEG doesn't keep the hidden RGB values
+            color = (THUMBNAIL_BACKGROUND[0] << 16) | (THUMBNAIL_BACKGROUND[1] << 8) | THUMBNAIL_BACKGROUND[2]
+            pixbuf = pixbuf.composite_color_simple(pixbuf.get_width(), pixbuf.get_height(),
+                                                   GdkPixbuf.InterpType.BILINEAR, 255, 1, color, color)
+        pixbuf.savev(str(destination), "jpeg", ["quality"], ["85"])
+    except GLib.Error as e:
+        raise OSError(e.message) from e
+    return True
+
+def _render_thumbnail(source: Path, destination: Path, size: int) -> None:
+    """
+    Writes a JPEG thumbnail of `source` fitting in size x size. Raises OSError
+    if the image can't be read or written, RuntimeError if it can't be rendered.
+    """
+    for renderer in (_render_with_pillow, _render_with_pixbuf):
+        if renderer(source, destination, size):
+            return
+    raise RuntimeError("Nenhum gerador de miniaturas disponível (instale Pillow ou GdkPixbuf).")
+
+def _used_bytes(cache_dir: Path) -> int:
+    """Bytes used by the cache; must be called with _lock held."""
+    if cache_dir not in _cache_bytes:
+        total = 0
+        if cache_dir.is_dir():
+            with os.scandir(cache_dir) as it:
+                total = sum(e.stat().st_size for e in it if e.is_file())
+        _cache_bytes[cache_dir] = total
+    return _cache_bytes[cache_dir]
+
+def _evict(cache_dir: Path) -> None:
+    """Deletes the least recently used thumbnails until the cache fits its cap; must be called with _lock held."""
+    if _used_bytes(cache_dir) <= THUMBNAIL_CACHE_MAX_BYTES:
+        return
+    with os.scandir(cache_dir) as it:
+        files = sorted((e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in it if e.is_file())
+    for _, size, path in files:
+        if _cache_bytes[cache_dir] <= THUMBNAIL_CACHE_MAX_BYTES:
+            break
+        if Path(path) in _in_flight:
+            continue
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        _cache_bytes[cache_dir] -= size
+
+def _generate(source: Path, destination: Path, size: int) -> Path:
+    """Worker task: renders one thumbnail into the cache and enforces the size cap."""
+    tmp_path = destination.with_name(f".tmp-{threading.get_ident()}-{destination.name}")
+    try:
+        _render_thumbnail(source, tmp_path, size)
+        os.replace(tmp_path, destination)
+        with _lock:
+            if destination.parent in _cache_bytes:
+                _cache_bytes[destination.parent] += destination.stat().st_size
+            else:
+                _used_bytes(destination.parent)  # First scan already counts the new file
+            del _in_flight[destination]
+            _evict(destination.parent)
+        return destination
+    finally:
+        tmp_path.unlink(missing_ok=True)
+        with _lock:
+            # A failed generation isn't cached: the next request tries again
+            _in_flight.pop(destination, None)
+
+def _schedule(entry_id: str, media_filename: str, size: int) -> tuple[Future | None, Path | None, str | None]:
+    """
+    Returns (future, path, error) for a thumbnail: a finished future if it is
+    cached, the running one if it's being generated, or a newly queued one.
+    """
+    mime, _ = mimetypes.guess_type(media_filename)
+    if not mime or not mime.startswith("image/"):
+        return None, None, f"Pré-visualização indisponível para '{media_filename}'."
+    source = media.media_path(entry_id, media_filename)
+    if source is None:
+        return None, None, f"Arquivo de mídia '{media_filename}' não encontrado para a entrada '{entry_id}'."
+
+    cache_dir = _cache_dir()
+    path = cache_dir / f"{source.name}_{size}.jpg"
+    with _lock:
+        future = _in_flight.get(path)
+        if future is None:
+            try:
+                # Touching a hit keeps it at the recent end of the LRU order
+                os.utime(path)
+                future = Future()
+                future.set_result(path)
+            except FileNotFoundError:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                future = _in_flight[path] = _get_executor().submit(_generate, source, path, size)
+    return future, path, None
+
+def get_thumbnail(entry_id: str, media_filename: str, size: int = DEFAULT_SIZE) -> dict:
+    """
+    Returns a thumbnail of an image attachment, generating it on first use.
+
+    Args:
+        entry_id (str): Identifier of the journal entry.
+        media_filename (str): Name of the attachment.
+        size (int): Longest side of the thumbnail in pixels (clamped to MIN_SIZE..MAX_SIZE).
+
+    Returns:
+        dict: A status dictionary with the thumbnail's "path" and "uri" (for the WebView).
+    """
+    size = max(MIN_SIZE, min(int(size or DEFAULT_SIZE), MAX_SIZE))
+    try:
+        future, path, error = _schedule(entry_id, media_filename, size)
+        if error:
+            return {"status": "error", "message": error}
+        future.result()
+    except (OSError, RuntimeError, ValueError) as e:
+        return {"status": "error", "message": f"Falha ao gerar a miniatura: {e}"}
+    return {"status": "success", "path": str(path), "uri": path.as_uri(), "size": size}
+
+def prefetch_thumbnails(entry_id: str, size: int = DEFAULT_SIZE) -> int:
+    """
+    Queues the thumbnails of every image attached to an entry without waiting
+    for them (e.g. when the entry is opened). Returns the number queued or cached.
+    """
+    size = max(MIN_SIZE, min(int(size or DEFAULT_SIZE), MAX_SIZE))
+    count = 0
+    for name in media.list_media(entry_id).get("data", []):
+        _, _, error = _schedule(entry_id, name, size)
+        if not error:
+            count += 1
+    return count
@@ -0,0 +1,279 @@
+# core/watcher.py
+"""
+Filesystem watcher for offjournal.
+
+Watches ENTRIES_DIR, MEDIA_DIR and the planner database for changes made
+by anyone (offjournal itself, the CLI, a sync tool, a text editor) and
+reports them as incremental events:
+
+- "entries:changed": {"added": [...], "updated": [...], "removed": [...],
+  "media_counts": {...}} with the index records of the entries that
+  appeared or changed, the filenames of those that disappeared, and the
+  new attachment count of entries whose media changed. Saves made by this
+  process are not reported as "updated" (see core.entry.is_own_write).
+- "planner:changed": {} when another process may have changed the
+  planner's events (see core.planner.has_outside_changes).
+
+The watcher keeps a live catalogue of the entries; changed files are
+re-stat'ed one by one (core.entry.refresh_entries), so the entry index stays
+current without rescanning the directory. The only full scan happens when
+the watcher starts.
+
+On Linux it uses inotify (through ctypes, no extra dependency). Elsewhere,
+or if inotify can't be used, it polls every POLL_INTERVAL seconds; polling
+notices entries that are added, removed or replaced (renamed over), but
+not edits made in place.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+
+from . import entry, media, planner
+
+# Seconds between two checks when polling
+POLL_INTERVAL = 1.0
+
+# Changes are reported once no new change has arrived for this many seconds,
+# so a burst (a sync tool copying many files) becomes a single event
+DEBOUNCE_SECONDS = 0.2
+
+# inotify event flags (from <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_inotify():
+    """Returns libc if it provides inotify (Linux only), or None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+def _is_entry_name(name: str) -> bool:
+    return name.endswith((entry.ENTRY_SUFFIX, entry.ENCRYPTED_SUFFIX)) and not name.startswith(".")
+
+def _stamps(directory: Path, accept: Callable[[str], bool]) -> dict[str, tuple]:
+    """(mtime_ns, size) of the accepted files in a directory."""
+    stamps = {}
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                if accept(item.name) and item.is_file():
+                    st = item.stat()
+                    stamps[item.name] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        pass
+    return stamps
+
+
+class Watcher:
+    """
+    Watches the journal's directories on a background thread and calls
+    callback(event, data) from that thread for every change it reports.
+    """
+
+    def __init__(self, callback: Callable[[str, dict], None], use_inotify: bool = True,
+                 poll_interval: float | None = None):
+        self.callback = callback
+        self.poll_interval = poll_interval or POLL_INTERVAL
+        self._libc = _load_inotify() if use_inotify else None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+        # Live catalogue: entry filename -> index record
+        self.entries: dict[str, dict] = {}
+        self._media_counts: dict[str, int] = {}
+        # inotify watch descriptor -> kinds watched through it
+        self._watches: dict[int, list[str]] = {}
+        self._accept: dict[str, Callable[[str], bool]] = {}
+        self.backend: str | None = None
+
+    def _sources(self) -> dict[str, tuple[Path, Callable[[str], bool]]]:
+        """What is watched: kind -> (directory, filter on the names in it)."""
+        planner_names = (planner.PLANNER_FILE.name, planner.PLANNER_FILE.with_suffix(".db").name)
+        return {
+            "entries": (entry.ENTRIES_DIR, _is_entry_name),
+            "media": (media.MEDIA_DIR, lambda name: name.startswith(media.MEDIA_DB_FILENAME)),
+            "planner": (planner.PLANNER_FILE.parent, lambda name: name.startswith(planner_names)),
+        }
+
+    def start(self) -> None:
+        """Starts watching; the initial scan runs on the watcher thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="offjournal-watcher", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Waits until the initial scan is done and changes are being watched."""
+        return self._ready.wait(timeout)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        sources = self._sources()
+        for directory, _ in sources.values():
+            directory.mkdir(parents=True, exist_ok=True)
+        self.entries = {r["filename"]: r for r in entry.iter_entries()}
+        self._media_counts = media.media_counts().get("data", {})
+        # Only changes made after this point are reported
+        planner.has_outside_changes()
+
+        fd = self._inotify_open(sources) if self._libc is not None else None
+        self.backend = "inotify" if fd is not None else "polling"
+        try:
+            if fd is not None:
+                self._watch_inotify(fd, sources)
+            else:
+                self._watch_polling(sources)
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    # --- inotify ---
+
+    def _inotify_open(self, sources: dict) -> int | None:
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if not self._add_watches(fd, sources):
+            os.close(fd)
+            return None
+        return fd
+
+    def _add_watches(self, fd: int, sources: dict) -> bool:
+        """(Re)watches every source directory; returns False if one couldn't be watched."""
+        self._watches = {}
+        ok = True
+        for kind, (directory, _) in sources.items():
+            wd = self._libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                ok = False
+                continue
+            self._watches.setdefault(wd, []).append(kind)
+        return ok
+
+    def _read_inotify(self, fd: int, names: set[str], kinds: set[str]) -> bool:
+        """Adds the changes waiting on fd to names/kinds; returns False if events were lost."""
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return True
+        complete = True
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & (_IN_Q_OVERFLOW | _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                complete = False
+                continue
+            for kind in self._watches.get(wd, ()):
+                if self._accept[kind](name):
+                    kinds.add(kind)
+                    if kind == "entries":
+                        names.add(name)
+        return complete
+
+    def _watch_inotify(self, fd: int, sources: dict) -> None:
+        self._accept = {kind: accept for kind, (_, accept) in sources.items()}
+        self._ready.set()
+        while not self._stop.is_set():
+            if not select.select([fd], [], [], self.poll_interval)[0]:
+                continue
+            names, kinds = set(), set()
+            complete = self._read_inotify(fd, names, kinds)
+            # Keep collecting until the burst is over
+            while select.select([fd], [], [], DEBOUNCE_SECONDS)[0] and not self._stop.is_set():
+                complete = self._read_inotify(fd, names, kinds) and complete
+            if not complete:
+                # The kernel queue overflowed or a directory was replaced: watch the
+                # directories again (where they exist) and check everything once
+                self._add_watches(fd, sources)
+                names, kinds = None, set(sources)
+            self._report(names, kinds)
+
+    # --- polling ---
+
+    def _watch_polling(self, sources: dict) -> None:
+        entries_dir = sources["entries"][0]
+        dir_mtime = entry._stat_mtime(entries_dir)
+        snapshots = {kind: _stamps(directory, accept) for kind, (directory, accept) in sources.items()
+                     if kind != "entries"}
+        self._ready.set()
+        while not self._stop.wait(self.poll_interval):
+            kinds = set()
+            current = entry._stat_mtime(entries_dir)
+            if current != dir_mtime:
+                dir_mtime = current
+                kinds.add("entries")
+            for kind, old in snapshots.items():
+                new = _stamps(*sources[kind])
+                if new != old:
+                    snapshots[kind] = new
+                    kinds.add(kind)
+            if kinds:
+                self._report(None, kinds)
+
+    # --- reporting ---
+
+    def _report(self, names: set[str] | None, kinds: set[str]) -> None:
+        """Updates the catalogue for a batch of changes and calls back with what actually changed."""
+        changes = {"added": [], "updated": [], "removed": [], "media_counts": {}}
+        if "media" in kinds:
+            counts = media.media_counts().get("data", {})
+            for entry_id in counts.keys() | self._media_counts.keys():
+                if counts.get(entry_id, 0) != self._media_counts.get(entry_id, 0):
+                    changes["media_counts"][entry_id] = counts.get(entry_id, 0)
+            self._media_counts = counts
+
+        if "entries" in kinds:
+            if names is None:
+                # No list of names (polling, or lost events): compare the directory listing
+                names = set(_stamps(entry.ENTRIES_DIR, _is_entry_name)) | set(self.entries)
+            for name, record in sorted(entry.refresh_entries(names).items()):
+                old = self.entries.get(name)
+                if record is None:
+                    if old is not None:
+                        del self.entries[name]
+                        changes["removed"].append(name)
+                elif record != old:
+                    self.entries[name] = record
+                    if old is not None and entry.is_own_write(entry.ENTRIES_DIR / name):
+                        # One of our own saves: the editor that sent it already has this content
+                        continue
+                    record = {**record, "media_count": self._media_counts.get(record["id"], 0)}
+                    changes["added" if old is None else "updated"].append(record)
+
+        if any(changes.values()):
+            self.callback("entries:changed", changes)
+        if "planner" in kinds and planner.has_outside_changes():
+            self.callback("planner:changed", {})
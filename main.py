@@ -8,14 +8,23 @@ for the GUI application.
 """
 import argparse
 import sys
-import subprocess
 from pathlib import Path
 
 # Add the project root to the Python path to allow importing 'core'
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-from core import entry, planner, mood, crypto, export, media
+# The core modules are imported by the handlers that use them, so each
+# command only pays for what it needs at startup.
+
+# CLI names of the mood time-series periods
+MOOD_PERIODS = {"diario": "daily", "semanal": "weekly", "mensal": "monthly"}
+
+# CLI names of the planner recurrence frequencies (core.planner.RECURRENCE_FREQUENCIES)
+RECURRENCE_NAMES = {"diario": "daily", "semanal": "weekly", "mensal": "monthly", "anual": "yearly"}
+
+# Single-file export formats; must match core.export.JOURNAL_FORMATS
+EXPORT_FORMATS = ("zip", "tar.gz", "jsonl", "md")
 
 def main_cli():
     """Parses arguments and dispatches to the correct handler."""
@@ -36,25 +45,66 @@ def main_cli():
     parser_read = subparsers.add_parser("ler", help="Ler o conteúdo de uma entrada")
     parser_read.add_argument("id", help="ID (prefixo do timestamp) da entrada a ser lida")
 
-    subparsers.add_parser("listar", help="Listar todas as entradas do diário")
+    parser_list = subparsers.add_parser("listar", help="Listar as entradas do diário, das mais recentes para as mais antigas")
+    parser_list.add_argument("--limite", type=int, default=50, help="Número de entradas por página (padrão: 50)")
+    parser_list.add_argument("--depois", metavar="ID", help="Listar apenas as entradas mais antigas que este ID")
+    parser_list.add_argument("--todas", action="store_true", help="Listar todas as entradas, sem paginação")
 
     parser_delete = subparsers.add_parser("apagar", help="Apagar uma entrada do diário")
     parser_delete.add_argument("id", help="ID da entrada a ser apagada")
 
+    parser_search = subparsers.add_parser("buscar", help="Buscar texto nos títulos e conteúdos das entradas")
+    parser_search.add_argument("termos", nargs="+", help="Palavras a serem buscadas")
+    parser_search.add_argument("--limite", type=int, default=20, help="Número máximo de resultados (padrão: 20)")
+
+    parser_mood = subparsers.add_parser("humor", help="Analisar o humor das entradas do diário")
+    parser_mood.add_argument("ids", nargs="*", help="IDs das entradas (padrão: todas)")
+    parser_mood.add_argument("--jobs", type=int, default=None, help="Número de processos em paralelo (padrão: um por CPU)")
+
+    parser_trend = subparsers.add_parser("tendencia", help="Mostrar a evolução do humor ao longo do tempo")
+    parser_trend.add_argument("--periodo", choices=list(MOOD_PERIODS), default="diario",
+                              help="Agrupamento dos resultados (padrão: diario)")
+    parser_trend.add_argument("--de", metavar="AAAA-MM-DD", help="Primeira data a incluir")
+    parser_trend.add_argument("--ate", metavar="AAAA-MM-DD", help="Última data a incluir")
+
+    parser_encrypt = subparsers.add_parser("encrypt-all", help="Criptografar todas as entradas do diário com GPG")
+    parser_encrypt.add_argument("destinatario", help="ID da chave GPG ou e-mail do destinatário")
+    parser_encrypt.add_argument("--jobs", type=int, default=None, help="Número de processos gpg em paralelo (padrão: um por CPU)")
+
+    parser_decrypt = subparsers.add_parser("decrypt-all", help="Descriptografar as entradas criptografadas com GPG")
+    parser_decrypt.add_argument("--jobs", type=int, default=None, help="Número de processos gpg em paralelo (padrão: um por CPU)")
+
     # --- Planner Commands ---
     parser_planner = subparsers.add_parser("planner", help="Acessar o planejador")
     planner_sub = parser_planner.add_subparsers(dest="planner_command", required=True, help="Ações do planejador")
     
     planner_sub.add_parser("listar", help="Listar todos os eventos")
+
+    p_agenda = planner_sub.add_parser("agenda", help="Listar os eventos dos próximos dias")
+    p_agenda.add_argument("--dias", type=int, default=7, help="Quantos dias a partir de hoje (padrão: 7)")
     
     p_add = planner_sub.add_parser("add", help="Adicionar novo evento")
     p_add.add_argument("data", help="Data do evento no formato AAAA-MM-DD")
     p_add.add_argument("titulo", help="Título do evento")
+    p_add.add_argument("--repetir", choices=list(RECURRENCE_NAMES), help="Repetir o evento a cada dia, semana, mês ou ano")
+    p_add.add_argument("--intervalo", type=int, default=1, help="Repetir a cada N períodos (padrão: 1)")
+    p_add.add_argument("--ate", metavar="AAAA-MM-DD", help="Última data da repetição")
+    p_add.add_argument("--vezes", type=int, help="Número total de ocorrências")
+
+    p_skip = planner_sub.add_parser("pular", help="Remover uma única ocorrência de um evento que se repete")
+    p_skip.add_argument("id", type=int, help="ID numérico do evento")
+    p_skip.add_argument("data", help="Data da ocorrência no formato AAAA-MM-DD")
     
     p_del = planner_sub.add_parser("del", help="Remover um evento")
     p_del.add_argument("id", type=int, help="ID numérico do evento a ser removido")
 
-    # TODO: Re-implement other commands (export, crypto) in a similar fashion.
+    parser_export = subparsers.add_parser("exportar", help="Exportar o diário para uma pasta de backup ou um arquivo")
+    parser_export.add_argument("destino", help="Pasta de backup (formato 'pasta') ou arquivo de saída")
+    parser_export.add_argument("--formato", choices=["pasta", *EXPORT_FORMATS], default="pasta",
+                               help="'pasta' copia só as entradas novas ou alteradas desde a última exportação (padrão)")
+    parser_export.add_argument("--de", metavar="AAAA-MM-DD", help="Primeira data a incluir")
+    parser_export.add_argument("--ate", metavar="AAAA-MM-DD", help="Última data a incluir")
+    parser_export.add_argument("--midia", action="store_true", help="Incluir as mídias (apenas zip e tar.gz)")
 
     args = parser.parse_args()
 
@@ -62,28 +112,150 @@ def main_cli():
     if args.command == "gui":
         run_gui_app()
     elif args.command == "nova":
+        from core import entry
         handle_cli_response(entry.create_entry(args.titulo))
     elif args.command == "ler":
+        from core import entry
         content = entry.get_entry_content(args.id)
         if content is not None:
             print(content)
         else:
             print(f"Erro: Entrada com ID '{args.id}' não encontrada.")
     elif args.command == "listar":
-        entries = entry.get_entries()
-        if not entries:
-            print("Nenhuma entrada no diário encontrada.")
-            return
-        print("--- Entradas do Diário ---")
-        for e in entries:
-            print(f"  ID: {e['id']} | Título: {e['title']}")
+        handle_list_command(args)
     elif args.command == "apagar":
+        from core import entry
         handle_cli_response(entry.delete_entry(args.id))
+    elif args.command == "buscar":
+        from core import search
+        results = search.search(" ".join(args.termos), args.limite)
+        if not results:
+            print("Nenhuma entrada encontrada.")
+            return
+        print("--- Resultados da Busca ---")
+        for r in results:
+            print(f"  ID: {r['id']} | Título: {r['title']} | Relevância: {r['score']:.3f}")
+            print(f"      {r['snippet']}")
+    elif args.command == "humor":
+        handle_mood_command(args)
+    elif args.command == "exportar":
+        from core import export
+        if args.formato == "pasta":
+            handle_cli_response(export.export_incremental(args.destino, args.de, args.ate))
+        else:
+            handle_cli_response(export.export_journal(args.formato, args.destino, args.de, args.ate, args.midia))
+    elif args.command == "encrypt-all":
+        handle_encrypt_all_command(args)
+    elif args.command == "decrypt-all":
+        handle_decrypt_all_command(args)
+    elif args.command == "tendencia":
+        handle_trend_command(args)
     elif args.command == "planner":
         handle_planner_command(args)
 
+def handle_list_command(args):
+    """Prints the entry listing one page at a time (or streams all of it with --todas)."""
+    from core import entry
+    if args.todas:
+        entries = entry.iter_entries(args.depois)
+        next_cursor = None
+    else:
+        page = entry.get_entries_page(args.depois, args.limite)
+        entries, next_cursor = page["entries"], page["next_cursor"]
+
+    printed = 0
+    for e in entries:
+        if printed == 0:
+            print("--- Entradas do Diário ---")
+        print(f"  ID: {e['id']} | Título: {e['title']}")
+        printed += 1
+
+    if printed == 0:
+        print("Nenhuma entrada no diário encontrada.")
+    elif next_cursor:
+        print(f"Mostrando {printed} de {page['total']} entradas. "
+              f"Para ver mais: offjournal listar --depois {Path(next_cursor).stem}")
+
+def handle_mood_command(args):
+    """Prints the mood of the selected entries (or of the whole journal) and a summary."""
+    from core import mood
+    if args.ids:
+        result = mood.analyze_moods(args.ids, jobs=args.jobs)
+    else:
+        result = mood.analyze_all_moods(jobs=args.jobs)
+
+    if not result["data"]:
+        print("Nenhuma entrada no diário encontrada.")
+        return
+    print("--- Humor das Entradas ---")
+    for r in result["data"]:
+        if r["status"] == "success":
+            print(f"  ID: {r['entry_id']} | Humor: {r['mood']:<8} | "
+                  f"Positivo: {r['positive_score']} | Negativo: {r['negative_score']}")
+        else:
+            print(f"  ID: {r['entry_id']} | Erro: {r['message']}")
+    summary = result["summary"]
+    print(f"Resumo: {summary['Positivo']} positivas, {summary['Negativo']} negativas, "
+          f"{summary['Neutro']} neutras" + (f", {summary['Erro']} com erro" if summary["Erro"] else ""))
+
+def handle_encrypt_all_command(args):
+    """Encrypts every plain entry, printing progress, and reports the files that failed."""
+    from core import crypto, entry
+    # Entries already encrypted at rest would only get a second layer (".md.gpg.gpg")
+    paths = [entry.ENTRIES_DIR / r["filename"] for r in entry.iter_entries()
+             if not r["filename"].endswith(entry.ENCRYPTED_SUFFIX)]
+    if not paths:
+        print("Nenhuma entrada sem criptografia encontrada.")
+        return
+    report_crypto_batch(lambda progress: crypto.encrypt_many(paths, args.destinatario, jobs=args.jobs,
+                                                             progress=progress))
+
+def handle_decrypt_all_command(args):
+    """Decrypts every encrypted entry next to its .gpg file, printing progress."""
+    from core import crypto, entry
+    # Once decrypted, the plain copy is the one listed, as after encrypt-all
+    paths = [entry.ENTRIES_DIR / r["filename"] for r in entry.iter_entries()
+             if r["filename"].endswith(entry.ENCRYPTED_SUFFIX)]
+    if not paths:
+        print("Nenhuma entrada criptografada encontrada.")
+        return
+    report_crypto_batch(lambda progress: crypto.decrypt_many(paths, jobs=args.jobs, progress=progress))
+
+def report_crypto_batch(run):
+    """Runs a crypto batch operation with a progress line, and reports the files that failed."""
+    def progress(done, total, result):
+        print(f"\r[{done}/{total}] {Path(result['path']).name}", end="", flush=True)
+
+    result = run(progress)
+    print()
+    for r in result["data"]:
+        if r["status"] == "error":
+            print(f"  {Path(r['path']).name}: {r['message']}", file=sys.stderr)
+    handle_cli_response(result)
+
+def handle_trend_command(args):
+    """Prints the mood aggregates per day, week or month."""
+    from core import mood
+    result = mood.get_mood_timeseries(MOOD_PERIODS[args.periodo], args.de, args.ate)
+    if result["status"] != "success":
+        handle_cli_response(result)
+        return
+    if not result["data"]:
+        print("Nenhuma entrada no período.")
+        return
+    print(f"--- Tendência de Humor ({args.periodo}) ---")
+    for b in result["data"]:
+        print(f"  {b['bucket']:<10} | {b['entries']:>4} entradas | Humor: {b['mood']:<8} | "
+              f"Saldo: {b['balance']:+.2f} | +{b['positive_entries']} -{b['negative_entries']} ={b['neutral_entries']}")
+
+def format_event(ev: dict) -> str:
+    """One line of a planner listing; recurring events are marked with 🔁."""
+    mark = " 🔁" if ev.get("recurrence") else ""
+    return f"  ID: {ev['id']:<3} | Data: {ev['date']} | Título: {ev['title']}{mark}"
+
 def handle_planner_command(args):
     """Handles sub-commands for the 'planner' command."""
+    from core import planner
     if args.planner_command == "listar":
         events = planner.get_events()
         if not events:
@@ -91,9 +263,23 @@ def handle_planner_command(args):
             return
         print("--- Eventos do Planejador ---")
         for ev in events:
-            print(f"  ID: {ev['id']:<3} | Data: {ev['date']} | Título: {ev['title']}")
+            print(format_event(ev))
+    elif args.planner_command == "agenda":
+        events = planner.get_upcoming_events(args.dias)
+        if not events:
+            print(f"Nenhum evento nos próximos {args.dias} dias.")
+            return
+        print(f"--- Agenda dos Próximos {args.dias} Dias ---")
+        for ev in events:
+            print(format_event(ev))
     elif args.planner_command == "add":
-        handle_cli_response(planner.add_event(args.data, args.titulo))
+        recurrence = None
+        if args.repetir:
+            recurrence = {"freq": RECURRENCE_NAMES[args.repetir], "interval": args.intervalo,
+                          "until": args.ate, "count": args.vezes}
+        handle_cli_response(planner.add_event(args.data, args.titulo, recurrence))
+    elif args.planner_command == "pular":
+        handle_cli_response(planner.skip_occurrence(args.id, args.data))
     elif args.planner_command == "del":
         handle_cli_response(planner.delete_event(args.id))
 
@@ -125,6 +311,7 @@ def run_gui_app():
         sys.exit(1)
     
     print("Iniciando a interface gráfica...")
+    import subprocess
     try:
         # Use sys.executable to ensure the same Python interpreter is used
         subprocess.run([sys.executable, str(gui_script_path)], check=True)
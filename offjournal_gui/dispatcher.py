@@ -0,0 +1,161 @@
+# offjournal_gui/dispatcher.py
+
+"""
+Background command dispatcher for the off.journal GUI.
+
+Runs backend (core) calls on a pool of worker threads so that slow disk
+access never blocks the GTK main loop, and hands each result back through
+a `post` callable (GLib.idle_add in the GUI) so the reply is delivered on
+the main thread.
+
+Commands can share a "lane": commands in the same lane run one after the
+other, in arrival order (e.g. every write to the same entry). Inside a
+lane, a waiting command marked as coalescing is replaced by a newer one
+of the same kind, and the superseded request is answered as "cancelled"
+without ever running (e.g. autosaves that were overtaken by a later one).
+
+Several commands can also be submitted as one batch: each is scheduled as
+if submitted on its own (so independent ones run in parallel), and a
+single reply carries all of their responses once the last one finishes.
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class CommandDispatcher:
+    """Runs commands off the main loop and posts their replies back to it."""
+
+    def __init__(self, post: Callable[[Callable[[], Any]], Any],
+                 reply: Callable[[dict], None], max_workers: int = 4,
+                 on_coalesce: Callable[[str], None] | None = None):
+        """
+        Args:
+            post: Schedules a callable on the main loop (e.g. GLib.idle_add).
+            reply: Delivers a response dict to the frontend; only called via `post`.
+            max_workers: Size of the worker thread pool.
+            on_coalesce: Called with the command name of every request that was
+                cancelled because a newer one replaced it.
+        """
+        self._post = post
+        self._reply = reply
+        self._on_coalesce = on_coalesce
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="offjournal-worker")
+        self._lock = threading.Lock()
+        # lane -> queue of jobs waiting behind the one that is running
+        self._lanes: dict[Hashable, deque] = {}
+        self.coalesced = 0
+
+    def submit(self, request_id: Any, command: str, func: Callable[[], Any],
+               lane: Hashable | None = None, coalesce: bool = False) -> None:
+        """
+        Schedules `func` to run on a worker thread.
+
+        Args:
+            request_id: Correlation ID echoed back in the response.
+            command: Command name, echoed back in the response.
+            func: The backend call; its return value becomes the response data.
+            lane: Commands with the same lane run sequentially, in order.
+            coalesce: If a command of the same kind is still waiting in the
+                lane, replace it with this one and cancel the older request.
+        """
+        self._schedule({"request_id": request_id, "command": command, "func": func, "coalesce": coalesce}, lane)
+
+    def submit_batch(self, request_id: Any, jobs: list[dict]) -> None:
+        """
+        Schedules several commands and replies once, when all of them have
+        finished, with {"status": "success", "command": "batch", "data": [...]}
+        holding their responses in the order given.
+
+        Args:
+            request_id: Correlation ID of the batch.
+            jobs: One dict per command with "request_id", "command" and either
+                "func" (plus optional "lane" and "coalesce", as for submit) or a
+                ready "response" (e.g. the error for an unknown command).
+        """
+        batch = {"request_id": request_id, "responses": [None] * len(jobs), "pending": len(jobs)}
+        if not jobs:
+            self._deliver({"status": "success", "command": "batch", "request_id": request_id, "data": []})
+            return
+        for i, spec in enumerate(jobs):
+            job = {"request_id": spec.get("request_id"), "command": spec.get("command"),
+                   "func": spec.get("func"), "coalesce": spec.get("coalesce", False), "batch": (batch, i)}
+            if "response" in spec:
+                self._send(job, dict(spec["response"]))
+            else:
+                self._schedule(job, spec.get("lane"))
+
+    def _schedule(self, job: dict, lane: Hashable | None) -> None:
+        command = job["command"]
+        if lane is None:
+            self._executor.submit(self._run, job)
+            return
+
+        superseded = None
+        with self._lock:
+            waiting = self._lanes.get(lane)
+            if waiting is None:
+                # Lane is idle: start right away and open it for followers
+                self._lanes[lane] = deque()
+                self._executor.submit(self._run_lane, lane, job)
+                return
+            if job["coalesce"] and waiting and waiting[-1]["coalesce"] and waiting[-1]["command"] == command:
+                superseded = waiting.pop()
+                self.coalesced += 1
+            waiting.append(job)
+
+        if superseded is not None:
+            self._send(superseded, {"status": "cancelled", "message": "Requisição substituída por uma mais recente."})
+            if self._on_coalesce is not None:
+                self._on_coalesce(command)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stops accepting work; pending jobs are dropped unless `wait` is True."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run_lane(self, lane: Hashable, job: dict) -> None:
+        """Runs a job and then every job queued behind it in the same lane."""
+        while job is not None:
+            self._run(job)
+            with self._lock:
+                waiting = self._lanes[lane]
+                if waiting:
+                    job = waiting.popleft()
+                else:
+                    del self._lanes[lane]
+                    job = None
+
+    def _run(self, job: dict) -> None:
+        try:
+            response = {"status": "success", "data": job["func"]()}
+        except Exception as e:
+            # The frontend gets the error reply; the traceback goes to the log
+            logger.exception("Backend error on command %r", job["command"])
+            response = {"status": "error", "message": f"Erro interno no backend: {str(e)}"}
+        self._send(job, response)
+
+    def _send(self, job: dict, response: dict) -> None:
+        response["command"] = job["command"]
+        response["request_id"] = job["request_id"]
+        if job.get("batch") is not None:
+            batch, i = job["batch"]
+            with self._lock:
+                batch["responses"][i] = response
+                batch["pending"] -= 1
+                if batch["pending"]:
+                    return
+            response = {"status": "success", "command": "batch", "request_id": batch["request_id"],
+                        "data": batch["responses"]}
+        self._deliver(response)
+
+    def _deliver(self, response: dict) -> None:
+        def deliver():
+            self._reply(response)
+            return False  # Run only once when used with GLib.idle_add
+
+        self._post(deliver)
@@ -4,12 +4,34 @@ document.addEventListener('DOMContentLoaded', () => {
         currentView: 'diary',
         currentEntryId: null,
         isDirty: false,
-        allEntries: [], // NOVO: Armazena a lista completa de entradas recebida do backend
+        contentVersion: null, // Versão do conteúdo salvo no backend, base para 'entries:patch'
+        savedContent: '', // Texto correspondente a 'contentVersion'
+        saveRequestId: null, // Último salvamento enviado; só a resposta dele atualiza a versão
+        allEntries: [], // Entradas já carregadas do backend (página a página)
+        listedEntries: [], // Entradas exibidas na lista (todas ou o resultado do filtro)
+        nextCursor: null, // Cursor da próxima página, ou null se tudo já foi carregado
+        loadingPage: false,
+        entriesLoaded: false, // Depois da primeira página, a lista é mantida pelos eventos 'entries:changed'
+        plannerStart: null, // Primeira data listada no planejador (AAAA-MM-DD local); null = hoje
     };
 
+    // --- Entry list paging & windowing ---
+    const PAGE_SIZE = 200;
+    const ENTRY_ROW_HEIGHT = 72; // Deve corresponder a '.virtual-list .virtual-row' no CSS
+    const OVERSCAN_ROWS = 8; // Linhas extras renderizadas acima e abaixo da área visível
+
+    // --- Planner ---
+    const PLANNER_PAGE_DAYS = 30; // Quantos dias cada clique em "Anteriores" recua
+
+    // Data no fuso local (AAAA-MM-DD); toISOString() daria a data em UTC
+    const localDate = (date = new Date()) =>
+        `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
+
     // --- Debounce for saving ---
     let saveTimeout = null;
     let statusTimeout = null;
+    let searchTimeout = null;
+    let windowFrame = null;
 
     // --- DOM Elements ---
     const elements = {
@@ -34,35 +56,107 @@ document.addEventListener('DOMContentLoaded', () => {
         saveStatus: document.getElementById('save-status'),
         btnNewEntry: document.getElementById('btn-new-entry'),
         btnAddEvent: document.getElementById('btn-add-event'),
+        btnEarlierEvents: document.getElementById('btn-earlier-events'),
+        btnTodayEvents: document.getElementById('btn-today-events'),
+        eventListHeading: document.getElementById('event-list-heading'),
         plannerDate: document.getElementById('planner-date'),
         plannerTitle: document.getElementById('planner-title'),
     };
 
     // --- API Communication Layer ---
+    // Cada requisição leva um ID de correlação; o backend responde fora de ordem
+    // e 'pendingRequests' guarda o comando e o spinner de cada uma até a resposta.
+    let nextRequestId = 1;
+    const pendingRequests = new Map();
+    const spinnerUsers = new Map(); // spinner -> número de requisições em andamento
+
+    const spinnerFor = (command) => command.startsWith('entries:') ? elements.spinners.diary : elements.spinners.planner;
+    const setSpinnerBusy = (spinner, delta) => {
+        if (!spinner) return;
+        const count = Math.max(0, (spinnerUsers.get(spinner) || 0) + delta);
+        spinnerUsers.set(spinner, count);
+        spinner.style.display = count > 0 ? 'flex' : 'none';
+    };
+
+    // Requisições feitas no mesmo ciclo do event loop são enviadas juntas, em um
+    // único envelope 'batch' que o backend responde de uma vez.
+    let outbox = [];
+    const flushOutbox = () => {
+        const messages = outbox;
+        outbox = [];
+        let message = messages[0];
+        if (messages.length > 1) {
+            message = { request_id: nextRequestId++, command: 'batch', payload: { commands: messages } };
+            pendingRequests.set(message.request_id, { command: 'batch', payload: message.payload, spinner: null });
+        }
+        try {
+            window.webkit.messageHandlers.bridge.postMessage(JSON.stringify(message));
+        } catch (error) {
+            console.error("Falha na comunicação com o backend Python.", error);
+            // Primeiro libera os spinners de cada mensagem; só então remove o envelope do lote
+            // (com uma só mensagem, o envelope é a própria mensagem)
+            messages.forEach(({ request_id }) => {
+                setSpinnerBusy(pendingRequests.get(request_id)?.spinner, -1);
+                pendingRequests.delete(request_id);
+            });
+            pendingRequests.delete(message.request_id);
+        }
+    };
+
     const api = {
         send: (command, payload = {}) => {
-            const spinner = command.startsWith('entries:') ? elements.spinners.diary : elements.spinners.planner;
-            if (spinner) spinner.style.display = 'flex';
-
-            try {
-                window.webkit.messageHandlers.bridge.postMessage(JSON.stringify({ command, payload }));
-            } catch (error) {
-                console.error("Falha na comunicação com o backend Python.", error);
-                if (spinner) spinner.style.display = 'none';
-            }
+            const requestId = nextRequestId++;
+            // Salvamentos automáticos e buscas não bloqueiam a lista com o spinner
+            const spinner = ['entries:update', 'entries:patch', 'entries:search'].includes(command) ? null : spinnerFor(command);
+            pendingRequests.set(requestId, { command, payload, spinner });
+            setSpinnerBusy(spinner, +1);
+
+            if (outbox.push({ request_id: requestId, command, payload }) === 1) queueMicrotask(flushOutbox);
+            return requestId;
         },
         entries: {
-            list: () => api.send('entries:list'),
+            list: (cursor = null) => api.send('entries:list', { cursor, limit: PAGE_SIZE }),
             getContent: (id) => api.send('entries:get_content', { id }),
             update: (id, content) => api.send('entries:update', { id, content }),
+            patch: (id, version, patches) => api.send('entries:patch', { id, version, patches }),
             create: (title) => api.send('entries:create', { title }),
             delete: (id) => api.send('entries:delete', { id }),
+            search: (query) => api.send('entries:search', { query }),
         },
         planner: {
-            list: () => api.send('planner:list'),
+            // Eventos a partir de hoje (ou da data escolhida com "Anteriores"), consultados pelo índice de datas
+            list: () => api.send('planner:list', { start: state.plannerStart || localDate(), limit: 500 }),
             add: (date, title) => api.send('planner:add', {date, title}),
             delete: (id) => api.send('planner:delete', {id}),
+            skip: (id, date) => api.send('planner:skip', {id, date}),
+        }
+    };
+
+    // Menor trecho que transforma 'before' em 'after' (prefixo e sufixo comuns são mantidos).
+    // Os índices são de unidades UTF-16, como os do JavaScript.
+    const diffText = (before, after) => {
+        const max = Math.min(before.length, after.length);
+        let start = 0;
+        while (start < max && before[start] === after[start]) start++;
+        let tail = 0;
+        while (tail < max - start && before[before.length - 1 - tail] === after[after.length - 1 - tail]) tail++;
+        return { start, end: before.length - tail, text: after.slice(start, after.length - tail) };
+    };
+
+    // Versões têm a forma "época:n"; cada alteração aceita pelo backend incrementa n
+    const nextVersion = (version) => {
+        const [epoch, n] = version.split(':');
+        return `${epoch}:${Number(n) + 1}`;
+    };
+
+    // Posição de um nome de arquivo na lista de entradas (em ordem decrescente), por busca binária
+    const entryPosition = (entries, filename) => {
+        let lo = 0, hi = entries.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (entries[mid].filename > filename) lo = mid + 1; else hi = mid;
         }
+        return lo;
     };
 
     // --- UI Rendering & Logic ---
@@ -77,26 +171,70 @@ document.addEventListener('DOMContentLoaded', () => {
             elements.views[viewName].classList.add('active-view');
             elements.navButtons[viewName].classList.add('active');
 
-            if (viewName === 'diary') api.entries.list();
+            if (viewName === 'diary') state.entriesLoaded ? handlers.filterEntries() : handlers.reloadEntries();
             if (viewName === 'planner') api.planner.list();
         },
         renderEntryList(entriesToRender) {
-            elements.entryList.innerHTML = '';
-            if (!entriesToRender || entriesToRender.length === 0) {
-                elements.entryList.innerHTML = '<li class="empty-list">Nenhuma entrada encontrada.</li>';
+            state.listedEntries = entriesToRender || [];
+            elements.entryList.scrollTop = 0;
+            ui.renderEntryWindow();
+        },
+        // Renderiza apenas as linhas visíveis (mais uma margem), posicionadas
+        // sobre um espaçador com a altura da lista inteira. O custo não depende
+        // do número de entradas carregadas.
+        renderEntryWindow() {
+            const entries = state.listedEntries;
+            const list = elements.entryList;
+            if (entries.length === 0) {
+                list.classList.remove('virtual-list');
+                list.innerHTML = '<li class="empty-list">Nenhuma entrada encontrada.</li>';
                 return;
             }
-            entriesToRender.forEach(entry => {
+
+            // O espaçador é mantido entre renderizações para não perder a posição de rolagem
+            let spacer = list.querySelector('.virtual-spacer');
+            if (!spacer) {
+                list.innerHTML = '';
+                list.classList.add('virtual-list');
+                spacer = document.createElement('li');
+                spacer.className = 'virtual-spacer';
+                list.appendChild(spacer);
+            }
+            spacer.style.height = `${entries.length * ENTRY_ROW_HEIGHT}px`;
+            list.querySelectorAll('.virtual-row').forEach(row => row.remove());
+
+            const first = Math.max(0, Math.floor(list.scrollTop / ENTRY_ROW_HEIGHT) - OVERSCAN_ROWS);
+            const last = Math.min(entries.length, Math.ceil((list.scrollTop + list.clientHeight) / ENTRY_ROW_HEIGHT) + OVERSCAN_ROWS);
+            const fragment = document.createDocumentFragment();
+            for (let i = first; i < last; i++) {
+                const entry = entries[i];
                 const li = document.createElement('li');
                 li.dataset.id = entry.id;
-                li.className = (entry.id === state.currentEntryId) ? 'selected' : '';
+                li.className = (entry.id === state.currentEntryId) ? 'virtual-row selected' : 'virtual-row';
+                li.style.top = `${i * ENTRY_ROW_HEIGHT}px`;
+                const badge = entry.media_count ? `<span class="item-badge" title="Mídias anexadas">📎 ${entry.media_count}</span>` : '';
                 li.innerHTML = `
                     <span class="item-title">${entry.title}</span>
-                    <span class="item-subtitle">${entry.id}</span>
+                    <span class="item-subtitle">${entry.id}${badge}</span>
                 `;
                 li.addEventListener('click', () => handlers.selectEntry(entry.id));
-                elements.entryList.appendChild(li);
-            });
+                fragment.appendChild(li);
+            }
+            list.appendChild(fragment);
+
+            // Busca a próxima página quando a rolagem se aproxima do fim do que já foi carregado
+            if (entries === state.allEntries && last >= entries.length - OVERSCAN_ROWS) {
+                handlers.loadNextPage();
+            }
+        },
+        scrollToEntry(index) {
+            const list = elements.entryList;
+            const top = index * ENTRY_ROW_HEIGHT;
+            if (top < list.scrollTop) {
+                list.scrollTop = top;
+            } else if (top + ENTRY_ROW_HEIGHT > list.scrollTop + list.clientHeight) {
+                list.scrollTop = top + ENTRY_ROW_HEIGHT - list.clientHeight;
+            }
         },
         renderEventList(events) {
             elements.eventList.innerHTML = '';
@@ -109,21 +247,24 @@ document.addEventListener('DOMContentLoaded', () => {
                 li.innerHTML = `
                     <div class="item-list-row">
                         <span class="event-date">${event.date}</span>
-                        <span class="event-title">${event.title}</span>
-                        <button class="btn-delete-event" data-id="${event.id}" title="Excluir evento">×</button>
+                        <span class="event-title">${event.title}${event.recurrence ? ' 🔁' : ''}</span>
+                        <button class="btn-delete-event" data-id="${event.id}" title="${event.recurrence ? 'Excluir ocorrência ou série' : 'Excluir evento'}">×</button>
                     </div>
                 `;
                 li.querySelector('.btn-delete-event').addEventListener('click', (e) => {
                     e.stopPropagation();
-                    handlers.deleteEvent(event.id, event.title);
+                    handlers.deleteEvent(event);
                 });
                 elements.eventList.appendChild(li);
             });
         },
-        showEditor(content) {
+        showEditor(content, version = null) {
             elements.entryWelcome.style.display = 'none';
             elements.entryEditor.style.display = 'flex';
             elements.editorTextarea.value = content;
+            state.savedContent = content;
+            state.contentVersion = version;
+            state.saveRequestId = null;
             elements.editorTextarea.focus();
             state.isDirty = false;
         },
@@ -154,9 +295,29 @@ document.addEventListener('DOMContentLoaded', () => {
             document.querySelectorAll('#entry-list li').forEach(item => item.classList.remove('selected'));
             document.querySelector(`#entry-list li[data-id='${id}']`)?.classList.add('selected');
         },
+        loadNextPage() {
+            if (state.nextCursor && !state.loadingPage) {
+                state.loadingPage = true;
+                api.entries.list(state.nextCursor);
+            }
+        },
+        reloadEntries() {
+            state.nextCursor = null;
+            state.loadingPage = true;
+            api.entries.list();
+        },
         saveCurrentEntry() {
             if (state.currentEntryId && state.isDirty) {
-                api.entries.update(state.currentEntryId, elements.editorTextarea.value);
+                const content = elements.editorTextarea.value;
+                if (state.contentVersion) {
+                    // Envia só o trecho alterado; a versão seguinte já é conhecida
+                    const patch = diffText(state.savedContent, content);
+                    state.saveRequestId = api.entries.patch(state.currentEntryId, state.contentVersion, [patch]);
+                    state.contentVersion = nextVersion(state.contentVersion);
+                } else {
+                    state.saveRequestId = api.entries.update(state.currentEntryId, content);
+                }
+                state.savedContent = content;
                 state.isDirty = false;
             }
         },
@@ -174,6 +335,37 @@ document.addEventListener('DOMContentLoaded', () => {
                 api.entries.create(title);
             }
         },
+        // Aplica à lista carregada as entradas criadas, alteradas ou removidas
+        // (pelo próprio app ou por fora dele, vindas do observador de arquivos).
+        applyEntryChanges({ added = [], updated = [], removed = [], media_counts = {} }) {
+            const gone = new Set(removed);
+            const changed = new Map([...added, ...updated].map(e => [e.filename, e]));
+            // Entradas mais antigas que a última página carregada chegam com a paginação
+            const oldestLoaded = state.nextCursor ? state.allEntries[state.allEntries.length - 1]?.filename : null;
+            const entries = gone.size ? state.allEntries.filter(e => !gone.has(e.filename)) : state.allEntries.slice();
+            // Alteradas são trocadas no lugar e novas entram na posição certa: a lista não é reordenada
+            changed.forEach(e => {
+                const i = entryPosition(entries, e.filename);
+                if (entries[i]?.filename === e.filename) entries[i] = e;
+                else if (!oldestLoaded || e.filename >= oldestLoaded) entries.splice(i, 0, e);
+            });
+            if (Object.keys(media_counts).length) {
+                entries.forEach(e => { if (e.id in media_counts) e.media_count = media_counts[e.id]; });
+            }
+
+            const current = state.allEntries.find(e => e.id === state.currentEntryId);
+            state.allEntries = entries;
+            if (!elements.searchInput.value) state.listedEntries = entries;
+            ui.renderEntryWindow(); // Mantém a posição de rolagem
+
+            if (!current || state.isDirty) return;
+            if (gone.has(current.filename) && !changed.has(current.filename)) {
+                ui.showWelcome();
+            } else if (changed.has(current.filename)) {
+                // Recarrega a entrada aberta se ela foi alterada por fora
+                api.send('entries:get_content', { id: current.id, reload: true });
+            }
+        },
         deleteCurrentEntry() {
             if (state.currentEntryId && confirm("Tem certeza que deseja excluir esta entrada? A ação não pode ser desfeita.")) {
                 api.entries.delete(state.currentEntryId);
@@ -188,16 +380,35 @@ document.addEventListener('DOMContentLoaded', () => {
                 alert("Por favor, preencha a data e o título do evento.");
             }
         },
-        deleteEvent(id, title) {
-            if (confirm(`Tem certeza que deseja excluir o evento "${title}"?`)) {
+        // Recua o início da lista do planejador, para alcançar (e excluir) eventos passados
+        showEarlierEvents() {
+            const [year, month, day] = (state.plannerStart || localDate()).split('-').map(Number);
+            handlers.setPlannerStart(localDate(new Date(year, month - 1, day - PLANNER_PAGE_DAYS)));
+        },
+        setPlannerStart(start) {
+            state.plannerStart = start;
+            elements.eventListHeading.textContent = start ? `Eventos desde ${start}` : 'Próximos Eventos';
+            elements.btnTodayEvents.style.display = start ? '' : 'none';
+            api.planner.list();
+        },
+        // Ocorrências de um evento que se repete carregam o ID da série: por padrão só
+        // aquela data é pulada, e a série inteira só é excluída com uma segunda confirmação
+        deleteEvent({ id, title, date, recurrence }) {
+            if (!recurrence) {
+                if (confirm(`Tem certeza que deseja excluir o evento "${title}"?`)) api.planner.delete(id);
+                return;
+            }
+            if (confirm(`O evento "${title}" se repete. Excluir apenas a ocorrência de ${date}?`)) {
+                api.planner.skip(id, date);
+            } else if (confirm(`Excluir então a série inteira de "${title}", com todas as ocorrências?`)) {
                 api.planner.delete(id);
             }
         },
         navigateEntryList(direction) {
-            const items = Array.from(elements.entryList.querySelectorAll('li[data-id]'));
+            const items = state.listedEntries;
             if (items.length === 0) return;
 
-            const currentIndex = items.findIndex(item => item.dataset.id === state.currentEntryId);
+            const currentIndex = items.findIndex(item => item.id === state.currentEntryId);
             let nextIndex;
 
             if (direction === 'down') {
@@ -205,8 +416,10 @@ document.addEventListener('DOMContentLoaded', () => {
             } else { // 'up'
                 nextIndex = (currentIndex <= 0) ? 0 : currentIndex - 1;
             }
-            
-            items[nextIndex].click();
+
+            ui.scrollToEntry(nextIndex);
+            handlers.selectEntry(items[nextIndex].id);
+            ui.renderEntryWindow();
         },
         handleKeyDown(e) {
             if (e.ctrlKey && e.key === 's') {
@@ -232,9 +445,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
             }
         },
-        // NOVO: Lógica para filtrar as entradas
+        // Filtra pelos títulos já carregados e, após uma pausa na digitação,
+        // busca também no conteúdo das entradas pelo índice do backend.
         filterEntries() {
             const searchTerm = elements.searchInput.value.toLowerCase();
+            clearTimeout(searchTimeout);
             if (!searchTerm) {
                 ui.renderEntryList(state.allEntries); // Mostra tudo se a busca estiver vazia
                 return;
@@ -243,13 +458,27 @@ document.addEventListener('DOMContentLoaded', () => {
                 entry.title.toLowerCase().includes(searchTerm)
             );
             ui.renderEntryList(filteredEntries);
+            searchTimeout = setTimeout(() => api.entries.search(searchTerm), 250);
         },
     };
 
     // --- Python Response Handler ---
-    window.handlePythonResponse = ({ status, command, data, message }) => {
-        const spinner = command.startsWith('entries:') ? elements.spinners.diary : elements.spinners.planner;
-        if (spinner) spinner.style.display = 'none';
+    window.handlePythonResponse = ({ status, command, request_id, data, message }) => {
+        const request = pendingRequests.get(request_id);
+        pendingRequests.delete(request_id);
+        if (request) setSpinnerBusy(request.spinner, -1);
+        command = command || request?.command || '';
+
+        if (command === 'batch') {
+            // Uma resposta por comando do lote; se o lote inteiro falhou, cada comando recebe o erro
+            const responses = status === 'success' ? data
+                : (request?.payload.commands || []).map(({ request_id, command }) => ({ status, command, request_id, message }));
+            responses.forEach(response => window.handlePythonResponse(response));
+            return;
+        }
+
+        // Requisição substituída por outra mais recente (ex.: salvamento automático)
+        if (status === 'cancelled') return;
 
         if (status === 'error') {
             alert(`Erro no comando '${command}': ${message || data?.message || 'Erro desconhecido'}`);
@@ -258,22 +487,68 @@ document.addEventListener('DOMContentLoaded', () => {
 
         switch (command) {
             case 'entries:list':
-                state.allEntries = data; // Armazena a lista completa
-                handlers.filterEntries(); // Renderiza com base no filtro atual
+                // A primeira página substitui a lista; as seguintes são anexadas
+                state.allEntries = data.cursor ? state.allEntries.concat(data.entries) : data.entries;
+                state.nextCursor = data.next_cursor;
+                state.loadingPage = false;
+                state.entriesLoaded = true;
+                if (data.cursor && !elements.searchInput.value) {
+                    state.listedEntries = state.allEntries;
+                    ui.renderEntryWindow(); // Mantém a posição de rolagem
+                } else {
+                    handlers.filterEntries(); // Renderiza com base no filtro atual
+                }
+                break;
+            case 'entries:search':
+                // Ignora resultados de uma busca que o usuário já apagou
+                if (elements.searchInput.value.trim()) ui.renderEntryList(data);
+                break;
+            case 'entries:get_content':
+                // Ignora o conteúdo de uma entrada que já não está mais selecionada
+                if (request && request.payload.id !== state.currentEntryId) break;
+                if (request?.payload.reload) {
+                    // Recarga após uma alteração: não é nosso próprio salvamento, nem há
+                    // edições (ou salvamentos) feitas depois que a pedimos
+                    if (state.isDirty || data.content === state.savedContent || state.saveRequestId > request_id) break;
+                }
+                ui.showEditor(data.content, data.version);
+                break;
+            case 'entries:update':
+            case 'entries:patch':
+                // Respostas de salvamentos antigos ou de outra entrada não mudam a versão atual
+                if (!request || request_id !== state.saveRequestId || request.payload.id !== state.currentEntryId) {
+                    if (data.status === 'error' && !data.conflict) ui.updateSaveStatus(data.message, true);
+                    break;
+                }
+                if (data.conflict) {
+                    // A cópia do backend não corresponde mais à nossa: envia o texto completo
+                    state.contentVersion = null;
+                    state.isDirty = true;
+                    handlers.saveCurrentEntry();
+                    break;
+                }
+                if (data.version) state.contentVersion = data.version;
+                ui.updateSaveStatus(data.message, data.status === 'error');
                 break;
-            case 'entries:get_content': ui.showEditor(data); break;
-            case 'entries:update': ui.updateSaveStatus(data.message, data.status === 'error'); break;
             case 'entries:create':
+                if (data.status !== 'success') break;
                 elements.searchInput.value = ''; // Limpa a busca para a nova entrada aparecer
-                api.entries.list();
+                handlers.applyEntryChanges({ added: [data.data] });
                 handlers.selectEntry(data.data.id);
                 break;
-            case 'entries:delete':
+            case 'entries:delete': {
+                const deleted = state.allEntries.find(e => e.id === request?.payload.id);
                 ui.showWelcome();
-                api.entries.list();
+                if (deleted) handlers.applyEntryChanges({ removed: [deleted.filename] });
+                break;
+            }
+            case 'entries:changed': handlers.applyEntryChanges(data); break;
+            case 'planner:changed':
+                if (state.currentView === 'planner') api.planner.list();
                 break;
             case 'planner:list': ui.renderEventList(data); break;
             case 'planner:add':
+            case 'planner:skip':
             case 'planner:delete':
                  api.planner.list();
                  if (command === 'planner:add' && data.status === 'success') {
@@ -293,6 +568,8 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('btn-save-entry').addEventListener('click', handlers.saveCurrentEntry);
         document.getElementById('btn-delete-entry').addEventListener('click', handlers.deleteCurrentEntry);
         elements.btnAddEvent.addEventListener('click', handlers.addNewEvent);
+        elements.btnEarlierEvents.addEventListener('click', handlers.showEarlierEvents);
+        elements.btnTodayEvents.addEventListener('click', () => handlers.setPlannerStart(null));
         
         // Event listeners para teclado
         elements.editorTextarea.addEventListener('input', handlers.onEditorInput);
@@ -308,7 +585,16 @@ document.addEventListener('DOMContentLoaded', () => {
         // NOVO: Event listener para o campo de busca
         elements.searchInput.addEventListener('input', handlers.filterEntries);
 
-        elements.plannerDate.value = new Date().toISOString().split('T')[0];
+        // Re-renderiza a janela visível da lista de entradas ao rolar
+        elements.entryList.addEventListener('scroll', () => {
+            if (windowFrame) return;
+            windowFrame = requestAnimationFrame(() => {
+                windowFrame = null;
+                ui.renderEntryWindow();
+            });
+        });
+
+        elements.plannerDate.value = localDate();
         ui.switchView('diary');
     };
 
@@ -19,13 +19,16 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
-from core import entry, planner
+# Core modules are reached as core.<module> when a command first runs (on a
+# worker thread), so the window doesn't wait for sqlite3, gpg or the watcher
+import core
+from offjournal_gui.dispatcher import CommandDispatcher
 
 # Check for GTK and WebKit dependencies
 try:
     gi.require_version('Gtk', '3.0')
     gi.require_version('WebKit2', '4.0')
-    from gi.repository import Gtk, WebKit2
+    from gi.repository import GLib, Gtk, WebKit2
 except (ValueError, ImportError):
     print("Erro: Dependências da GUI não encontradas.", file=sys.stderr)
     print("Por favor, instale PyGObject e WebKit2GTK para sua distribuição.", file=sys.stderr)
@@ -33,12 +36,91 @@ except (ValueError, ImportError):
     sys.exit(1)
 
 
+def list_entries_page(cursor, limit) -> dict:
+    """One page of the entry list, with the attachment count of each entry (one query per page)."""
+    page = core.entry.get_entries_page(cursor, limit)
+    counts = core.media.media_counts([e["id"] for e in page["entries"]]).get("data", {})
+    for e in page["entries"]:
+        e["media_count"] = counts.get(e["id"], 0)
+    return page
+
+def route_command(command: str, payload: dict):
+    """
+    Maps a bridge command to its backend call.
+
+    Returns:
+        tuple | None: (func, lane, coalesce) for the dispatcher, or None if the
+        command is unknown. Commands touching the same entry share a lane so
+        they run in order; autosaves and searches still waiting behind an
+        older one are coalesced into the newest.
+    """
+    entry_id = payload.get("id")
+    if command == "entries:list":
+        return (lambda: list_entries_page(payload.get("cursor"), payload.get("limit", core.entry.PAGE_SIZE)),
+                None, False)
+    if command == "entries:get_content":
+        return lambda: core.entry.get_entry_document(entry_id), ("entry", entry_id), False
+    if command == "entries:update":
+        return lambda: core.entry.update_entry_content(entry_id, payload.get("content")), ("entry", entry_id), True
+    if command == "entries:patch":
+        # Never coalesced: each patch is relative to the version the previous one produced
+        return (lambda: core.entry.patch_entry_content(entry_id, payload.get("version"), payload.get("patches") or []),
+                ("entry", entry_id), False)
+    if command == "entries:create":
+        return lambda: core.entry.create_entry(payload.get("title")), None, False
+    if command == "entries:delete":
+        return lambda: core.entry.delete_entry(entry_id), ("entry", entry_id), False
+    if command == "entries:write_stats":
+        return lambda: core.entry.get_write_stats(), None, False
+    if command == "entries:search":
+        return lambda: core.search.search(payload.get("query", ""), payload.get("limit", 50)), "search", True
+    if command == "media:counts":
+        return lambda: core.media.media_counts(payload.get("ids")), None, False
+    if command == "media:thumbnail":
+        # Generation runs on the thumbnail pool; this worker only waits for it
+        return (lambda: core.thumbnails.get_thumbnail(entry_id, payload.get("name"), payload.get("size", core.thumbnails.DEFAULT_SIZE)),
+                None, False)
+    if command == "crypto:status":
+        return lambda: core.crypto.session_status(), None, False
+    if command == "crypto:warm_up":
+        return lambda: core.crypto.warm_up(payload.get("recipient") or core.entry.ENCRYPTION_RECIPIENT), "crypto", True
+    if command == "mood:timeseries":
+        return (lambda: core.mood.get_mood_timeseries(payload.get("period", "daily"), payload.get("start"), payload.get("end")),
+                "mood", True)
+    # SQLite already serializes planner writes (BEGIN IMMEDIATE). The shared lane keeps
+    # the replies in order: a list that started before an add/skip/delete can't come
+    # back after it and redraw the planner without that change.
+    if command == "planner:list":
+        return (lambda: core.planner.get_events(payload.get("start"), payload.get("end"), payload.get("limit")),
+                "planner", False)
+    if command == "planner:add":
+        return (lambda: core.planner.add_event(payload.get("date"), payload.get("title"), payload.get("recurrence")),
+                "planner", False)
+    if command == "planner:skip":
+        return lambda: core.planner.skip_occurrence(payload.get("id"), payload.get("date")), "planner", False
+    if command == "planner:delete":
+        return lambda: core.planner.delete_event(payload.get("id")), "planner", False
+    return None
+
+
 class App:
     """The main application class for the GUI."""
     def __init__(self):
         self.window = Gtk.Window(title="off.journal")
         self.window.set_default_size(950, 700)
-        self.window.connect("destroy", Gtk.main_quit)
+        self.window.connect("destroy", self.on_destroy)
+
+        # Backend calls run on worker threads; replies come back through the main loop
+        self.dispatcher = CommandDispatcher(post=GLib.idle_add, reply=self.send_to_js,
+                                            on_coalesce=self.on_coalesce)
+        if core.entry.ENCRYPTION_RECIPIENT:
+            # Launch gpg-agent and pin the recipient's key before the first encrypted entry is opened or saved
+            self.dispatcher.submit(None, "crypto:warm_up", route_command("crypto:warm_up", {})[0], lane="crypto")
+
+        # Changes made outside the GUI (CLI, sync tools) are pushed to the frontend as
+        # events; the watcher starts once the main loop is running
+        self.watcher = None
+        GLib.idle_add(self.start_watcher)
 
         # Set up the communication bridge between JS and Python
         self.manager = WebKit2.UserContentManager()
@@ -73,49 +155,75 @@ class App:
     def on_js_message(self, manager, message):
         """
         Handles incoming messages from the JavaScript frontend.
-        This acts as a router, mapping commands to core backend functions.
+        Parses the request on the main loop and hands the backend call to the
+        dispatcher, which runs it on a worker thread and replies asynchronously.
         """
+        command = None
+        request_id = None
         try:
             req = json.loads(message.get_js_value().to_string())
             command = req.get("command")
+            request_id = req.get("request_id")
             payload = req.get("payload", {})
-            
+
             if not command:
-                self.send_to_js({"status": "error", "message": "Comando ausente na requisição."})
+                self.send_to_js({"status": "error", "request_id": request_id, "message": "Comando ausente na requisição."})
+                return
+
+            if command == "batch":
+                # Several commands in one message, answered together
+                jobs = []
+                for sub in payload.get("commands", []):
+                    job = {"request_id": sub.get("request_id"), "command": sub.get("command")}
+                    route = route_command(job["command"], sub.get("payload", {})) if job["command"] else None
+                    if route is None:
+                        job["response"] = {"status": "error", "message": "Comando desconhecido pelo backend."}
+                    else:
+                        job["func"], job["lane"], job["coalesce"] = route
+                    jobs.append(job)
+                self.dispatcher.submit_batch(request_id, jobs)
                 return
 
-            # --- Command Router ---
-            response_data = None
-            if command == "entries:list":
-                response_data = entry.get_entries()
-            elif command == "entries:get_content":
-                response_data = entry.get_entry_content(payload.get("id"))
-            elif command == "entries:update":
-                response_data = entry.update_entry_content(payload.get("id"), payload.get("content"))
-            elif command == "entries:create":
-                response_data = entry.create_entry(payload.get("title"))
-            elif command == "entries:delete":
-                response_data = entry.delete_entry(payload.get("id"))
-            elif command == "planner:list":
-                response_data = planner.get_events()
-            elif command == "planner:add":
-                response_data = planner.add_event(payload.get("date"), payload.get("title"))
-            elif command == "planner:delete":
-                response_data = planner.delete_event(payload.get("id"))
-            else:
-                 self.send_to_js({
-                     "status": "error", 
-                     "command": command, 
-                     "message": "Comando desconhecido pelo backend."
+            route = route_command(command, payload)
+            if route is None:
+                self.send_to_js({
+                    "status": "error",
+                    "command": command,
+                    "request_id": request_id,
+                    "message": "Comando desconhecido pelo backend."
                 })
-                 return
+                return
 
-            # Send a successful response back to the frontend
-            self.send_to_js({"status": "success", "command": command, "data": response_data})
+            func, lane, coalesce = route
+            self.dispatcher.submit(request_id, command, func, lane=lane, coalesce=coalesce)
 
         except Exception as e:
             print(f"Backend Error on command '{command}': {e}", file=sys.stderr)
-            self.send_to_js({"status": "error", "command": command, "message": f"Erro interno no backend: {str(e)}"})
+            self.send_to_js({"status": "error", "command": command, "request_id": request_id,
+                             "message": f"Erro interno no backend: {str(e)}"})
+
+    def start_watcher(self):
+        """Starts watching the journal's directories; its initial scan runs on its own thread."""
+        from core import watcher
+        self.watcher = watcher.Watcher(self.on_backend_event)
+        self.watcher.start()
+        return False  # Run only once
+
+    def on_coalesce(self, command: str):
+        """Autosaves replaced by a newer one never reach core; count them in its write stats."""
+        if command == "entries:update":
+            core.entry.count_coalesced_save()
+
+    def on_backend_event(self, event: str, data: dict):
+        """Called from the watcher thread; forwards the event to the frontend on the main loop."""
+        GLib.idle_add(self.send_to_js, {"status": "success", "command": event, "request_id": None, "data": data})
+
+    def on_destroy(self, *args):
+        """Stops the watcher and the worker pool and quits the main loop."""
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.dispatcher.shutdown()
+        Gtk.main_quit()
 
     def show_error_dialog(self, title, text):
         """Displays a GTK error dialog."""
@@ -0,0 +1,51 @@
+# tests/test_benchmarks.py
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import core.entry as entry
+import core.media as media
+import core.planner as planner
+import run as benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    """The benchmark suite itself, on a tiny journal."""
+
+    def setUp(self):
+        self.saved = (entry.ENTRIES_DIR, media.MEDIA_DIR, planner.PLANNER_FILE)
+
+    def tearDown(self):
+        entry.ENTRIES_DIR, media.MEDIA_DIR, planner.PLANNER_FILE = self.saved
+        entry._indexes.clear()
+        planner._stores.clear()
+
+    def test_suite_runs_and_reports_every_benchmark(self):
+        """Test that every benchmark runs on a small synthetic journal and reports per-call times."""
+        results = benchmarks.run_suite([30], planner_events=100, media_entries=5, files_per_entry=2,
+                                       repeat=1, log=lambda message: None)
+        self.assertIn("entry.get_entries", {r["name"] for r in results})
+        self.assertIn("export.zip", {r["name"] for r in results})
+        for result in results:
+            self.assertEqual(result["size"], 30)
+            self.assertGreater(result["median_ms"], 0)
+
+    def test_compare_flags_only_real_slowdowns(self):
+        """Test that a regression needs both the relative threshold and the noise floor to be exceeded."""
+        baseline = [{"name": "entry.get_entries", "size": 1000, "median_ms": 1.0},
+                    {"name": "entry.find_entry_path", "size": 1000, "median_ms": 0.01}]
+        results = [{"name": "entry.get_entries", "size": 1000, "median_ms": 1.5},
+                   {"name": "entry.find_entry_path", "size": 1000, "median_ms": 0.03},
+                   {"name": "export.zip", "size": 1000, "median_ms": 100.0}]
+        rows = {row["name"]: row for row in benchmarks.compare(results, baseline)}
+        self.assertTrue(rows["entry.get_entries"]["regressed"])
+        self.assertFalse(rows["entry.find_entry_path"]["regressed"])  # 3x slower, but below the noise floor
+        self.assertNotIn("export.zip", rows)  # Not in the baseline
+        self.assertFalse(benchmarks.compare(results, baseline, threshold=1.0)[0]["regressed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
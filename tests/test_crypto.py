@@ -1,8 +1,10 @@
 # tests/test_crypto.py
 
+import os
 import unittest
 import tempfile
 import shutil
+import subprocess
 from pathlib import Path
 import core.crypto as crypto
 
@@ -51,5 +53,97 @@ class TestCryptoModule(unittest.TestCase):
         encrypt_result = crypto.encrypt_file(str(self.test_file), self.recipient)
         # ... (restante do teste permanece igual)
 
+@unittest.skipUnless(is_gpg_available(), "GnuPG (gpg) não encontrado no PATH, pulando teste.")
+class TestCryptoBatch(unittest.TestCase):
+    """Round trips against a throwaway keyring with a passphrase-less key."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gnupg_home = tempfile.TemporaryDirectory()
+        cls.old_home = os.environ.get("GNUPGHOME")
+        os.environ["GNUPGHOME"] = cls.gnupg_home.name
+        cls.recipient = "offjournal-test@example.com"
+        subprocess.run(["gpg", "--batch", "--passphrase", "", "--quick-gen-key", cls.recipient,
+                        "future-default", "default", "never"], capture_output=True, check=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.old_home is None:
+            os.environ.pop("GNUPGHOME", None)
+        else:
+            os.environ["GNUPGHOME"] = cls.old_home
+        subprocess.run(["gpgconf", "--kill", "gpg-agent"], capture_output=True)
+        cls.gnupg_home.cleanup()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(5):
+            path = Path(self.temp_dir.name) / f"entry{i}.md"
+            path.write_text(f"Entrada número {i}", encoding="utf-8")
+            self.files.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_encrypt_many_reports_progress_and_skips_up_to_date(self):
+        """Test batch encryption, progress reports and skipping of newer .gpg files."""
+        seen = []
+        result = crypto.encrypt_many(self.files, self.recipient, jobs=3,
+                                     progress=lambda done, total, r: seen.append((done, total)))
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["summary"], {"success": 5, "skipped": 0, "error": 0})
+        self.assertEqual(seen, [(i, 5) for i in range(1, 6)])
+        self.assertTrue(all(Path(r["output_path"]).exists() for r in result["data"]))
+
+        # Only the file that changed since it was encrypted is processed again
+        os.utime(self.files[0], ns=(0, self.files[0].with_suffix(".md.gpg").stat().st_mtime_ns + 10**9))
+        result = crypto.encrypt_many(self.files, self.recipient)
+        self.assertEqual(result["summary"], {"success": 1, "skipped": 4, "error": 0})
+        self.assertEqual(result["data"][0]["status"], "success")
+
+    def test_session_is_reused_and_warm(self):
+        """Test that the shared session launches the agent and pins a recipient on warm-up."""
+        session = crypto.get_session()
+        self.assertIs(crypto.get_session(), session)
+        status = crypto.warm_up(self.recipient)
+        self.assertTrue(status["warm"])
+        self.assertIn(self.recipient, status["recipients"])
+
+        # The fingerprint is pinned: operations use it without another keyring lookup
+        self.assertRegex(session.key_for(self.recipient), r"^[0-9A-F]{40}$")
+        self.assertEqual(session.key_for("outro@example.com"), "outro@example.com")
+        encrypted = crypto.encrypt_bytes("olá".encode(), self.recipient)
+        self.assertEqual(encrypted["status"], "success")
+        self.assertEqual(crypto.decrypt_bytes(encrypted["data"])["data"].decode(), "olá")
+
+    def test_agent_failure_is_not_reported_warm(self):
+        """Test that a session whose gpgconf can't launch the agent doesn't claim to be warm."""
+        session = crypto.GpgSession(str(Path(self.temp_dir.name) / "sem-agente"))
+        original = crypto.subprocess.run
+        calls = []
+        def failing_run(args, **kwargs):
+            calls.append(args)
+            return subprocess.CompletedProcess(args, 2)
+        crypto.subprocess.run = failing_run
+        try:
+            session.warm_up()
+            session.warm_up()
+        finally:
+            crypto.subprocess.run = original
+        self.assertFalse(session.is_warm)
+        self.assertEqual(len(calls), 1)
+
+    def test_decrypt_many_round_trip(self):
+        """Test that decrypt_many restores every file and keeps per-file errors."""
+        crypto.encrypt_many(self.files, self.recipient)
+        for path in self.files:
+            path.unlink()
+        encrypted = [p.with_suffix(".md.gpg") for p in self.files] + [Path(self.temp_dir.name) / "missing.gpg"]
+        result = crypto.decrypt_many(encrypted, jobs=2)
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["summary"], {"success": 5, "skipped": 0, "error": 1})
+        self.assertEqual(self.files[3].read_text(encoding="utf-8"), "Entrada número 3")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,124 @@
+# tests/test_dispatcher.py
+
+import unittest
+import threading
+
+import core.entry as entry
+from offjournal_gui.dispatcher import CommandDispatcher
+
+class TestCommandDispatcher(unittest.TestCase):
+    def setUp(self):
+        """Collect replies as they are posted instead of going through GLib."""
+        self.replies = []
+        self.done = threading.Condition()
+        self.dispatcher = CommandDispatcher(post=lambda callback: callback(), reply=self._on_reply)
+
+    def tearDown(self):
+        self.dispatcher.shutdown(wait=True)
+
+    def _on_reply(self, response):
+        with self.done:
+            self.replies.append(response)
+            self.done.notify_all()
+
+    def _wait_for(self, count):
+        with self.done:
+            self.assertTrue(self.done.wait_for(lambda: len(self.replies) >= count, timeout=5))
+
+    def test_reply_carries_correlation_id(self):
+        """Test that results come back with their command and request ID."""
+        self.dispatcher.submit(7, "entries:list", lambda: ["a"])
+        self._wait_for(1)
+        self.assertEqual(self.replies[0], {"status": "success", "data": ["a"],
+                                           "command": "entries:list", "request_id": 7})
+
+    def test_errors_are_reported(self):
+        """Test that an exception in a command becomes an error reply."""
+        def fail():
+            raise ValueError("boom")
+        with self.assertLogs("offjournal_gui.dispatcher", level="ERROR") as logs:
+            self.dispatcher.submit(1, "entries:list", fail)
+            self._wait_for(1)
+        self.assertIn("entries:list", logs.output[0])
+        self.assertEqual(self.replies[0]["status"], "error")
+        self.assertIn("boom", self.replies[0]["message"])
+
+    def test_lane_runs_in_order_and_coalesces(self):
+        """Test that waiting autosaves for one entry collapse into the newest one."""
+        release = threading.Event()
+        written = []
+
+        def save(content):
+            def run():
+                if content == "first":
+                    release.wait(5)
+                written.append(content)
+                return content
+            return run
+
+        lane = ("entry", "1")
+        self.dispatcher.submit(1, "entries:update", save("first"), lane=lane, coalesce=True)
+        self.dispatcher.submit(2, "entries:update", save("second"), lane=lane, coalesce=True)
+        self.dispatcher.submit(3, "entries:update", save("third"), lane=lane, coalesce=True)
+        self.dispatcher.submit(4, "entries:get_content", save("read"), lane=lane)
+        release.set()
+        self._wait_for(4)
+
+        self.assertEqual(written, ["first", "third", "read"])
+        by_id = {r["request_id"]: r["status"] for r in self.replies}
+        self.assertEqual(by_id, {1: "success", 2: "cancelled", 3: "success", 4: "success"})
+        self.assertEqual(self.dispatcher.coalesced, 1)
+
+    def test_coalesced_autosaves_count_in_write_stats(self):
+        """Test that autosaves dropped by the dispatcher show up in the entry write stats."""
+        self.dispatcher.shutdown(wait=True)
+        self.dispatcher = CommandDispatcher(post=lambda callback: callback(), reply=self._on_reply,
+                                            on_coalesce=lambda command: entry.count_coalesced_save())
+        release = threading.Event()
+        before = entry.get_write_stats()["coalesced"]
+
+        lane = ("entry", "1")
+        self.dispatcher.submit(1, "entries:update", lambda: release.wait(5), lane=lane, coalesce=True)
+        for request_id in (2, 3, 4):
+            self.dispatcher.submit(request_id, "entries:update", lambda: "saved", lane=lane, coalesce=True)
+        release.set()
+        self._wait_for(4)
+
+        self.assertEqual(entry.get_write_stats()["coalesced"], before + 2)
+
+    def test_independent_commands_do_not_wait(self):
+        """Test that a slow command does not block commands in other lanes."""
+        release = threading.Event()
+        self.dispatcher.submit(1, "planner:add", lambda: release.wait(5), lane="planner")
+        self.dispatcher.submit(2, "entries:list", lambda: "fast")
+        self._wait_for(1)
+        self.assertEqual(self.replies[0]["request_id"], 2)
+        release.set()
+        self._wait_for(2)
+
+    def test_batch_replies_once_in_order(self):
+        """Test that a batch runs its commands like single ones and answers with one combined reply."""
+        release = threading.Event()
+        lane = ("entry", "1")
+        self.dispatcher.submit_batch(10, [
+            {"request_id": 1, "command": "entries:update", "func": lambda: release.wait(5) and "saved",
+             "lane": lane, "coalesce": True},
+            {"request_id": 2, "command": "entries:update", "func": lambda: "older", "lane": lane, "coalesce": True},
+            {"request_id": 3, "command": "entries:update", "func": lambda: "newest", "lane": lane, "coalesce": True},
+            {"request_id": 4, "command": "nope", "response": {"status": "error", "message": "unknown"}},
+            {"request_id": 5, "command": "entries:list", "func": lambda: ["a"]},
+        ])
+        release.set()
+        self._wait_for(1)
+        self.dispatcher.shutdown(wait=True)
+
+        self.assertEqual(len(self.replies), 1)
+        batch = self.replies[0]
+        self.assertEqual((batch["command"], batch["request_id"], batch["status"]), ("batch", 10, "success"))
+        self.assertEqual([r["request_id"] for r in batch["data"]], [1, 2, 3, 4, 5])
+        self.assertEqual([r["status"] for r in batch["data"]], ["success", "cancelled", "success", "error", "success"])
+        self.assertEqual(batch["data"][2]["data"], "newest")
+        self.assertEqual(batch["data"][4], {"status": "success", "data": ["a"], "command": "entries:list", "request_id": 5})
+
+if __name__ == "__main__":
+    unittest.main()
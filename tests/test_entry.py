@@ -2,12 +2,18 @@
 
 import unittest
 import tempfile
+import os
 import shutil
+import subprocess
+import threading
+import time
 from pathlib import Path
 
 # We need to set the ENTRIES_DIR before importing the module
 # to ensure it uses our temporary directory for all operations.
+import core.crypto as crypto
 import core.entry as entry
+import core.mood as mood
 
 class TestEntryModule(unittest.TestCase):
 
@@ -33,6 +39,11 @@ class TestEntryModule(unittest.TestCase):
             elif item.is_dir():
                 shutil.rmtree(item)
 
+    def _bump_dir_mtime(self):
+        """Moves the directory mtime past the index, as a later outside change would."""
+        mtime = entry._index_mtime() + 1_000_000_000
+        os.utime(self.test_dir, ns=(mtime, mtime))
+
     def test_create_entry_success(self):
         """Test successful creation of a new entry."""
         result = entry.create_entry("Test Title")
@@ -78,5 +89,261 @@ class TestEntryModule(unittest.TestCase):
         
         self.assertEqual(len(entry.get_entries()), 0)
 
+    def test_get_entries_pagination(self):
+        """Test that pages follow each other without gaps or repeats."""
+        for i in range(5):
+            (self.test_dir / f"2025010100000{i}_Entry_{i}.md").write_text("x", encoding="utf-8")
+        first = entry.get_entries_page(limit=2)
+        self.assertEqual([e["id"] for e in first["entries"]], ["20250101000004", "20250101000003"])
+        self.assertEqual(first["total"], 5)
+
+        second = entry.get_entries_page(first["next_cursor"], limit=2)
+        last = entry.get_entries_page(second["next_cursor"], limit=2)
+        self.assertEqual([e["id"] for e in second["entries"]], ["20250101000002", "20250101000001"])
+        self.assertEqual([e["id"] for e in last["entries"]], ["20250101000000"])
+        self.assertIsNone(last["next_cursor"])
+
+    def test_iter_entries_streams_in_order(self):
+        """Test that the generator yields every entry newest first, starting after a cursor."""
+        for i in range(5):
+            (self.test_dir / f"2025010100000{i}_Entry_{i}.md").write_text("x", encoding="utf-8")
+        ids = [e["id"] for e in entry.iter_entries(chunk_size=2)]
+        self.assertEqual(ids, [f"2025010100000{i}" for i in reversed(range(5))])
+        self.assertEqual(len(entry.get_entries(cursor="20250101000002", limit=10)), 2)
+
+    def test_update_invalidates_cached_mood(self):
+        """Test that rewriting an entry drops its cached mood score."""
+        entry_id = entry.create_entry("Humor")["data"]["id"]
+        entry.update_entry_content(entry_id, "feliz")
+        self.assertEqual(mood.analyze_entry_mood(entry_id)["mood"], "Positivo")
+        entry.update_entry_content(entry_id, "ruim!")
+        self.assertEqual(mood.analyze_entry_mood(entry_id)["mood"], "Negativo")
+
+    def test_index_is_persisted(self):
+        """Test that creating entries writes the on-disk index."""
+        result = entry.create_entry("Indexed")
+        index_file = self.test_dir / entry.INDEX_FILENAME
+        self.assertTrue(index_file.exists())
+        self.assertIn(result["data"]["filename"], index_file.read_text(encoding="utf-8"))
+
+    def test_find_entry_path_by_prefix(self):
+        """Test that lookups match an ID prefix, like the old glob did."""
+        (self.test_dir / "20240101120000_Old.md").write_text("old", encoding="utf-8")
+        (self.test_dir / "20250101120000_New.md").write_text("new", encoding="utf-8")
+        self.assertEqual(entry.find_entry_path("2024").name, "20240101120000_Old.md")
+        self.assertEqual(entry.find_entry_path("20250101120000").name, "20250101120000_New.md")
+        self.assertIsNone(entry.find_entry_path("2023"))
+
+    def test_index_detects_outside_changes(self):
+        """Test that files added or removed by other tools are picked up."""
+        entry_id = entry.create_entry("Tracked")["data"]["id"]
+        self.assertEqual(len(entry.get_entries()), 1)
+
+        external = self.test_dir / "20200101000000_External.md"
+        external.write_text("# External", encoding="utf-8")
+        self._bump_dir_mtime()
+        self.assertEqual(entry.get_entry_content("20200101000000"), "# External")
+        self.assertEqual(len(entry.get_entries()), 2)
+
+        entry.find_entry_path(entry_id).unlink()
+        self._bump_dir_mtime()
+        self.assertIsNone(entry.find_entry_path(entry_id))
+        self.assertEqual(len(entry.get_entries()), 1)
+
+    def test_update_is_atomic_and_keeps_index_fresh(self):
+        """Test that saving replaces the file without leaving temp files or stale index records."""
+        entry_id = entry.create_entry("Atomic")["data"]["id"]
+        self.assertEqual(entry.update_entry_content(entry_id, "v2")["status"], "success")
+        self.assertEqual(entry.get_entry_content(entry_id), "v2")
+        self.assertEqual(list((self.test_dir / entry.TMP_DIRNAME).iterdir()), [])
+        self.assertEqual(entry.get_entries()[0]["size"], 2)
+
+        # A fresh process finds the saved record in the index file, without a rescan
+        entry._indexes.clear()
+        original = entry._scan_entries
+        entry._scan_entries = lambda: self.fail("the entries directory was rescanned")
+        try:
+            self.assertEqual(entry.get_entries()[0]["size"], 2)
+        finally:
+            entry._scan_entries = original
+
+    def test_saves_are_logged_and_folded_into_the_index(self):
+        """Test that saves append to the index log, which is replayed on load and folded when full."""
+        entry_id = entry.create_entry("Logged")["data"]["id"]
+        index_file = self.test_dir / entry.INDEX_FILENAME
+        log_file = self.test_dir / entry.INDEX_LOG_FILENAME
+        written = index_file.read_text(encoding="utf-8")
+        original = entry.INDEX_LOG_LIMIT
+        entry.INDEX_LOG_LIMIT = 3
+        try:
+            for i in range(3):
+                entry.update_entry_content(entry_id, "x" * (i + 1))
+            self.assertEqual(index_file.read_text(encoding="utf-8"), written)
+            self.assertEqual(len(log_file.read_text(encoding="utf-8").splitlines()), 3)
+
+            # Lines of another generation (e.g. left by an interrupted fold) are ignored
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write('{"generation":"velha","name":"20000101000000_Ghost.md","record":{}}\n')
+            entry._indexes.clear()
+            self.assertEqual([e["size"] for e in entry.get_entries()], [3])
+
+            entry.update_entry_content(entry_id, "cheio")
+            self.assertEqual(log_file.read_text(encoding="utf-8"), "")
+            entry._indexes.clear()
+            self.assertEqual(entry.get_entries()[0]["size"], 5)
+        finally:
+            entry.INDEX_LOG_LIMIT = original
+
+    def test_unchanged_and_overtaken_saves_are_skipped(self):
+        """Test that identical saves are not rewritten and overlapping saves collapse into the newest."""
+        entry_id = entry.create_entry("Coalesce")["data"]["id"]
+        before = entry.get_write_stats()
+        entry.update_entry_content(entry_id, "same")
+        self.assertTrue(entry.update_entry_content(entry_id, "same").get("unchanged"))
+
+        entry.SAVE_COALESCE_WINDOW = 0.2
+        try:
+            results = {}
+            first = threading.Thread(target=lambda: results.update(a=entry.update_entry_content(entry_id, "older")))
+            first.start()
+            time.sleep(0.05)
+            results["b"] = entry.update_entry_content(entry_id, "newest")
+            first.join()
+        finally:
+            entry.SAVE_COALESCE_WINDOW = 0.0
+        self.assertTrue(results["a"].get("coalesced"))
+        self.assertEqual(entry.get_entry_content(entry_id), "newest")
+
+        after = entry.get_write_stats()
+        self.assertEqual(after["writes"] - before["writes"], 2)
+        self.assertEqual(after["unchanged"] - before["unchanged"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 1)
+
+    def test_patch_applies_ranges_to_the_current_version(self):
+        """Test that patches (in UTF-16 offsets) update the entry and return the next version."""
+        entry_id = entry.create_entry("Patch")["data"]["id"]
+        entry.update_entry_content(entry_id, "Olá 😀 mundo")
+        document = entry.get_entry_document(entry_id)
+        self.assertEqual(document["content"], "Olá 😀 mundo")
+
+        # The emoji is two UTF-16 units, so "mundo" starts at offset 7
+        result = entry.patch_entry_content(entry_id, document["version"],
+                                           [{"start": 7, "end": 12, "text": "diário"},
+                                            {"start": 0, "end": 3, "text": "Oi"}])
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(entry.get_entry_content(entry_id), "Oi 😀 diário")
+        epoch, n = document["version"].split(":")
+        self.assertEqual(result["version"], f"{epoch}:{int(n) + 1}")
+
+        result = entry.patch_entry_content(entry_id, result["version"], [{"start": 12, "end": 12, "text": "!"}])
+        self.assertEqual(entry.get_entry_content(entry_id), "Oi 😀 diário!")
+        self.assertEqual(entry.get_entry_document(entry_id)["version"], result["version"])
+
+        invalid = entry.patch_entry_content(entry_id, result["version"], [{"start": 5, "end": 99, "text": ""}])
+        self.assertEqual(invalid["status"], "error")
+        self.assertNotIn("conflict", invalid)
+
+    def test_patch_reports_conflicts(self):
+        """Test that a stale version or an outside edit makes the patch fail without writing."""
+        entry_id = entry.create_entry("Conflict")["data"]["id"]
+        version = entry.update_entry_content(entry_id, "abc")["version"]
+        newer = entry.patch_entry_content(entry_id, version, [{"start": 3, "end": 3, "text": "d"}])["version"]
+
+        stale = entry.patch_entry_content(entry_id, version, [{"start": 0, "end": 0, "text": "x"}])
+        self.assertTrue(stale.get("conflict"))
+        self.assertEqual(entry.get_entry_content(entry_id), "abcd")
+
+        # Edited by another program: the in-memory copy must not be patched
+        path = entry.find_entry_path(entry_id)
+        path.write_text("from outside", encoding="utf-8")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        outside = entry.patch_entry_content(entry_id, newer, [{"start": 0, "end": 0, "text": "x"}])
+        self.assertTrue(outside.get("conflict"))
+        self.assertEqual(path.read_text(encoding="utf-8"), "from outside")
+
+        # The full-text fallback starts a new lineage that patches can build on
+        version = entry.update_entry_content(entry_id, "full text")["version"]
+        result = entry.patch_entry_content(entry_id, version, [{"start": 0, "end": 4, "text": "Whole"}])
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(entry.get_entry_content(entry_id), "Whole text")
+
+    def test_encrypted_copies_are_not_listed_twice(self):
+        """Test that a .md.gpg copy next to its plain entry is not a second entry."""
+        (self.test_dir / "20240101120000_Plano.md").write_text("plain", encoding="utf-8")
+        (self.test_dir / "20240101120000_Plano.md.gpg").write_bytes(b"cipher")
+        (self.test_dir / "20240202120000_Segredo.md.gpg").write_bytes(b"cipher")
+        entries = entry.get_entries()
+        self.assertEqual([e["filename"] for e in entries],
+                         ["20240202120000_Segredo.md.gpg", "20240101120000_Plano.md"])
+        self.assertEqual(entries[0]["title"], "Segredo")
+
+
+@unittest.skipUnless(shutil.which("gpg"), "GnuPG (gpg) não encontrado no PATH, pulando teste.")
+class TestEncryptedEntries(unittest.TestCase):
+    """Entries encrypted at rest, against a throwaway keyring with a passphrase-less key."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gnupg_home = tempfile.TemporaryDirectory()
+        cls.old_home = os.environ.get("GNUPGHOME")
+        os.environ["GNUPGHOME"] = cls.gnupg_home.name
+        subprocess.run(["gpg", "--batch", "--passphrase", "", "--quick-gen-key", "offjournal-test@example.com",
+                        "future-default", "default", "never"], capture_output=True, check=True)
+        cls.test_dir = Path(tempfile.mkdtemp(prefix="offjournal_encrypted_test_"))
+        cls.old_dir = entry.ENTRIES_DIR
+        entry.ENTRIES_DIR = cls.test_dir
+
+    @classmethod
+    def tearDownClass(cls):
+        entry.ENTRIES_DIR = cls.old_dir
+        shutil.rmtree(cls.test_dir)
+        if cls.old_home is None:
+            os.environ.pop("GNUPGHOME", None)
+        else:
+            os.environ["GNUPGHOME"] = cls.old_home
+        subprocess.run(["gpgconf", "--kill", "gpg-agent"], capture_output=True)
+        cls.gnupg_home.cleanup()
+
+    def setUp(self):
+        entry.ENCRYPTION_RECIPIENT = "offjournal-test@example.com"
+
+    def tearDown(self):
+        entry.ENCRYPTION_RECIPIENT = None
+        for item in self.test_dir.glob("*.md*"):
+            item.unlink()
+
+    def test_encrypted_entry_round_trip(self):
+        """Test that encrypted entries are written as ciphertext only and read back from the cache."""
+        data = entry.create_entry("Segredo")["data"]
+        self.assertTrue(data["filename"].endswith(entry.ENCRYPTED_SUFFIX))
+        self.assertEqual(data["title"], "Segredo")
+        self.assertEqual(list(self.test_dir.glob("*.md")), [])
+
+        result = entry.update_entry_content(data["id"], "# Segredo\n\nNinguém deve ler isto.")
+        self.assertEqual(result["status"], "success")
+        self.assertNotIn("Ninguém".encode(), (self.test_dir / data["filename"]).read_bytes())
+
+        # The plaintext of the last write is cached: no gpg call is needed to read it
+        original = crypto.decrypt_bytes
+        crypto.decrypt_bytes = lambda data: self.fail("entry was decrypted again")
+        try:
+            self.assertIn("Ninguém deve ler isto.", entry.get_entry_content(data["id"]))
+        finally:
+            crypto.decrypt_bytes = original
+
+        entry._content_cache.clear()
+        self.assertIn("Ninguém deve ler isto.", entry.get_entry_content(data["id"]))
+
+    def test_encrypt_existing_entry(self):
+        """Test that a plain entry is converted in place and its plain file removed."""
+        plain = self.test_dir / "20240101120000_Antiga.md"
+        plain.write_text("Texto antigo", encoding="utf-8")
+        result = entry.encrypt_entry("20240101120000")
+        self.assertEqual(result["status"], "success")
+        self.assertFalse(plain.exists())
+        self.assertEqual(entry.get_entries()[0]["filename"], "20240101120000_Antiga.md.gpg")
+        self.assertEqual(entry.get_entry_content("20240101120000"), "Texto antigo")
+        self.assertEqual(entry.encrypt_entry("20240101120000")["status"], "error")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
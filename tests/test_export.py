@@ -1,7 +1,12 @@
+import json
+import tarfile
 import unittest
 import tempfile
+import zipfile
 from pathlib import Path
+import core.entry as entry
 import core.export as export
+import core.media as media
 
 class TestExportModule(unittest.TestCase):
     def setUp(self):
@@ -31,5 +36,104 @@ class TestExportModule(unittest.TestCase):
         content = output_file.read_text(encoding="utf-8")
         self.assertIn("Test content", content)
 
+    def test_export_to_json_streams_same_document(self):
+        """Test that the streamed JSON matches json.dump, even across chunk boundaries."""
+        self.input_file.write_text('Aspas "duplas", barra \\ e acentuação ✨\nfim', encoding="utf-8")
+        output_file = Path(self.temp_dir.name) / "output.json"
+        original = export.COPY_CHUNK_SIZE
+        export.COPY_CHUNK_SIZE = 3
+        try:
+            export.export_to_json(str(self.input_file), str(output_file))
+        finally:
+            export.COPY_CHUNK_SIZE = original
+        expected = json.dumps({"source_filename": "entry.md", "export_format": "json",
+                               "content": self.input_file.read_text(encoding="utf-8")}, indent=2, ensure_ascii=False)
+        self.assertEqual(output_file.read_text(encoding="utf-8"), expected)
+
+
+class TestExportJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        base = Path(self.temp_dir.name)
+        self.old_dirs = entry.ENTRIES_DIR, media.MEDIA_DIR
+        entry.ENTRIES_DIR, media.MEDIA_DIR = base / "entries", base / "media"
+        entry.ENTRIES_DIR.mkdir()
+        for name, text in [("20250101090000_Ano_Novo.md", "# Ano Novo\n\nFeliz \"ano\" novo!"),
+                           ("20250214090000_Namorados.md", "# Namorados"),
+                           ("20250301090000_Carnaval.md", "# Carnaval")]:
+            (entry.ENTRIES_DIR / name).write_text(text, encoding="utf-8")
+        (media.MEDIA_DIR / "20250214090000").mkdir(parents=True)
+        (media.MEDIA_DIR / "20250214090000" / "foto.jpg").write_bytes(b"jpeg")
+        self.output_dir = base / "out"
+
+    def tearDown(self):
+        entry.ENTRIES_DIR, media.MEDIA_DIR = self.old_dirs
+        self.temp_dir.cleanup()
+
+    def test_export_zip_with_media(self):
+        output = self.output_dir / "diario.zip"
+        result = export.export_journal("zip", str(output), include_media=True)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["count"], 3)
+        with zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+            self.assertIn("entries/20250101090000_Ano_Novo.md", names)
+            self.assertIn("media/20250214090000/foto.jpg", names)
+        self.assertFalse(output.with_name("diario.zip.part").exists())
+
+    def test_export_tar_date_range(self):
+        output = self.output_dir / "diario.tar.gz"
+        result = export.export_journal("tar.gz", str(output), start="2025-02-01", end="2025-02-28")
+        self.assertEqual(result["count"], 1)
+        with tarfile.open(output) as archive:
+            self.assertEqual(archive.getnames(), ["entries/20250214090000_Namorados.md"])
+
+    def test_export_jsonl_and_markdown(self):
+        original = export.COPY_CHUNK_SIZE
+        export.COPY_CHUNK_SIZE = 4
+        try:
+            export.export_journal("jsonl", str(self.output_dir / "diario.jsonl"))
+            export.export_journal("md", str(self.output_dir / "diario.md"), end="2025-02-14")
+        finally:
+            export.COPY_CHUNK_SIZE = original
+        lines = (self.output_dir / "diario.jsonl").read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["id"] for r in records], ["20250101090000", "20250214090000", "20250301090000"])
+        self.assertEqual(records[0]["content"], "# Ano Novo\n\nFeliz \"ano\" novo!")
+
+        markdown = (self.output_dir / "diario.md").read_text(encoding="utf-8")
+        self.assertLess(markdown.index("# Ano Novo"), markdown.index("# Namorados"))
+        self.assertNotIn("Carnaval", markdown)
+
+    def test_incremental_export_only_writes_changes(self):
+        target = self.output_dir / "backup"
+        first = export.export_incremental(str(target))
+        self.assertEqual(first["summary"], {"added": 3, "updated": 0, "deleted": 0, "unchanged": 0})
+        self.assertEqual((target / "20250214090000_Namorados.md").read_text(encoding="utf-8"), "# Namorados")
+
+        # Nothing changed: no entry is read or written again
+        original = export._file_sha256
+        export._file_sha256 = lambda path: self.fail(f"{path} was hashed again")
+        try:
+            again = export.export_incremental(str(target))
+        finally:
+            export._file_sha256 = original
+        self.assertEqual(again["summary"]["unchanged"], 3)
+
+        (entry.ENTRIES_DIR / "20250214090000_Namorados.md").write_text("# Namorados!", encoding="utf-8")
+        (entry.ENTRIES_DIR / "20250301090000_Carnaval.md").unlink()
+        (entry.ENTRIES_DIR / "20250401090000_Abril.md").write_text("# Abril", encoding="utf-8")
+        entry._indexes.clear()  # Outside changes may fall within the directory's mtime resolution
+        result = export.export_incremental(str(target))
+        self.assertEqual(result["summary"], {"added": 1, "updated": 1, "deleted": 1, "unchanged": 1})
+        self.assertEqual((target / "20250214090000_Namorados.md").read_text(encoding="utf-8"), "# Namorados!")
+        self.assertFalse((target / "20250301090000_Carnaval.md").exists())
+
+    def test_export_journal_invalid_arguments(self):
+        output = str(self.output_dir / "x")
+        self.assertEqual(export.export_journal("rar", output)["status"], "error")
+        self.assertEqual(export.export_journal("jsonl", output, include_media=True)["status"], "error")
+        self.assertEqual(export.export_journal("zip", output, start="01/02/2025")["status"], "error")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,173 @@
+# tests/test_locking.py
+
+import json
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import core.entry as entry
+import core.locking as locking
+import core.media as media
+import core.planner as planner
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _add_events(base: str, worker: int, count: int) -> None:
+    planner.PLANNER_FILE = Path(base) / "planner.json"
+    planner.STORAGE_BACKEND = "json"
+    for i in range(count):
+        planner.add_event("2030-01-01", f"{worker}-{i}")
+
+def _create_entries(base: str, worker: int, count: int) -> None:
+    entry.ENTRIES_DIR = Path(base)
+    entry.FSYNC_POLICY = "none"
+    for i in range(count):
+        entry.create_entry(f"w{worker} {i}")
+
+@unittest.skipIf(locking.fcntl is None, "fcntl indisponível, pulando teste.")
+class TestLocking(unittest.TestCase):
+    """Inter-process locks, and the planner, entry and media writes that rely on them."""
+
+    def setUp(self):
+        self.temp_dir_obj = tempfile.TemporaryDirectory()
+        self.temp_dir = Path(self.temp_dir_obj.name)
+
+    def tearDown(self):
+        self.temp_dir_obj.cleanup()
+
+    def test_lock_held_by_another_process_times_out(self):
+        """Test that a lock held elsewhere is waited for, up to the timeout, and taken once released."""
+        holder = subprocess.Popen(
+            [sys.executable, "-c",
+             "import sys; from core import locking\n"
+             f"with locking.file_lock({str(self.temp_dir)!r}):\n"
+             "    print('ready', flush=True); sys.stdin.readline()"],
+            cwd=PROJECT_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), "ready")
+            with self.assertRaises(TimeoutError):
+                with locking.file_lock(self.temp_dir, timeout=0.1):
+                    pass
+        finally:
+            holder.communicate("\n", timeout=10)
+        with locking.file_lock(self.temp_dir, timeout=1):
+            pass
+
+    def test_lock_is_reentrant_and_excludes_threads(self):
+        """Test that a thread can nest a lock it holds, while other threads wait for it."""
+        taken = threading.Event()
+        with locking.file_lock(self.temp_dir):
+            with locking.file_lock(self.temp_dir):
+                pass
+            def take():
+                with locking.file_lock(self.temp_dir):
+                    taken.set()
+            other = threading.Thread(target=take)
+            other.start()
+            self.assertFalse(taken.wait(0.1))
+        other.join(5)
+        self.assertTrue(taken.is_set())
+
+        # A path that doesn't exist yet has nothing to protect
+        with locking.file_lock(self.temp_dir / "missing"):
+            pass
+
+    def test_index_reads_lock_only_to_reload(self):
+        """Test that lookups on a current index take no lock, and a reload after an outside change does."""
+        saved = entry.ENTRIES_DIR
+        entry.ENTRIES_DIR = self.temp_dir
+        entry._indexes.clear()
+        original = locking.file_lock
+        locked = []
+        def counting_lock(path, timeout=None):
+            locked.append(path)
+            return original(path, timeout)
+        try:
+            entry_id = entry.create_entry("Lida")["data"]["id"]
+            # Creating the .search directory for the first entry changed ENTRIES_DIR once more
+            entry.get_entries()
+            locking.file_lock = counting_lock
+            self.assertIsNotNone(entry.find_entry_path(entry_id))
+            self.assertEqual(entry.get_entries_page()["total"], 1)
+            self.assertEqual(locked, [])
+
+            (self.temp_dir / "20000101000000_De_fora.md").write_text("fora", encoding="utf-8")
+            self.assertEqual(entry.get_entries_page()["total"], 2)
+            self.assertEqual(locked, [self.temp_dir])
+        finally:
+            locking.file_lock = original
+            entry.ENTRIES_DIR = saved
+            entry._indexes.clear()
+
+    def test_concurrent_writers_lose_nothing(self):
+        """Test that processes adding JSON events and creating entries at once get unique IDs and a complete index."""
+        entries_dir = self.temp_dir / "entries"
+        entries_dir.mkdir()
+        workers = [multiprocessing.Process(target=target, args=(str(base), w, 10))
+                   for target, base in ((_add_events, self.temp_dir), (_create_entries, entries_dir))
+                   for w in range(4)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join(30)
+        self.assertEqual([p.exitcode for p in workers], [0] * len(workers))
+
+        saved = (planner.PLANNER_FILE, planner.STORAGE_BACKEND, entry.ENTRIES_DIR)
+        planner.PLANNER_FILE, planner.STORAGE_BACKEND = self.temp_dir / "planner.json", "json"
+        entry.ENTRIES_DIR = entries_dir
+        try:
+            ids = [ev["id"] for ev in planner.get_events()]
+            self.assertEqual(sorted(ids), list(range(1, 41)))
+            # The index file left by the writers is complete, as well as the listing
+            on_disk = sorted(entry._scan_entries())
+            self.assertEqual(len(on_disk), 40)
+            index = json.loads((entries_dir / entry.INDEX_FILENAME).read_text(encoding="utf-8"))
+            self.assertEqual(sorted(index["entries"]), on_disk)
+            entry._indexes.clear()
+            self.assertEqual(sorted(e["filename"] for e in entry.get_entries()), on_disk)
+        finally:
+            planner.PLANNER_FILE, planner.STORAGE_BACKEND, entry.ENTRIES_DIR = saved
+            entry._indexes.clear()
+
+    def test_media_changes_wait_for_other_processes(self):
+        """Test that detaching (and deleting an unreferenced blob) waits while another process holds the media lock."""
+        saved = media.MEDIA_DIR
+        media.MEDIA_DIR = self.temp_dir / "media"
+        source = self.temp_dir / "foto.jpg"
+        source.write_bytes(b"jpeg")
+        holder = None
+        try:
+            self.assertEqual(media.add_media("a", str(source))["status"], "success")
+            blob = media.media_path("a", "foto.jpg")
+            holder = subprocess.Popen(
+                [sys.executable, "-c",
+                 "import sys; from core import locking\n"
+                 f"with locking.file_lock({str(media.MEDIA_DIR)!r}):\n"
+                 "    print('ready', flush=True); sys.stdin.readline()"],
+                cwd=PROJECT_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            self.assertEqual(holder.stdout.readline().strip(), "ready")
+
+            results = []
+            remover = threading.Thread(target=lambda: results.append(media.remove_media("a", "foto.jpg")))
+            remover.start()
+            remover.join(0.2)
+            self.assertTrue(remover.is_alive())
+            self.assertEqual(media.media_counts()["data"], {"a": 1})
+            self.assertTrue(blob.exists())
+
+            holder.communicate("\n", timeout=10)
+            remover.join(10)
+            self.assertEqual(results[0]["status"], "success")
+            self.assertFalse(blob.exists())
+        finally:
+            if holder is not None and holder.poll() is None:
+                holder.communicate("\n", timeout=10)
+            media.MEDIA_DIR = saved
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_main.py
+
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import core.crypto as crypto
+import core.entry as entry
+import main
+
+
+class TestCliCommands(unittest.TestCase):
+    """CLI handlers, with the gpg batch calls replaced by recorders."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="offjournal_cli_test_"))
+        self.saved = (entry.ENTRIES_DIR, crypto.encrypt_many, crypto.decrypt_many)
+        entry.ENTRIES_DIR = self.temp_dir
+        entry._indexes.clear()
+        self.calls = []
+
+    def tearDown(self):
+        entry.ENTRIES_DIR, crypto.encrypt_many, crypto.decrypt_many = self.saved
+        entry._indexes.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def run_cli(self, *argv) -> str:
+        saved_argv = sys.argv
+        sys.argv = ["offjournal", *argv]
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                main.main_cli()
+        finally:
+            sys.argv = saved_argv
+        return out.getvalue()
+
+    def record(self, paths, *args, **kwargs):
+        self.calls.append([Path(p).name for p in paths])
+        return {"status": "success", "message": "ok", "data": [], "summary": {}}
+
+    def test_encrypt_all_skips_encrypted_entries(self):
+        """Test that encrypt-all only hands the plain entries to gpg."""
+        (self.temp_dir / "20240101080000_Texto.md").write_text("# Texto", encoding="utf-8")
+        (self.temp_dir / "20240102080000_Segredo.md.gpg").write_bytes(b"cifrado")
+        crypto.encrypt_many = self.record
+
+        self.run_cli("encrypt-all", "voce@exemplo.com")
+        self.assertEqual(self.calls, [["20240101080000_Texto.md"]])
+
+    def test_encrypt_all_without_plain_entries(self):
+        """Test that a journal with only encrypted entries has nothing to encrypt."""
+        (self.temp_dir / "20240102080000_Segredo.md.gpg").write_bytes(b"cifrado")
+        crypto.encrypt_many = self.record
+
+        self.assertIn("Nenhuma entrada sem criptografia", self.run_cli("encrypt-all", "voce@exemplo.com"))
+        self.assertEqual(self.calls, [])
+
+    def test_decrypt_all_only_takes_encrypted_entries(self):
+        """Test that decrypt-all hands only the encrypted entries to gpg."""
+        (self.temp_dir / "20240101080000_Texto.md").write_text("# Texto", encoding="utf-8")
+        (self.temp_dir / "20240102080000_Segredo.md.gpg").write_bytes(b"cifrado")
+        crypto.decrypt_many = self.record
+
+        self.run_cli("decrypt-all", "--jobs", "2")
+        self.assertEqual(self.calls, [["20240102080000_Segredo.md.gpg"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
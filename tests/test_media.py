@@ -45,4 +45,69 @@ class TestMediaModule(unittest.TestCase):
 
         # Verify it's gone
         final_list = media.list_media(self.entry_id)
-        self.assertEqual(len(final_list["data"]), 0)
\ No newline at end of file
+        self.assertEqual(len(final_list["data"]), 0)
+
+    def _blobs(self):
+        return [p for p in (media.MEDIA_DIR / media.BLOBS_DIRNAME).rglob("*") if p.is_file()]
+
+    def test_identical_media_is_stored_once(self):
+        """Test that the same file attached to two entries shares one blob until both are removed."""
+        other_entry = "20250715130000"
+        media.add_media(self.entry_id, str(self.source_media_file))
+        media.add_media(other_entry, str(self.source_media_file))
+        blobs = self._blobs()
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(media.media_path(other_entry, "source_image.jpg"), blobs[0])
+        self.assertEqual(blobs[0].read_text(), "dummy image content")
+
+        media.remove_media(self.entry_id, "source_image.jpg")
+        self.assertTrue(blobs[0].exists())
+        media.remove_media(other_entry, "source_image.jpg")
+        self.assertFalse(blobs[0].exists())
+
+    def test_stored_copy_is_independent_of_source(self):
+        """Test that changing the original file afterwards doesn't change the attachment."""
+        media.add_media(self.entry_id, str(self.source_media_file))
+        self.source_media_file.write_text("edited")
+        self.assertEqual(media.media_path(self.entry_id, "source_image.jpg").read_text(), "dummy image content")
+        media.remove_media(self.entry_id, "source_image.jpg")
+
+    def test_old_entry_folders_are_migrated(self):
+        """Test that media in the old per-entry folder layout moves into the store."""
+        old_dir = media.MEDIA_DIR
+        media.MEDIA_DIR = Path(tempfile.mkdtemp(prefix="offjournal_media_migration_"))
+        try:
+            for entry_id in ("20240101000000", "20240102000000"):
+                (media.MEDIA_DIR / entry_id).mkdir()
+                (media.MEDIA_DIR / entry_id / "foto.jpg").write_bytes(b"same photo")
+            self.assertEqual(media.list_media("20240102000000")["data"], ["foto.jpg"])
+            self.assertFalse((media.MEDIA_DIR / "20240101000000").exists())
+            self.assertEqual(len(self._blobs()), 1)
+            self.assertEqual(media.media_path("20240101000000", "foto.jpg").read_bytes(), b"same photo")
+        finally:
+            shutil.rmtree(media.MEDIA_DIR)
+            media.MEDIA_DIR = old_dir
+
+    def test_metadata_index_and_counts(self):
+        """Test that attachment metadata and bulk counts come from the index."""
+        other_file = media.MEDIA_DIR / "notas.pdf"
+        other_file.write_bytes(b"%PDF")
+        try:
+            media.add_media(self.entry_id, str(self.source_media_file))
+            media.add_media(self.entry_id, str(other_file))
+            media.add_media("20250715130000", str(other_file))
+
+            info = media.get_media_info(self.entry_id)["data"]
+            self.assertEqual([(i["name"], i["mime"], i["size"]) for i in info],
+                             [("notas.pdf", "application/pdf", 4), ("source_image.jpg", "image/jpeg", 19)])
+            self.assertEqual(len(info[0]["sha256"]), 64)
+
+            counts = media.media_counts([self.entry_id, "20250715130000", "20990101000000"])["data"]
+            self.assertEqual(counts, {self.entry_id: 2, "20250715130000": 1})
+
+            media.remove_media(self.entry_id, "notas.pdf")
+            self.assertEqual(media.media_counts()["data"], {self.entry_id: 1, "20250715130000": 1})
+        finally:
+            media.remove_media(self.entry_id, "source_image.jpg")
+            media.remove_media("20250715130000", "notas.pdf")
+            other_file.unlink()
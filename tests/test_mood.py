@@ -5,7 +5,7 @@ import tempfile
 import shutil
 from pathlib import Path
 
-# Override ENTRIES_DIR before importing the module
+import core.entry as entry
 import core.mood as mood
 
 class TestMoodModule(unittest.TestCase):
@@ -13,24 +13,25 @@ class TestMoodModule(unittest.TestCase):
     def setUpClass(cls):
         """Create a temporary directory for all mood analysis tests."""
         cls.test_dir = tempfile.mkdtemp(prefix="offjournal_mood_test_")
-        # Override the global ENTRIES_DIR to our temp directory
-        mood.ENTRIES_DIR = Path(cls.test_dir)
+        # Entries are found through core.entry: override its ENTRIES_DIR
+        cls.original_dir = entry.ENTRIES_DIR
+        entry.ENTRIES_DIR = Path(cls.test_dir)
 
         # Create a positive and a negative entry for testing
         cls.positive_id = "20250715100000"
-        (mood.ENTRIES_DIR / f"{cls.positive_id}_positive_day.md").write_text(
+        (entry.ENTRIES_DIR / f"{cls.positive_id}_positive_day.md").write_text(
             "# Dia Incrível\n\nEstou muito feliz e animado hoje! Que dia fantástico.", 
             encoding="utf-8"
         )
 
         cls.negative_id = "20250715100100"
-        (mood.ENTRIES_DIR / f"{cls.negative_id}_negative_day.md").write_text(
+        (entry.ENTRIES_DIR / f"{cls.negative_id}_negative_day.md").write_text(
             "# Dia Ruim\n\nMe sinto triste e frustrado. Foi um dia péssimo.",
             encoding="utf-8"
         )
         
         cls.neutral_id = "20250715100200"
-        (mood.ENTRIES_DIR / f"{cls.neutral_id}_neutral_day.md").write_text(
+        (entry.ENTRIES_DIR / f"{cls.neutral_id}_neutral_day.md").write_text(
             "# Apenas um Dia\n\nO dia foi normal, sem grandes eventos.",
             encoding="utf-8"
         )
@@ -38,6 +39,8 @@ class TestMoodModule(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Remove the temporary directory after all tests."""
+        entry.ENTRIES_DIR = cls.original_dir
+        entry._indexes.clear()
         shutil.rmtree(cls.test_dir)
 
     def test_analyze_positive_entry(self):
@@ -65,6 +68,166 @@ class TestMoodModule(unittest.TestCase):
         self.assertEqual(result["positive_score"], 0)
         self.assertEqual(result["negative_score"], 0)
 
+    def test_whole_words_only(self):
+        """Test that lexicon words are not matched inside longer words."""
+        entry_id = "20250715100300"
+        path = entry.ENTRIES_DIR / f"{entry_id}_bomba.md"
+        path.write_text("A bomba de água quebrou, que tristeza.", encoding="utf-8")
+        try:
+            result = mood.analyze_entry_mood(entry_id)
+        finally:
+            path.unlink()
+        self.assertEqual(result["positive_score"], 0)
+        self.assertEqual(result["negative_score"], 0)
+
+    def test_repeated_words_are_counted(self):
+        """Test that every occurrence of a lexicon word counts."""
+        self.assertEqual(mood._score_text("Feliz, feliz, FELIZ! Mas com medo."), (3, 1))
+
+    def test_analyze_moods_batch(self):
+        """Test batch analysis keeps the requested order and reports unknown IDs."""
+        result = mood.analyze_moods([self.negative_id, "nonexistent123", self.positive_id], jobs=1)
+        self.assertEqual(result["status"], "success")
+        moods = [r.get("mood") for r in result["data"]]
+        self.assertEqual(moods, ["Negativo", None, "Positivo"])
+        self.assertEqual(result["data"][1]["status"], "error")
+        self.assertEqual(result["summary"]["Erro"], 1)
+
+    def test_analyze_all_moods_parallel(self):
+        """Test that the process pool gives the same results as a serial run."""
+        original = mood.MIN_PARALLEL_ENTRIES
+        mood.MIN_PARALLEL_ENTRIES = 1
+        try:
+            parallel = mood.analyze_all_moods(jobs=2)
+        finally:
+            mood.MIN_PARALLEL_ENTRIES = original
+        serial = mood.analyze_all_moods(jobs=1)
+        self.assertEqual(parallel["data"], serial["data"])
+        self.assertEqual(serial["summary"], {"Positivo": 1, "Negativo": 1, "Neutro": 1, "Erro": 0})
+        self.assertEqual(serial["data"][0]["entry_id"], self.neutral_id)
+
+    def test_repeat_analysis_uses_cache(self):
+        """Test that an unchanged entry is scored from the cache without being read."""
+        mood.analyze_moods([self.positive_id], jobs=1)
+        original = mood._analyze_file
+        mood._analyze_file = lambda *args: self.fail("entry file was read again")
+        try:
+            result = mood.analyze_moods([self.positive_id], jobs=1)
+        finally:
+            mood._analyze_file = original
+        self.assertEqual(result["cache_hits"], 1)
+        self.assertEqual(result["data"][0]["mood"], "Positivo")
+
+    def test_cache_updated_on_save(self):
+        """Test that saving an entry through core.entry re-scores it from the saved content."""
+        entry_id = "20250715100400"
+        path = entry.ENTRIES_DIR / f"{entry_id}_mudanca.md"
+        path.write_text("Dia feliz.", encoding="utf-8")
+        try:
+            self.assertEqual(mood.analyze_entry_mood(entry_id)["mood"], "Positivo")
+            # Same size, and possibly the same mtime tick: the save itself updates the cache
+            self.assertEqual(entry.update_entry_content(entry_id, "Dia ruim.")["status"], "success")
+            original = mood._analyze_file
+            mood._analyze_file = lambda *args: self.fail("entry file was read again")
+            try:
+                self.assertEqual(mood.analyze_entry_mood(entry_id)["mood"], "Negativo")
+            finally:
+                mood._analyze_file = original
+        finally:
+            path.unlink()
+
+    def test_mood_timeseries_rollups(self):
+        """Test daily, weekly and monthly buckets and their incremental update."""
+        original_dir = entry.ENTRIES_DIR
+        entry.ENTRIES_DIR = Path(tempfile.mkdtemp(prefix="offjournal_mood_series_", dir=self.test_dir))
+        try:
+            # 2025-07-13 is a Sunday, so it belongs to the week starting on 2025-07-07
+            (entry.ENTRIES_DIR / "20250713090000_domingo.md").write_text("Dia feliz.", encoding="utf-8")
+            (entry.ENTRIES_DIR / "20250714090000_segunda.md").write_text("Dia triste.", encoding="utf-8")
+            (entry.ENTRIES_DIR / "20250714180000_noite.md").write_text("Muito feliz, ótimo.", encoding="utf-8")
+            # The first save creates core.entry's .tmp and .search directories, changing the index stamp
+            entry.update_entry_content("20250713090000", "Dia feliz.")
+
+            daily = mood.get_mood_timeseries("daily")["data"]
+            self.assertEqual([b["bucket"] for b in daily], ["2025-07-13", "2025-07-14"])
+            self.assertEqual(daily[1]["entries"], 2)
+            self.assertEqual((daily[1]["positive_score"], daily[1]["negative_score"]), (2, 1))
+            weekly = mood.get_mood_timeseries("weekly")["data"]
+            self.assertEqual([b["bucket"] for b in weekly], ["2025-07-07", "2025-07-14"])
+            monthly = mood.get_mood_timeseries("monthly")["data"]
+            self.assertEqual([(b["bucket"], b["entries"]) for b in monthly], [("2025-07", 3)])
+
+            # Saving one entry only moves its own contribution, and needs no reconcile
+            self.assertEqual(entry.update_entry_content("20250714090000", "Dia alegre.")["status"], "success")
+            original = mood._plain_entries
+            mood._plain_entries = lambda: self.fail("the journal was reconciled again")
+            try:
+                daily = mood.get_mood_timeseries("daily", start="2025-07-14")["data"]
+            finally:
+                mood._plain_entries = original
+            self.assertEqual(len(daily), 1)
+            self.assertEqual((daily[0]["positive_entries"], daily[0]["mood"]), (2, "Positivo"))
+
+            # Deleting one drops it from its buckets at once
+            self.assertEqual(entry.delete_entry("20250714180000")["status"], "success")
+            mood._plain_entries = lambda: self.fail("the journal was reconciled again")
+            try:
+                monthly = mood.get_mood_timeseries("monthly")["data"]
+            finally:
+                mood._plain_entries = original
+            self.assertEqual([(b["bucket"], b["entries"]) for b in monthly], [("2025-07", 2)])
+
+            # A week bucket is included when the range starts in the middle of it
+            weekly = mood.get_mood_timeseries("weekly", start="2025-07-10", end="2025-07-12")["data"]
+            self.assertEqual([b["bucket"] for b in weekly], ["2025-07-07"])
+        finally:
+            entry.ENTRIES_DIR = original_dir
+
+    def test_mood_timeseries_follows_outside_changes(self):
+        """Test that entries edited or deleted outside offjournal, and undated names, keep the rollups right."""
+        original_dir = entry.ENTRIES_DIR
+        entry.ENTRIES_DIR = Path(tempfile.mkdtemp(prefix="offjournal_mood_outside_", dir=self.test_dir))
+        try:
+            kept = entry.ENTRIES_DIR / "20250714090000_fica.md"
+            kept.write_text("Dia feliz.", encoding="utf-8")
+            removed = entry.ENTRIES_DIR / "20250715090000_sai.md"
+            removed.write_text("Dia triste.", encoding="utf-8")
+            # Looks dated, but month 13 has no bucket: cached, and the other rows still are
+            (entry.ENTRIES_DIR / "20251399090000_invalida.md").write_text("Dia ruim.", encoding="utf-8")
+            daily = mood.get_mood_timeseries("daily")["data"]
+            self.assertEqual([b["bucket"] for b in daily], ["2025-07-14", "2025-07-15"])
+
+            removed.unlink()
+            kept.write_text("Dia muito triste e ruim.", encoding="utf-8")
+            daily = mood.get_mood_timeseries("daily")["data"]
+            self.assertEqual([(b["bucket"], b["mood"], b["negative_score"]) for b in daily],
+                             [("2025-07-14", "Negativo", 2)])
+            weekly = mood.get_mood_timeseries("weekly")["data"]
+            self.assertEqual([(b["bucket"], b["entries"]) for b in weekly], [("2025-07-14", 1)])
+        finally:
+            entry.ENTRIES_DIR = original_dir
+
+    def test_mood_timeseries_invalid_arguments(self):
+        """Test that unknown periods and malformed dates are rejected."""
+        self.assertEqual(mood.get_mood_timeseries("hourly")["status"], "error")
+        self.assertEqual(mood.get_mood_timeseries("daily", start="15/07/2025")["status"], "error")
+
+    def test_encrypted_entry_is_not_analyzed(self):
+        """Test that an entry stored encrypted is found through the index but not read as text."""
+        path = entry.ENTRIES_DIR / "20250715100500_cifrada.md.gpg"
+        path.write_bytes(b"\x85\x02cifrado")
+        try:
+            result = mood.analyze_entry_mood("20250715100500")
+            batch = mood.analyze_moods(["20250715100500", self.positive_id], jobs=1)
+            every = mood.analyze_all_moods(jobs=1)
+        finally:
+            path.unlink()
+        self.assertEqual(result["status"], "error")
+        self.assertIn("criptografada", result["message"])
+        self.assertIn("criptografada", batch["data"][0]["message"])
+        self.assertEqual(batch["data"][1]["mood"], "Positivo")
+        self.assertNotIn("20250715100500", [r["entry_id"] for r in every["data"]])
+
     def test_analyze_non_existent_entry(self):
         """Test analyzing an entry that does not exist."""
         result = mood.analyze_entry_mood("nonexistent123")
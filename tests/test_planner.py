@@ -3,6 +3,8 @@
 import unittest
 import tempfile
 import json
+import sqlite3
+from datetime import date
 from pathlib import Path
 
 # Override PLANNER_FILE before importing
@@ -103,6 +105,160 @@ class TestPlannerModule(unittest.TestCase):
         self.assertEqual(events[0]["title"], "Título Novo")
         self.assertEqual(events[0]["date"], "2026-02-02")
 
+    def test_get_events_date_range(self):
+        """Test that only events inside the requested range are returned."""
+        for day in ("2025-01-05", "2025-01-10", "2025-01-15", "2025-02-01"):
+            planner.add_event(day, f"Evento {day}")
+
+        events = planner.get_events(start="2025-01-10", end="2025-01-31")
+        self.assertEqual([ev["date"] for ev in events], ["2025-01-10", "2025-01-15"])
+        self.assertEqual(len(planner.get_events(start="2025-01-06")), 3)
+        self.assertEqual(len(planner.get_events(end="2025-01-10", limit=1)), 1)
+        self.assertEqual(planner.get_events(start="ontem"), [])
+
+    def test_get_upcoming_events(self):
+        """Test the 'next N days' agenda, inclusive of today."""
+        planner.add_event("2025-03-09", "Ontem")
+        planner.add_event("2025-03-10", "Hoje")
+        planner.add_event("2025-03-16", "Daqui a seis dias")
+        planner.add_event("2025-03-17", "Daqui a uma semana")
+
+        events = planner.get_upcoming_events(7, today=date(2025, 3, 10))
+        self.assertEqual([ev["title"] for ev in events], ["Hoje", "Daqui a seis dias"])
+
+    def test_json_backend_date_range(self):
+        """Test range queries on the JSON backend as well."""
+        planner.STORAGE_BACKEND = "json"
+        try:
+            for day in ("2025-01-05", "2025-01-10", "2025-01-15"):
+                planner.add_event(day, "Evento")
+            events = planner.get_events(start="2025-01-06", end="2025-01-15")
+            self.assertEqual([ev["date"] for ev in events], ["2025-01-10", "2025-01-15"])
+        finally:
+            planner.STORAGE_BACKEND = "sqlite"
+
+    def test_migrates_existing_json_file(self):
+        """Test that an old planner.json is imported into SQLite with its IDs."""
+        old_events = [
+            {"id": 3, "date": "2025-05-01", "title": "Feriado"},
+            {"id": 7, "date": "2025-01-10", "title": "Consulta"},
+        ]
+        planner.PLANNER_FILE.write_text(json.dumps(old_events), encoding="utf-8")
+
+        events = planner.get_events()
+        self.assertEqual([ev["id"] for ev in events], [7, 3])
+        self.assertTrue(planner.PLANNER_FILE.with_suffix(".db").exists())
+        self.assertFalse(planner.PLANNER_FILE.exists())
+        self.assertTrue((self.temp_dir / "planner.json.bak").exists())
+
+        # New IDs continue after the migrated ones
+        self.assertEqual(planner.add_event("2025-06-01", "Novo")["data"]["id"], 8)
+
+    def test_json_backend(self):
+        """Test that the original JSON storage is still available as a backend."""
+        planner.STORAGE_BACKEND = "json"
+        try:
+            planner.add_event("2025-03-01", "Em JSON")
+            saved = json.loads(planner.PLANNER_FILE.read_text(encoding="utf-8"))
+            self.assertEqual(saved[0]["title"], "Em JSON")
+            self.assertEqual(planner.delete_event(1)["status"], "success")
+            self.assertEqual(planner.get_events(), [])
+        finally:
+            planner.STORAGE_BACKEND = "sqlite"
+
+    def test_outside_changes_are_told_apart_from_own_writes(self):
+        """Test has_outside_changes() on both backends."""
+        for backend in ("sqlite", "json"):
+            with self.subTest(backend=backend):
+                planner.STORAGE_BACKEND = backend
+                planner.PLANNER_FILE = self.temp_dir / f"{backend}.json"
+                try:
+                    self.assertFalse(planner.has_outside_changes())
+                    planner.add_event("2025-03-01", "Nosso")
+                    self.assertFalse(planner.has_outside_changes())
+                    if backend == "sqlite":
+                        conn = sqlite3.connect(planner.PLANNER_FILE.with_suffix(".db"))
+                        with conn:
+                            conn.execute("INSERT INTO events (date, title) VALUES ('2025-03-02', 'De fora')")
+                        conn.close()
+                    else:
+                        planner.PLANNER_FILE.write_text("[]", encoding="utf-8")
+                    self.assertTrue(planner.has_outside_changes())
+                    self.assertFalse(planner.has_outside_changes())
+                finally:
+                    planner.STORAGE_BACKEND = "sqlite"
+
+    def test_recurring_event_expands_inside_range(self):
+        """Test that a weekly event is listed once per occurrence, merged in date order."""
+        result = planner.add_event("2025-01-06", "Reunião", {"freq": "weekly", "interval": 2})
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["data"]["last_date"], "9999-12-31")
+        planner.add_event("2025-01-25", "Aniversário")
+
+        events = planner.get_events(start="2025-01-10", end="2025-02-20")
+        self.assertEqual([(ev["date"], ev["title"]) for ev in events], [
+            ("2025-01-20", "Reunião"), ("2025-01-25", "Aniversário"),
+            ("2025-02-03", "Reunião"), ("2025-02-17", "Reunião"),
+        ])
+        self.assertEqual(events[0]["recurrence"]["freq"], "weekly")
+        self.assertNotIn("recurrence", events[1])
+        self.assertEqual(len(planner.get_events(start="2025-01-10", end="2025-02-20", limit=2)), 2)
+
+        # Open-ended events are listed up to the horizon when there is no end date
+        far = planner.get_events(start="2030-01-01")
+        self.assertTrue(far)
+        self.assertLessEqual(far[-1]["date"], "2031-01-01")
+
+    def test_recurrence_count_until_and_exceptions(self):
+        """Test that a series stops at its count or end date and skips its exceptions."""
+        counted = planner.add_event("2025-03-01", "Remédio", {"freq": "daily", "count": 3})["data"]
+        self.assertEqual(counted["last_date"], "2025-03-03")
+        planner.add_event("2025-03-01", "Aula", {"freq": "daily", "interval": 2, "until": "2025-03-06"})
+
+        self.assertEqual(planner.skip_occurrence(counted["id"], "2025-03-02")["status"], "success")
+        events = planner.get_events(start="2025-03-01", end="2025-03-31")
+        self.assertEqual([(ev["date"], ev["title"]) for ev in events], [
+            ("2025-03-01", "Remédio"), ("2025-03-01", "Aula"), ("2025-03-03", "Remédio"),
+            ("2025-03-03", "Aula"), ("2025-03-05", "Aula"),
+        ])
+
+        self.assertEqual(planner.add_event("2025-03-01", "X", {"freq": "hourly"})["status"], "error")
+        self.assertEqual(planner.add_event("2025-03-01", "X", {"freq": "daily", "until": "2025-02-01"})["status"],
+                         "error")
+        single = planner.add_event("2025-03-01", "Único")["data"]
+        self.assertIn("não se repete", planner.skip_occurrence(single["id"], "2025-03-01")["message"])
+
+    def test_monthly_recurrence_skips_missing_days(self):
+        """Test that a monthly event on the 31st skips shorter months, and moving it moves the series."""
+        event = planner.add_event("2025-01-31", "Fechamento", {"freq": "monthly", "count": 3})["data"]
+        self.assertEqual(event["last_date"], "2025-05-31")
+        events = planner.get_events(start="2025-01-01", end="2025-12-31")
+        self.assertEqual([ev["date"] for ev in events], ["2025-01-31", "2025-03-31", "2025-05-31"])
+
+        self.assertEqual(planner.update_event(event["id"], date_str="2025-01-15")["status"], "success")
+        events = planner.get_events(start="2025-01-01", end="2025-12-31")
+        self.assertEqual([ev["date"] for ev in events], ["2025-01-15", "2025-02-15", "2025-03-15"])
+
+    def test_recurring_events_on_old_database_and_json(self):
+        """Test that databases from before recurring events gain the columns, and the JSON backend recurs too."""
+        import sqlite3
+        conn = sqlite3.connect(planner.PLANNER_FILE.with_suffix(".db"))
+        conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, date TEXT NOT NULL, title TEXT NOT NULL)")
+        conn.execute("INSERT INTO events (date, title) VALUES ('2025-01-02', 'Antigo')")
+        conn.commit()
+        conn.close()
+        planner.add_event("2025-01-01", "Anual", {"freq": "yearly"})
+        events = planner.get_events(start="2025-01-01", end="2026-12-31")
+        self.assertEqual([ev["title"] for ev in events], ["Anual", "Antigo", "Anual"])
+
+        planner.STORAGE_BACKEND = "json"
+        try:
+            planner.add_event("2025-01-01", "Semanal", {"freq": "weekly", "count": 2})
+            events = planner.get_events(start="2025-01-01", end="2025-12-31")
+            self.assertEqual([ev["date"] for ev in events], ["2025-01-01", "2025-01-08"])
+        finally:
+            planner.STORAGE_BACKEND = "sqlite"
+
     def test_update_non_existent_event(self):
         """Test updating an event that does not exist."""
         result = planner.update_event(999, title="Novo Título")
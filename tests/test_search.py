@@ -0,0 +1,105 @@
+# tests/test_search.py
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+
+import core.entry as entry
+import core.search as search
+
+class TestSearchModule(unittest.TestCase):
+    def setUp(self):
+        """Point the entry module at a fresh temporary directory for each test."""
+        self.original_dir = entry.ENTRIES_DIR
+        self.test_dir = Path(tempfile.mkdtemp(prefix="offjournal_search_test_"))
+        entry.ENTRIES_DIR = self.test_dir
+
+    def tearDown(self):
+        entry.ENTRIES_DIR = self.original_dir
+        self._close_index()
+        shutil.rmtree(self.test_dir)
+
+    def _close_index(self):
+        state = search._connections.pop(self.test_dir, None)
+        if state:
+            state["conn"].close()
+
+    def _create(self, title, content):
+        """Creates an entry with a unique ID (create_entry IDs only have second resolution)."""
+        self.counter = getattr(self, "counter", 0) + 1
+        name = f"2025010112{self.counter:04d}_{title.replace(' ', '_')}.md"
+        (self.test_dir / name).write_text(content, encoding="utf-8")
+        return name
+
+    def test_tokenize_folds_accents_and_case(self):
+        """Test that tokens are lowercased, accent-free and stopwords are dropped."""
+        self.assertEqual(search.tokenize("Coração de Ação!"), ["coracao", "acao"])
+
+    def test_search_finds_body_text(self):
+        """Test that words from the entry body are searchable, accents ignored."""
+        name = self._create("Viagem", "Fomos à praia e o mar estava lindo.")
+        self._create("Trabalho", "Reunião longa sobre o orçamento.")
+
+        results = search.search("PRAIA")
+        self.assertEqual([r["filename"] for r in results], [name])
+        self.assertIn("praia", results[0]["snippet"])
+        self.assertEqual(search.search("orcamento")[0]["title"], "Trabalho")
+
+    def test_search_ranks_more_relevant_first(self):
+        """Test that entries mentioning a term more often rank higher."""
+        once = self._create("Uma vez", "gato no telhado, cachorro no quintal, peixe no aquário")
+        many = self._create("Muitas vezes", "gato gato gato")
+        results = search.search("gato")
+        self.assertEqual([r["filename"] for r in results], [many, once])
+
+    def test_update_and_delete_keep_index_current(self):
+        """Test that updates replace old terms and deletes remove the entry."""
+        entry_id = entry.create_entry("Nota")["data"]["id"]
+        entry.update_entry_content(entry_id, "palavra antiga")
+        self.assertEqual(len(search.search("antiga")), 1)
+
+        entry.update_entry_content(entry_id, "palavra nova")
+        self.assertEqual(search.search("antiga"), [])
+        self.assertEqual(len(search.search("nova")), 1)
+
+        entry.delete_entry(entry_id)
+        self.assertEqual(search.search("nova"), [])
+
+    def test_index_survives_reload(self):
+        """Test that the snapshot and log on disk restore the same index."""
+        entry_id = entry.create_entry("Persistida")["data"]["id"]
+        entry.update_entry_content(entry_id, "conteúdo persistente")
+        name = entry.find_entry_path(entry_id).name
+        self._close_index()
+        self.assertEqual(search.search("persistente")[0]["filename"], name)
+
+    def test_prefix_matches_last_term(self):
+        """Test that the last query term also matches longer words (search as you type)."""
+        self._create("Aniversario", "comemoramos o aniversário da vovó")
+        self.assertEqual(len(search.search("aniver")), 1)
+        self.assertEqual(search.search("an"), [])
+
+    def test_rebuild_index(self):
+        """Test that rebuilding reindexes every entry from disk."""
+        for i in range(3):
+            entry.create_entry(f"Compartilhado {i}")
+        result = search.rebuild_index()
+        self.assertEqual(result["status"], "success")
+        self.assertIn("3 entradas", result["message"])
+        self.assertEqual(len(search.search("compartilhado")), 3)
+
+    def test_external_entries_are_indexed(self):
+        """Test that entries written by other tools are picked up on the next search."""
+        (self.test_dir / "20200101000000_Externa.md").write_text("texto externo", encoding="utf-8")
+        results = search.search("externo")
+        self.assertEqual(results[0]["id"], "20200101000000")
+
+    def test_empty_query(self):
+        """Test that a query with no searchable terms returns nothing."""
+        self._create("Qualquer", "algo")
+        self.assertEqual(search.search("   "), [])
+        self.assertEqual(search.search("de"), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_startup.py
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Import time the core package may add to a simple CLI command, in milliseconds.
+# Loading every core module eagerly used to cost about three times as much.
+STARTUP_BUDGET_MS = float(os.environ.get("OFFJOURNAL_STARTUP_BUDGET_MS", 100))
+
+# Best of this many runs is compared with the budget, to ride out a busy machine
+STARTUP_RUNS = 3
+
+
+def measure_import_times(args: list[str], home: str, nested: bool = False) -> dict[str, int]:
+    """
+    Runs main.py under `python -X importtime` and returns the cumulative
+    import time (in microseconds) of every top-level import, by module name.
+    With nested=True, modules imported by other modules are included too.
+    """
+    env = {**os.environ, "HOME": home}
+    env.pop("OFFJOURNAL_GPG_RECIPIENT", None)
+    result = subprocess.run([sys.executable, "-X", "importtime", str(PROJECT_ROOT / "main.py"), *args],
+                            capture_output=True, text=True, env=env, cwd=PROJECT_ROOT, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only top-level ones are counted, once
+        if nested or not name.startswith("  "):
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    """Startup cost of the CLI: which modules a command loads, and how long that takes."""
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.home.cleanup()
+
+    def test_listing_loads_only_what_it_needs(self):
+        """Test that 'listar' loads neither unrelated core modules nor their heavy dependencies."""
+        times = measure_import_times(["listar"], self.home.name, nested=True)
+        self.assertIn("core.entry", times)
+        for module in ("core.export", "core.media", "core.planner", "core.thumbnails", "core.crypto",
+                       "core.search", "core.mood", "multiprocessing", "concurrent.futures", "zipfile",
+                       "tarfile", "sqlite3", "subprocess"):
+            self.assertNotIn(module, times, f"'{module}' is imported by 'listar'")
+        # Directories are created when something is written, not on import
+        self.assertFalse((Path(self.home.name) / ".offjournal").exists())
+
+    def test_core_import_time_is_within_budget(self):
+        """Test that the core modules 'listar' imports stay within STARTUP_BUDGET_MS."""
+        best = min(
+            sum(t for name, t in measure_import_times(["listar"], self.home.name).items()
+                if name == "core" or name.startswith("core."))
+            for _ in range(STARTUP_RUNS)
+        ) / 1000
+        self.assertLessEqual(best, STARTUP_BUDGET_MS,
+                             f"core import time {best:.1f} ms exceeds the {STARTUP_BUDGET_MS:.0f} ms budget")
+
+    def test_export_formats_match_core(self):
+        """Test that the CLI's copy of the export formats (kept to avoid importing core.export) is current."""
+        import core.export as export
+        import main
+        self.assertEqual(tuple(main.EXPORT_FORMATS), tuple(export.JOURNAL_FORMATS))
+
+
+if __name__ == '__main__':
+    unittest.main()
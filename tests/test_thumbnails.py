@@ -0,0 +1,150 @@
+# tests/test_thumbnails.py
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import core.media as media
+import core.thumbnails as thumbnails
+
+def is_pillow_available():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class TestThumbnails(unittest.TestCase):
+    def setUp(self):
+        self.old_media_dir = media.MEDIA_DIR
+        media.MEDIA_DIR = Path(tempfile.mkdtemp(prefix="offjournal_thumbnails_test_"))
+        self.source = media.MEDIA_DIR.parent / f"{media.MEDIA_DIR.name}_foto.jpg"
+        self.source.write_bytes(b"not really a jpeg")
+        media.add_media("20250101000000", str(self.source))
+
+        # Stand-in renderer, so the cache logic doesn't depend on an imaging library
+        self.rendered = []
+        self.old_render = thumbnails._render_thumbnail
+        def render(source, destination, size):
+            self.rendered.append((source.name, size))
+            destination.write_bytes(b"x" * size)
+        thumbnails._render_thumbnail = render
+
+    def tearDown(self):
+        thumbnails._render_thumbnail = self.old_render
+        shutil.rmtree(media.MEDIA_DIR)
+        self.source.unlink()
+        media.MEDIA_DIR = self.old_media_dir
+
+    def test_thumbnail_is_generated_once_and_shared(self):
+        """Test lazy generation, caching, and sharing between identical attachments."""
+        name = self.source.name
+        media.add_media("20250102000000", str(self.source))
+        first = thumbnails.get_thumbnail("20250101000000", name, 64)
+        self.assertEqual(first["status"], "success")
+        self.assertEqual(Path(first["path"]).read_bytes(), b"x" * 64)
+
+        second = thumbnails.get_thumbnail("20250102000000", name, 64)
+        self.assertEqual(second["path"], first["path"])
+        self.assertEqual(len(self.rendered), 1)
+
+        thumbnails.get_thumbnail("20250101000000", name, 128)
+        self.assertEqual([size for _, size in self.rendered], [64, 128])
+
+    def test_least_recently_used_thumbnails_are_evicted(self):
+        """Test that the cache stays under its cap by dropping the oldest thumbnails."""
+        name = self.source.name
+        old_cap = thumbnails.THUMBNAIL_CACHE_MAX_BYTES
+        thumbnails.THUMBNAIL_CACHE_MAX_BYTES = 250
+        try:
+            small = thumbnails.get_thumbnail("20250101000000", name, 100)["path"]
+            medium = thumbnails.get_thumbnail("20250101000000", name, 120)["path"]
+            os.utime(small, ns=(0, 1))  # Make the first thumbnail the least recently used
+            os.utime(medium, ns=(0, 2))
+            thumbnails.get_thumbnail("20250101000000", name, 100)  # A hit refreshes it
+            large = thumbnails.get_thumbnail("20250101000000", name, 140)["path"]
+        finally:
+            thumbnails.THUMBNAIL_CACHE_MAX_BYTES = old_cap
+        self.assertTrue(Path(small).exists())
+        self.assertFalse(Path(medium).exists())
+        self.assertTrue(Path(large).exists())
+
+    def test_concurrent_requests_share_one_generation(self):
+        """Test that requests for a thumbnail being generated wait for the same job."""
+        release = threading.Event()
+        render = thumbnails._render_thumbnail
+        def slow_render(source, destination, size):
+            release.wait(5)
+            render(source, destination, size)
+        thumbnails._render_thumbnail = slow_render
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            thumbnails.get_thumbnail("20250101000000", self.source.name, 32))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual([r["status"] for r in results], ["success"] * 3)
+        self.assertEqual(len(self.rendered), 1)
+
+    def test_pool_starts_with_the_first_generation(self):
+        """Test that the worker pool is only created when a thumbnail has to be rendered."""
+        saved = thumbnails._executor
+        thumbnails._executor = None
+        try:
+            self.assertEqual(thumbnails.prefetch_thumbnails("20250101000000", 48), 1)
+            self.assertIsNotNone(thumbnails._executor)
+        finally:
+            if thumbnails._executor is not None:
+                thumbnails._executor.shutdown(wait=True)
+            thumbnails._executor = saved
+        pool = thumbnails._executor
+        thumbnails._executor = None
+        try:
+            # A cached thumbnail needs no pool
+            self.assertEqual(thumbnails.get_thumbnail("20250101000000", self.source.name, 48)["status"], "success")
+            self.assertIsNone(thumbnails._executor)
+        finally:
+            thumbnails._executor = pool
+
+    def test_unreadable_image_is_reported_and_retried(self):
+        """Test that a rendering error becomes an error reply and isn't cached."""
+        render = thumbnails._render_thumbnail
+        def broken(source, destination, size):
+            raise OSError("imagem corrompida")
+        thumbnails._render_thumbnail = broken
+        result = thumbnails.get_thumbnail("20250101000000", self.source.name, 40)
+        self.assertEqual(result["status"], "error")
+        self.assertIn("imagem corrompida", result["message"])
+        thumbnails._render_thumbnail = render
+        self.assertEqual(thumbnails.get_thumbnail("20250101000000", self.source.name, 40)["status"], "success")
+
+    def test_non_image_or_missing_attachment(self):
+        self.assertEqual(thumbnails.get_thumbnail("20250101000000", "notas.txt")["status"], "error")
+        self.assertEqual(thumbnails.get_thumbnail("20250101000000", "outra.jpg")["status"], "error")
+
+    @unittest.skipUnless(is_pillow_available(), "Pillow não instalado, pulando teste.")
+    def test_pillow_renderer(self):
+        from PIL import Image
+        picture = media.MEDIA_DIR.parent / f"{media.MEDIA_DIR.name}_grande.png"
+        image = Image.new("RGBA", (800, 400), (255, 0, 0, 255))
+        image.paste((0, 0, 0, 0), (0, 0, 400, 400))  # Left half fully transparent
+        image.save(picture)
+        try:
+            media.add_media("20250101000000", str(picture))
+            thumbnails._render_thumbnail = self.old_render
+            result = thumbnails.get_thumbnail("20250101000000", picture.name, 200)
+            with Image.open(result["path"]) as thumb:
+                self.assertEqual(thumb.size, (200, 100))
+                # Transparent areas show the background, not black
+                self.assertGreater(min(thumb.getpixel((10, 50))), 240)
+        finally:
+            picture.unlink()
+
+if __name__ == "__main__":
+    unittest.main()
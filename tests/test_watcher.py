@@ -0,0 +1,132 @@
+# tests/test_watcher.py
+
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import core.entry as entry
+import core.media as media
+import core.planner as planner
+import core.watcher as watcher
+
+
+class TestWatcherPolling(unittest.TestCase):
+    """Watcher events for outside changes, using the polling backend."""
+
+    use_inotify = False
+
+    def setUp(self):
+        self.base = Path(tempfile.mkdtemp(prefix="offjournal_watcher_test_"))
+        self.saved = (entry.ENTRIES_DIR, media.MEDIA_DIR, planner.PLANNER_FILE)
+        entry.ENTRIES_DIR = self.base / "entries"
+        media.MEDIA_DIR = self.base / "media"
+        planner.PLANNER_FILE = self.base / "planner.json"
+        entry._indexes.clear()
+
+        self.events = queue.Queue()
+        self.watcher = watcher.Watcher(lambda event, data: self.events.put((event, data)),
+                                       use_inotify=self.use_inotify, poll_interval=0.05)
+        self.watcher.start()
+        self.assertTrue(self.watcher.wait_ready(5))
+
+    def tearDown(self):
+        self.watcher.stop()
+        entry.ENTRIES_DIR, media.MEDIA_DIR, planner.PLANNER_FILE = self.saved
+        entry._indexes.clear()
+        shutil.rmtree(self.base)
+
+    def wait_for(self, name: str, timeout: float = 5) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                event, data = self.events.get(timeout=max(0.01, deadline - time.monotonic()))
+            except queue.Empty:
+                self.fail(f"no '{name}' event")
+            if event == name:
+                return data
+
+    def drain(self, seconds: float) -> list[str]:
+        """Names of the events reported during the next few seconds."""
+        names = []
+        deadline = time.monotonic() + seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                names.append(self.events.get(timeout=remaining)[0])
+            except queue.Empty:
+                break
+        return names
+
+    def test_outside_entries_are_reported_and_indexed(self):
+        """Test that files added and removed by another program are reported without a rescan."""
+        path = entry.ENTRIES_DIR / "20240301080000_De_fora.md"
+        path.write_text("# De fora", encoding="utf-8")
+        data = self.wait_for("entries:changed")
+        self.assertEqual([r["id"] for r in data["added"]], ["20240301080000"])
+        self.assertEqual(data["added"][0]["media_count"], 0)
+
+        # The index was updated in place: listing doesn't rescan the directory
+        original = entry._scan_entries
+        entry._scan_entries = lambda: self.fail("the entries directory was rescanned")
+        try:
+            self.assertEqual([e["id"] for e in entry.get_entries()], ["20240301080000"])
+        finally:
+            entry._scan_entries = original
+
+        path.unlink()
+        data = self.wait_for("entries:changed")
+        self.assertEqual(data["removed"], [path.name])
+        self.assertEqual(entry.get_entries(), [])
+
+    def test_own_saves_are_not_reported_as_updates(self):
+        """Test that saving an entry from the app doesn't come back as an outside update."""
+        entry_id = entry.create_entry("Minha")["data"]["id"]
+        self.wait_for("entries:changed")
+        self.assertEqual(entry.update_entry_content(entry_id, "# Minha\n\nNovo texto.\n")["status"], "success")
+
+        # A later outside change marks the end of whatever the save produced
+        (entry.ENTRIES_DIR / "20240301080000_De_fora.md").write_text("# De fora", encoding="utf-8")
+        while True:
+            data = self.wait_for("entries:changed")
+            self.assertEqual(data["updated"], [])
+            if data["added"]:
+                break
+        self.assertEqual([r["id"] for r in data["added"]], ["20240301080000"])
+        # The catalogue still follows the saved file
+        self.assertEqual(self.watcher.entries[entry.find_entry_path(entry_id).name]["size"],
+                         len("# Minha\n\nNovo texto.\n"))
+
+    def test_planner_and_media_changes_are_reported(self):
+        """Test that outside planner writes and new attachments produce their events, and own planner writes don't."""
+        planner.add_event("2030-01-01", "Ano novo")
+        self.assertNotIn("planner:changed", self.drain(0.6))
+        # Another process writing to the planner database
+        conn = sqlite3.connect(planner.PLANNER_FILE.with_suffix(".db"))
+        with conn:
+            conn.execute("INSERT INTO events (date, title) VALUES ('2030-02-01', 'De fora')")
+        conn.close()
+        self.assertEqual(self.wait_for("planner:changed"), {})
+
+        source = self.base / "foto.jpg"
+        source.write_bytes(b"jpeg")
+        media.add_media("20240301080000", str(source))
+        data = self.wait_for("entries:changed")
+        self.assertEqual(data["media_counts"], {"20240301080000": 1})
+
+
+@unittest.skipUnless(watcher._load_inotify(), "inotify indisponível, pulando teste.")
+class TestWatcherInotify(TestWatcherPolling):
+    """The same events through inotify."""
+
+    use_inotify = True
+
+    def test_backend(self):
+        self.assertEqual(self.watcher.backend, "inotify")
+
+
+if __name__ == '__main__':
+    unittest.main()